@@ -0,0 +1,60 @@
+"""Command line tools
+
+    python -m app.cli import-links links.csv
+    python -m app.cli import-links links.ndjson --format ndjson
+"""
+import argparse
+import asyncio
+import sys
+from typing import AsyncIterator, List, Optional
+
+from app.infra.config import settings
+from app.infra.database.session import AsyncSessionLocal, dispose_models, init_models
+from app.infra.database.unit_of_work import UnitOfWork
+from app.infra.repos_impl.link_repo_impl import LinkRepository
+from app.use_cases.import_links import ImportLinksUseCase
+
+
+async def _file_lines(path: str) -> AsyncIterator[str]:
+    """Read a file line by line"""
+    with open(path, encoding="utf-8", newline="") as f:
+        for line in f:
+            yield line.rstrip("\r\n")
+
+
+async def _import_links(path: str, fmt: str) -> int:
+    await init_models()
+    try:
+        async with AsyncSessionLocal() as session, UnitOfWork(session):
+            use_case = ImportLinksUseCase(
+                LinkRepository(session), batch_size=settings.LINK_IMPORT_BATCH_SIZE
+            )
+            report = await use_case.execute(_file_lines(path), fmt)
+    finally:
+        await dispose_models()
+
+    print(f"Imported {report.imported} links, rejected {report.rejected_count}")
+    for rejected in report.rejected:
+        print(f"  line {rejected.line}: {rejected.reason}", file=sys.stderr)
+    return 0 if report.rejected_count == 0 else 1
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.cli")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    import_links = commands.add_parser("import-links", help="bulk import links from CSV or NDJSON")
+    import_links.add_argument("path")
+    import_links.add_argument(
+        "--format",
+        choices=["csv", "ndjson"],
+        help="input format, guessed from the file extension by default",
+    )
+
+    args = parser.parse_args(argv)
+    fmt = args.format or ("ndjson" if args.path.endswith((".ndjson", ".jsonl")) else "csv")
+    return asyncio.run(_import_links(args.path, fmt))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
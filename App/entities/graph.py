@@ -0,0 +1,16 @@
+from dataclasses import dataclass, field
+from typing import Dict, List, Set
+
+from app.entities.mechanic import GameMechanic
+from app.entities.link import EvolutionLink
+
+
+@dataclass
+class MechanicGraph:
+    """Part of the evolution graph reachable from a root mechanic"""
+    root_id: int
+    mechanics: Dict[int, GameMechanic] = field(default_factory=dict)
+    links: List[EvolutionLink] = field(default_factory=list)
+    depths: Dict[int, int] = field(default_factory=dict)
+    child_counts: Dict[int, int] = field(default_factory=dict)
+    truncated: Set[int] = field(default_factory=set)
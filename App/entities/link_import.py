@@ -0,0 +1,26 @@
+from dataclasses import dataclass, field
+from typing import List
+
+
+@dataclass
+class LinkImportRow:
+    """One parsed edge of a bulk link import"""
+    line: int
+    from_id: int
+    to_id: int
+    type: str
+
+
+@dataclass
+class RejectedLink:
+    """Import line that was skipped and why"""
+    line: int
+    reason: str
+
+
+@dataclass
+class LinkImportReport:
+    """Outcome of a bulk link import"""
+    imported: int = 0
+    rejected: List[RejectedLink] = field(default_factory=list)
+    rejected_count: int = 0
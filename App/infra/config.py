@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import List, Optional
 import os
 
 
@@ -17,6 +17,23 @@ class Settings(BaseSettings):
     DB_HOST: str = os.getenv("DATABASE_HOST", os.getenv("DB_HOST", "localhost"))
     DB_PORT: int = int(os.getenv("DATABASE_PORT", os.getenv("DB_PORT", "5432")))
     DB_NAME: str = os.getenv("DATABASE_NAME", os.getenv("DB_NAME", "evolution_db"))
+    # Full URLs, e.g. two sqlite+aiosqlite:/// files for a local replica setup
+    DB_URL: Optional[str] = os.getenv("DATABASE_URL") or None
+    # Comma separated read replica URLs
+    DB_REPLICA_URLS: str = os.getenv("DATABASE_REPLICA_URLS", "")
+    # After a write, the client's reads stay on the primary for this long
+    REPLICA_STICKY_SECONDS: int = int(os.getenv("REPLICA_STICKY_SECONDS", "5"))
+    # Connection pool, per engine
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "20"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    DB_POOL_TIMEOUT: float = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+    DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+    DB_POOL_PRE_PING: bool = os.getenv("DB_POOL_PRE_PING", "True").lower() == "true"
+    # Log every SQL statement
+    DB_ECHO: bool = os.getenv("DB_ECHO", "False").lower() == "true"
+    # Compiled statements kept by SQLAlchemy per engine, prepared ones by asyncpg per connection
+    DB_QUERY_CACHE_SIZE: int = int(os.getenv("DB_QUERY_CACHE_SIZE", "500"))
+    DB_PREPARED_STATEMENT_CACHE_SIZE: int = int(os.getenv("DB_PREPARED_STATEMENT_CACHE_SIZE", "500"))
 
     # Security
     SECRET_KEY: str = os.getenv("SECRET_KEY", "dev-secret-key-change")
@@ -24,14 +41,50 @@ class Settings(BaseSettings):
     ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "60"))
     
     # Application
-    DEBUG: bool = os.getenv("DEBUG", "True").lower() == "true"
+    DEBUG: bool = os.getenv("DEBUG", "False").lower() == "true"
     APP_NAME: str = "Evolution Tree API"
     VERSION: str = "1.0.0"
 
+    # Response compression, bodies below the minimum size are sent as they are
+    COMPRESSION_ENABLED: bool = os.getenv("COMPRESSION_ENABLED", "True").lower() == "true"
+    COMPRESSION_MIN_SIZE: int = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+    COMPRESSION_GZIP_LEVEL: int = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+    COMPRESSION_BROTLI_LEVEL: int = int(os.getenv("COMPRESSION_BROTLI_LEVEL", "4"))
+
+    # Listings
+    PAGE_SIZE_DEFAULT: int = int(os.getenv("PAGE_SIZE_DEFAULT", "100"))
+    PAGE_SIZE_MAX: int = int(os.getenv("PAGE_SIZE_MAX", "1000"))
+
+    # Bulk operations
+    BULK_MAX_ITEMS: int = int(os.getenv("BULK_MAX_ITEMS", "1000"))
+    LINK_IMPORT_BATCH_SIZE: int = int(os.getenv("LINK_IMPORT_BATCH_SIZE", "5000"))
+    BATCH_MAX_OPERATIONS: int = int(os.getenv("BATCH_MAX_OPERATIONS", "100"))
+
+    # Evolution tree
+    TREE_MAX_NODES: int = int(os.getenv("TREE_MAX_NODES", "10000"))
+    TREE_CACHE_SIZE: int = int(os.getenv("TREE_CACHE_SIZE", "256"))
+    # In-memory link graph of each worker. Writes of the worker itself are
+    # applied in place, a write of another worker or the CLI makes it reload
+    # every link, at most once per GRAPH_INDEX_REBUILD_SECONDS. In between,
+    # and when several workers write steadily, reads fall back to SQL
+    GRAPH_INDEX_ENABLED: bool = os.getenv("GRAPH_INDEX_ENABLED", "True").lower() == "true"
+    GRAPH_INDEX_REBUILD_SECONDS: float = float(os.getenv("GRAPH_INDEX_REBUILD_SECONDS", "30"))
+    ENFORCE_ACYCLIC_LINKS: bool = os.getenv("ENFORCE_ACYCLIC_LINKS", "False").lower() == "true"
+    PATH_MAX_K: int = int(os.getenv("PATH_MAX_K", "10"))
+    # Keys memoized per request and loader, NDJSON walks stay within it
+    BATCH_MEMO_SIZE: int = int(os.getenv("BATCH_MEMO_SIZE", "2000"))
+
     @property
     def DATABASE_URL(self) -> str:
-        """PostgreSQL connection URL"""
+        """Primary connection URL, PostgreSQL built from DB_* unless DB_URL is set"""
+        if self.DB_URL:
+            return self.DB_URL
         return f"postgresql+asyncpg://{self.DB_USER}:{self.DB_PASS}@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}"
 
+    @property
+    def DATABASE_REPLICA_URLS(self) -> List[str]:
+        """Read replica connection URLs"""
+        return [url.strip() for url in self.DB_REPLICA_URLS.split(",") if url.strip()]
+
 
 settings = Settings()
@@ -0,0 +1,73 @@
+from dataclasses import dataclass
+from typing import List, Tuple
+
+from sqlalchemy import insert, inspect, select, text
+from sqlalchemy.engine import Connection
+
+from app.infra.database.models import Base, SchemaVersionDB
+
+
+@dataclass(frozen=True)
+class Migration:
+    """Numbered schema change, statements run in order in one transaction"""
+    version: int
+    description: str
+    statements: Tuple[str, ...]
+
+
+# Append only, an applied migration is never edited. Statements are plain
+# SQL understood by both PostgreSQL and SQLite and safe to re-run.
+MIGRATIONS: List[Migration] = [
+    Migration(
+        1,
+        "Index links.to_id for ancestor walks",
+        ("CREATE INDEX IF NOT EXISTS ix_links_to_id ON links (to_id)",),
+    ),
+    Migration(
+        2,
+        "Drop duplicate links and make (from_id, to_id, type) unique",
+        (
+            "DELETE FROM links WHERE id NOT IN "
+            "(SELECT MIN(id) FROM links GROUP BY from_id, to_id, type)",
+            "CREATE UNIQUE INDEX IF NOT EXISTS uq_links_from_id_to_id_type "
+            "ON links (from_id, to_id, type)",
+        ),
+    ),
+    Migration(
+        3,
+        "Index mechanics.year",
+        ("CREATE INDEX IF NOT EXISTS ix_mechanics_year ON mechanics (year)",),
+    ),
+    Migration(
+        4,
+        "Seed the stored graph version",
+        (
+            "INSERT INTO graph_version (id, version) "
+            "SELECT 1, 1 WHERE NOT EXISTS (SELECT 1 FROM graph_version)",
+        ),
+    ),
+]
+
+
+def migrate(connection: Connection) -> List[int]:
+    """Bring the schema up to the latest migration, returning applied versions
+
+    A new database is created from the models, which already describe the
+    latest schema, and stamped with every version. Tables that are missing
+    from an existing database are created, then pending migrations run.
+    """
+    fresh = not inspect(connection).has_table("mechanics")
+    Base.metadata.create_all(connection)
+
+    applied = set(connection.execute(select(SchemaVersionDB.version)).scalars())
+    pending = [m for m in MIGRATIONS if m.version not in applied]
+    for migration in pending:
+        if not fresh:
+            for statement in migration.statements:
+                connection.execute(text(statement))
+        connection.execute(
+            insert(SchemaVersionDB).values(
+                version=migration.version, description=migration.description
+            )
+        )
+    return [m.version for m in pending]
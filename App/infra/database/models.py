@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, Boolean, DateTime, func
+from sqlalchemy import BigInteger, Column, Integer, String, Text, ForeignKey, Boolean, DateTime, Index, event, func, insert
 from sqlalchemy.orm import declarative_base, relationship
 
 Base = declarative_base()
@@ -11,7 +11,7 @@ class MechanicDB(Base):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(255), nullable=False, index=True)
     description = Column(Text, nullable=True)
-    year = Column(Integer, nullable=True)
+    year = Column(Integer, nullable=True, index=True)
 
     # Relationships
     outgoing = relationship(
@@ -30,10 +30,14 @@ class MechanicDB(Base):
 class LinkDB(Base):
     """Database model for EvolutionLink"""
     __tablename__ = "links"
+    __table_args__ = (
+        # Also serves lookups by from_id, which is its leading column
+        Index("uq_links_from_id_to_id_type", "from_id", "to_id", "type", unique=True),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     from_id = Column(Integer, ForeignKey("mechanics.id", ondelete="CASCADE"), nullable=False)
-    to_id = Column(Integer, ForeignKey("mechanics.id", ondelete="CASCADE"), nullable=False)
+    to_id = Column(Integer, ForeignKey("mechanics.id", ondelete="CASCADE"), nullable=False, index=True)
     type = Column(String(50), nullable=False)
 
     # Relationships
@@ -75,3 +79,25 @@ class EmailTokenDB(Base):
     is_used = Column(Boolean, default=False)
 
     user = relationship("UserDB", back_populates="tokens")
+
+
+class SchemaVersionDB(Base):
+    """Applied schema migration"""
+    __tablename__ = "schema_version"
+
+    version = Column(Integer, primary_key=True)
+    description = Column(String(255), nullable=False)
+    applied_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class GraphVersionDB(Base):
+    """Single row counting committed changes to mechanics and links"""
+    __tablename__ = "graph_version"
+
+    id = Column(Integer, primary_key=True)
+    version = Column(BigInteger, nullable=False)
+
+
+@event.listens_for(GraphVersionDB.__table__, "after_create")
+def _seed_graph_version(target, connection, **kw):
+    connection.execute(insert(target).values(id=1, version=1))
@@ -0,0 +1,69 @@
+import time
+from typing import Dict, Type, Union
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import Pool, QueuePool
+
+
+class PoolMetrics:
+    """Checkout counters of one connection pool"""
+
+    def __init__(self):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def record(self, wait: float, timed_out: bool = False) -> None:
+        """Count one checkout that waited wait seconds for a connection"""
+        if timed_out:
+            self.timeouts += 1
+        else:
+            self.checkouts += 1
+        self.wait_seconds += wait
+        self.max_wait_seconds = max(self.max_wait_seconds, wait)
+
+
+def metered_pool_class(base: Type[Pool]) -> Type[Pool]:
+    """Subclass base so every checkout records its wait in pool.metrics"""
+
+    class MeteredPool(base):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self.metrics = PoolMetrics()
+
+        def connect(self):
+            start = time.perf_counter()
+            try:
+                connection = super().connect()
+            except PoolTimeoutError:
+                self.metrics.record(time.perf_counter() - start, timed_out=True)
+                raise
+            self.metrics.record(time.perf_counter() - start)
+            return connection
+
+    MeteredPool.__name__ = f"Metered{base.__name__}"
+    MeteredPool.__qualname__ = MeteredPool.__name__
+    return MeteredPool
+
+
+def pool_stats(pool: Pool) -> Dict[str, Union[int, float, str]]:
+    """Get occupancy and checkout wait counters of a pool"""
+    stats: Dict[str, Union[int, float, str]] = {"pool": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        stats.update(
+            size=pool.size(),
+            checked_out=pool.checkedout(),
+            checked_in=pool.checkedin(),
+            # Negative while fewer than size connections have been opened
+            overflow=max(pool.overflow(), 0),
+        )
+    metrics = getattr(pool, "metrics", None)
+    if metrics is not None:
+        stats.update(
+            checkouts=metrics.checkouts,
+            timeouts=metrics.timeouts,
+            wait_seconds_total=round(metrics.wait_seconds, 6),
+            wait_seconds_max=round(metrics.max_wait_seconds, 6),
+        )
+    return stats
@@ -0,0 +1,68 @@
+import contextlib
+import random
+from typing import Iterator, Optional, Sequence
+
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+# session.info keys: all statements go to the primary / the session has written
+_USES_PRIMARY = "uses_primary"
+_HAS_WRITTEN = "has_written"
+
+
+def use_primary(session: AsyncSession) -> None:
+    """Send every later statement of session to the primary"""
+    session.info[_USES_PRIMARY] = True
+
+
+@contextlib.contextmanager
+def primary_reads(session: AsyncSession) -> Iterator[None]:
+    """Send the statements of the block to the primary, later reads return to the replica"""
+    pinned = session.info.get(_USES_PRIMARY, False)
+    session.info[_USES_PRIMARY] = True
+    try:
+        yield
+    finally:
+        if not pinned and not has_written(session):
+            session.info.pop(_USES_PRIMARY, None)
+
+
+def has_written(session: AsyncSession) -> bool:
+    """Whether session has sent a write to the primary while replicas are in use"""
+    return bool(session.info.get(_HAS_WRITTEN))
+
+
+class RoutingSession(Session):
+    """Session that sends reads to a read replica and everything else to the primary
+
+    The session is bound to the primary. Flushes, DML, SELECT ... FOR UPDATE
+    and raw connection() calls go there, and from then on so does every read,
+    so the session sees its own uncommitted writes. Until then reads use one
+    replica, picked at random and kept for the session so they see a single
+    snapshot. Without replicas it behaves like a plain Session.
+    """
+
+    def __init__(self, *args, replicas: Sequence[Engine] = (), **kwargs):
+        super().__init__(*args, **kwargs)
+        self.replicas = list(replicas)
+        self._replica: Optional[Engine] = None
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if not self.replicas:
+            return super().get_bind(mapper, clause=clause, **kwargs)
+
+        writes = (
+            self._flushing
+            or (mapper is None and clause is None)
+            or getattr(clause, "is_dml", False)
+            or getattr(clause, "_for_update_arg", None) is not None
+        )
+        if writes:
+            self.info[_USES_PRIMARY] = self.info[_HAS_WRITTEN] = True
+        if self.info.get(_USES_PRIMARY):
+            return super().get_bind(mapper, clause=clause, **kwargs)
+
+        if self._replica is None:
+            self._replica = random.choice(self.replicas)
+        return self._replica
@@ -1,21 +1,66 @@
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from typing import Dict
+
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import QueuePool
 
 from app.infra.database.models import Base
+from app.infra.database.migrations import migrate
+from app.infra.database.pool_metrics import metered_pool_class, pool_stats
+from app.infra.database.routing import RoutingSession
 from app.infra.config import settings
 
+
+def _create_engine(url: str) -> AsyncEngine:
+    """Create an engine with the pool and statement caches configured from settings
+
+    Queue pools are sized from DB_POOL_* and record checkout waits, see
+    engine_pool_stats. query_cache_size bounds SQLAlchemy's cache of
+    compiled statements, asyncpg additionally keeps that many server-side
+    prepared statements per connection (0 disables them, e.g. behind
+    PgBouncer in transaction mode).
+    """
+    parsed = make_url(url)
+    options = {}
+    pool_class = parsed.get_dialect().get_pool_class(parsed)
+    if issubclass(pool_class, QueuePool):
+        options.update(
+            poolclass=metered_pool_class(pool_class),
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+        )
+    connect_args = {}
+    if parsed.get_driver_name() == "asyncpg":
+        connect_args["prepared_statement_cache_size"] = settings.DB_PREPARED_STATEMENT_CACHE_SIZE
+    return create_async_engine(
+        url,
+        echo=settings.DB_ECHO,
+        future=True,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        query_cache_size=settings.DB_QUERY_CACHE_SIZE,
+        connect_args=connect_args,
+        **options,
+    )
+
+
 # Create async engine
-engine = create_async_engine(
-    settings.DATABASE_URL,
-    echo=settings.DEBUG,
-    future=True,
-    pool_size=20,
-    max_overflow=0,
-)
+engine = _create_engine(settings.DATABASE_URL)
+
+# Read replicas, empty when every statement goes to the primary. A session
+# keeps one replica transaction, repeatable read makes it a single snapshot
+replica_engines = [
+    _create_engine(url).execution_options(isolation_level="REPEATABLE READ")
+    for url in settings.DATABASE_REPLICA_URLS
+]
 
 # Session factory
 AsyncSessionLocal = async_sessionmaker(
     bind=engine,
     class_=AsyncSession,
+    sync_session_class=RoutingSession,
+    replicas=[replica.sync_engine for replica in replica_engines],
     expire_on_commit=False,
     autoflush=False,
 )
@@ -28,9 +73,9 @@ async def get_session() -> AsyncSession:
 
 
 async def init_models():
-    """Initialize database tables"""
+    """Initialize database tables and apply pending migrations"""
     async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(migrate)
 
 
 async def drop_models():
@@ -47,3 +92,13 @@ def get_engine():
 async def dispose_models():
     """Dispose engine connections"""
     await engine.dispose()
+    for replica in replica_engines:
+        await replica.dispose()
+
+
+def engine_pool_stats() -> Dict[str, Dict]:
+    """Get pool counters of the primary and every replica engine"""
+    stats = {"primary": pool_stats(engine.pool)}
+    for i, replica in enumerate(replica_engines):
+        stats[f"replica_{i}"] = pool_stats(replica.pool)
+    return stats
@@ -0,0 +1,52 @@
+from typing import Callable
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, SessionTransaction
+
+from app.interfaces.repos.unit_of_work import IUnitOfWork
+
+# session.info key of callbacks waiting for the current transaction to commit
+_COMMIT_HOOKS = "commit_hooks"
+
+
+def on_commit(session: AsyncSession, callback: Callable[[], None]) -> None:
+    """Run callback once the current transaction of session commits
+
+    Process-wide state derived from the database (graph index, graph
+    version) is updated through these hooks, so a rolled back write never
+    reaches it.
+    """
+    session.info.setdefault(_COMMIT_HOOKS, []).append(callback)
+
+
+def has_pending_commit(session: AsyncSession) -> bool:
+    """Whether session holds flushed writes that are not committed yet"""
+    return bool(session.info.get(_COMMIT_HOOKS))
+
+
+@event.listens_for(Session, "after_commit")
+def _run_commit_hooks(session: Session) -> None:
+    for callback in session.info.pop(_COMMIT_HOOKS, ()):
+        callback()
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _drop_commit_hooks(session: Session, transaction: SessionTransaction) -> None:
+    if transaction.parent is None:
+        session.info.pop(_COMMIT_HOOKS, None)
+
+
+class UnitOfWork(IUnitOfWork):
+    """Unit of work over one session"""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def commit(self) -> None:
+        """Commit all writes made since the last commit"""
+        await self.session.commit()
+
+    async def rollback(self) -> None:
+        """Discard all writes made since the last commit"""
+        await self.session.rollback()
@@ -0,0 +1,428 @@
+import asyncio
+import time
+import weakref
+from array import array
+from collections import deque
+from typing import Awaitable, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.entities.link import EvolutionLink
+from app.infra.graph_version import committed_graph_version
+
+# (link_id, neighbour_id, type_id)
+Edge = Tuple[int, int, int]
+
+
+class _Adjacency:
+    """CSR adjacency of one direction of the link graph
+
+    Edges of mechanic n live in the slice offsets[n]:offsets[n + 1] of the
+    targets, link_ids and type_ids arrays.
+    """
+
+    def __init__(self, edges: List[Tuple[int, int, int, int]]):
+        size = max((e[0] for e in edges), default=-1) + 1
+        counts = array("q", [0]) * (size + 1)
+        for key, _, _, _ in edges:
+            counts[key + 1] += 1
+        for i in range(size):
+            counts[i + 1] += counts[i]
+
+        self.offsets = counts
+        self.targets = array("i", [0]) * len(edges)
+        self.link_ids = array("i", [0]) * len(edges)
+        self.type_ids = array("I", [0]) * len(edges)
+
+        cursor = array("q", counts)
+        for key, other, link_id, type_id in edges:
+            pos = cursor[key]
+            self.targets[pos] = other
+            self.link_ids[pos] = link_id
+            self.type_ids[pos] = type_id
+            cursor[key] = pos + 1
+
+    def edges(self, node: int) -> Iterator[Edge]:
+        if node < 0 or node + 1 >= len(self.offsets):
+            return
+        for pos in range(self.offsets[node], self.offsets[node + 1]):
+            yield self.link_ids[pos], self.targets[pos], self.type_ids[pos]
+
+
+class LinkGraphIndex:
+    """Process-wide in-memory index of the link graph
+
+    The index is built from the links table and then kept up to date by the
+    repositories after each successful write. Writes land in a small
+    overlay (added edges plus removed link ids) that is folded back into the
+    CSR arrays when it grows past the compaction threshold. version is the
+    stored graph version the contents match, a newer stored version means
+    another process wrote and the index has to be rebuilt.
+    """
+
+    def __init__(self, compact_threshold: int = 1024):
+        self.compact_threshold = compact_threshold
+        self.loaded = False
+        self.version = 0
+        self.built_at: Optional[float] = None
+        self._epoch = 0
+        self._lock = asyncio.Lock()
+        self._types: List[str] = []
+        self._type_ids: Dict[str, int] = {}
+        self._order: Optional[TopologicalOrder] = None
+        self._cyclic = False
+        self._reset([])
+
+    def _reset(self, edges: List[Tuple[int, int, int, int]]) -> None:
+        self._forward = _Adjacency(edges)
+        self._reverse = _Adjacency([
+            (to_id, from_id, link_id, type_id) for from_id, to_id, link_id, type_id in edges
+        ])
+        self._base_count = len(edges)
+        self._added: Dict[int, Tuple[int, int, int]] = {}
+        self._added_forward: Dict[int, List[Edge]] = {}
+        self._added_reverse: Dict[int, List[Edge]] = {}
+        self._removed: set = set()
+
+    def _intern(self, link_type: str) -> int:
+        type_id = self._type_ids.get(link_type)
+        if type_id is None:
+            type_id = len(self._types)
+            self._types.append(link_type)
+            self._type_ids[link_type] = type_id
+        return type_id
+
+    @property
+    def edge_count(self) -> int:
+        """Number of live links in the index"""
+        return self._base_count + len(self._added) - len(self._removed)
+
+    def build(self, links: Iterable[EvolutionLink]) -> None:
+        """Replace index contents with the given links"""
+        self._types = []
+        self._type_ids = {}
+        edges = [(l.from_id, l.to_id, l.id, self._intern(l.type)) for l in links]
+        self._reset(edges)
+        self._order = None
+        self._cyclic = False
+        self.loaded = True
+        self.built_at = time.monotonic()
+
+    def may_rebuild(self, min_interval: float) -> bool:
+        """Whether the last build is at least min_interval seconds old"""
+        return self.built_at is None or time.monotonic() - self.built_at >= min_interval
+
+    async def load(
+        self,
+        fetch_links: Callable[[], Awaitable[Iterable[EvolutionLink]]],
+        version: int = 0,
+    ) -> None:
+        """Build index from fetched links unless a write raced with the fetch
+
+        version is the stored graph version read before the fetch.
+        """
+        async with self._lock:
+            if self.loaded:
+                return
+            epoch = self._epoch
+            links = await fetch_links()
+            if epoch == self._epoch:
+                self.build(links)
+                self.version = version
+
+    def follow(self, version: Optional[int]) -> None:
+        """Move to the version of a commit whose changes were just applied
+
+        A gap means another process committed in between, the index is
+        dropped and rebuilt on next read.
+        """
+        if not self.loaded or version is None:
+            return
+        if version == self.version + 1:
+            self.version = version
+        elif version > self.version:
+            self.invalidate()
+
+    def invalidate(self) -> None:
+        """Drop index contents, next read rebuilds it"""
+        self._epoch += 1
+        self.loaded = False
+
+    def _all_edges(self) -> Iterator[Tuple[int, int, int, int]]:
+        for from_id in range(len(self._forward.offsets) - 1):
+            for link_id, to_id, type_id in self._forward.edges(from_id):
+                if link_id not in self._removed:
+                    yield from_id, to_id, link_id, type_id
+        for link_id, (from_id, to_id, type_id) in self._added.items():
+            yield from_id, to_id, link_id, type_id
+
+    def _compact(self) -> None:
+        self._reset(list(self._all_edges()))
+
+    def _maybe_compact(self) -> None:
+        if len(self._added) + len(self._removed) > max(self.compact_threshold, self._base_count // 8):
+            self._compact()
+
+    def add_link(self, link: EvolutionLink) -> None:
+        """Register a committed link"""
+        if not self.loaded:
+            self.invalidate()
+            return
+        type_id = self._intern(link.type)
+        self._added[link.id] = (link.from_id, link.to_id, type_id)
+        self._added_forward.setdefault(link.from_id, []).append((link.id, link.to_id, type_id))
+        self._added_reverse.setdefault(link.to_id, []).append((link.id, link.from_id, type_id))
+        if self._order is not None and not self._order.insert(link.from_id, link.to_id):
+            self._order = None
+            self._cyclic = True
+        self._maybe_compact()
+
+    def remove_link(self, link_id: int) -> None:
+        """Forget a deleted link"""
+        if not self.loaded:
+            self.invalidate()
+            return
+        added = self._added.pop(link_id, None)
+        if added is None:
+            self._removed.add(link_id)
+        else:
+            from_id, to_id, _ = added
+            self._added_forward[from_id] = [e for e in self._added_forward[from_id] if e[0] != link_id]
+            self._added_reverse[to_id] = [e for e in self._added_reverse[to_id] if e[0] != link_id]
+        # Removing a link keeps an order valid but may break the last cycle
+        self._cyclic = False
+        self._maybe_compact()
+
+    def remove_mechanic(self, mechanic_id: int) -> None:
+        """Forget every link touching a deleted mechanic"""
+        if not self.loaded:
+            self.invalidate()
+            return
+        for reverse in (False, True):
+            for link_id, _, _ in list(self._edges(mechanic_id, reverse)):
+                self.remove_link(link_id)
+
+    def _edges(self, node: int, reverse: bool) -> Iterator[Edge]:
+        adjacency = self._reverse if reverse else self._forward
+        added = self._added_reverse if reverse else self._added_forward
+        if self._removed:
+            for edge in adjacency.edges(node):
+                if edge[0] not in self._removed:
+                    yield edge
+        else:
+            yield from adjacency.edges(node)
+        yield from added.get(node, ())
+
+    def links(self, mechanic_id: int, reverse: bool = False) -> List[EvolutionLink]:
+        """Outgoing links of a mechanic, incoming ones when reverse"""
+        result = []
+        for link_id, other, type_id in self._edges(mechanic_id, reverse):
+            from_id, to_id = (other, mechanic_id) if reverse else (mechanic_id, other)
+            result.append(
+                EvolutionLink(id=link_id, from_id=from_id, to_id=to_id, type=self._types[type_id])
+            )
+        return result
+
+    def degree(self, mechanic_id: int, reverse: bool = False) -> int:
+        """Number of links leaving a mechanic, entering it when reverse"""
+        return sum(1 for _ in self._edges(mechanic_id, reverse))
+
+    def creates_cycle(self, from_id: int, to_id: int) -> bool:
+        """Whether adding a link from_id -> to_id would close a cycle
+
+        While the graph is acyclic this consults the maintained topological
+        order and only searches the mechanics ordered between the two ends.
+        A graph that already has cycles falls back to a reachability walk.
+        """
+        if from_id == to_id:
+            return True
+        order = self._topological_order()
+        if order is not None:
+            return order.creates_cycle(from_id, to_id)
+        return from_id in self.walk(to_id)
+
+    def _topological_order(self) -> Optional["TopologicalOrder"]:
+        if self._order is None and not self._cyclic:
+            self._order = TopologicalOrder.build(
+                [(f, t) for f, t, _, _ in self._all_edges()],
+                lambda node, reverse: [other for _, other, _ in self._edges(node, reverse)],
+            )
+            self._cyclic = self._order is None
+        return self._order
+
+    def walk(
+        self,
+        root_id: int,
+        reverse: bool = False,
+        max_depth: Optional[int] = None,
+        max_nodes: Optional[int] = None,
+    ) -> Dict[int, int]:
+        """Depth of every mechanic reachable from root, see breadth_first"""
+        return breadth_first(
+            root_id,
+            lambda node: [other for _, other, _ in self._edges(node, reverse)],
+            max_depth,
+            max_nodes,
+        )
+
+
+def breadth_first(
+    root_id: int,
+    neighbours: Callable[[int], Iterable[int]],
+    max_depth: Optional[int] = None,
+    max_nodes: Optional[int] = None,
+) -> Dict[int, int]:
+    """Depth of every mechanic reached from root
+
+    Levels are visited in mechanic id order, so when max_nodes cuts a level
+    the mechanics with the lowest ids are kept whatever the storage order.
+    """
+    depths = {root_id: 0}
+    level = [root_id]
+    depth = 0
+    while level and (max_depth is None or depth < max_depth):
+        depth += 1
+        found = sorted({n for node in level for n in neighbours(node) if n not in depths})
+        if max_nodes is not None:
+            found = found[:max(max_nodes - len(depths), 0)]
+        for node in found:
+            depths[node] = depth
+        level = found
+    return depths
+
+
+class TopologicalOrder:
+    """Dynamic topological order of an acyclic graph (Pearce-Kelly)
+
+    Every mechanic with links has a position and all links point from a lower
+    position to a higher one. Inserting a link that already agrees with the
+    order costs nothing, otherwise only the mechanics positioned between its
+    two ends are searched and their positions shuffled among themselves.
+    """
+
+    def __init__(self, neighbours: Callable[[int, bool], Iterable[int]]):
+        self._neighbours = neighbours
+        self._position: Dict[int, int] = {}
+        self._next = 0
+
+    @classmethod
+    def build(
+        cls,
+        edges: List[Tuple[int, int]],
+        neighbours: Callable[[int, bool], Iterable[int]],
+    ) -> Optional["TopologicalOrder"]:
+        """Order the graph with Kahn's algorithm, None if it has a cycle"""
+        order = cls(neighbours)
+        in_degree: Dict[int, int] = {}
+        targets: Dict[int, List[int]] = {}
+        for from_id, to_id in edges:
+            in_degree.setdefault(from_id, 0)
+            in_degree[to_id] = in_degree.get(to_id, 0) + 1
+            targets.setdefault(from_id, []).append(to_id)
+
+        ready = deque(sorted(n for n, d in in_degree.items() if d == 0))
+        while ready:
+            node = ready.popleft()
+            order._place(node)
+            for other in targets.get(node, ()):
+                in_degree[other] -= 1
+                if in_degree[other] == 0:
+                    ready.append(other)
+        if len(order._position) < len(in_degree):
+            return None
+        return order
+
+    def _place(self, node: int) -> int:
+        position = self._position.get(node)
+        if position is None:
+            position = self._position[node] = self._next
+            self._next += 1
+        return position
+
+    def _affected(self, from_id: int, to_id: int) -> Optional[List[int]]:
+        """Mechanics reachable from to_id and ordered before from_id
+
+        None when from_id is among them, i.e. the link closes a cycle.
+        """
+        upper = self._position[from_id]
+        found = [to_id]
+        seen = {to_id}
+        stack = [to_id]
+        while stack:
+            for other in self._neighbours(stack.pop(), False):
+                if other == from_id:
+                    return None
+                if other not in seen and self._position[other] < upper:
+                    seen.add(other)
+                    found.append(other)
+                    stack.append(other)
+        return found
+
+    def creates_cycle(self, from_id: int, to_id: int) -> bool:
+        """Whether a link from_id -> to_id would close a cycle"""
+        if from_id == to_id:
+            return True
+        if from_id not in self._position or to_id not in self._position:
+            return False
+        if self._position[from_id] < self._position[to_id]:
+            return False
+        return self._affected(from_id, to_id) is None
+
+    def insert(self, from_id: int, to_id: int) -> bool:
+        """Account for a new link, False if it closed a cycle"""
+        if from_id == to_id:
+            return False
+        upper = self._place(from_id)
+        lower = self._place(to_id)
+        if upper < lower:
+            return True
+
+        forward = self._affected(from_id, to_id)
+        if forward is None:
+            return False
+
+        backward = [from_id]
+        seen = {from_id}
+        stack = [from_id]
+        while stack:
+            for other in self._neighbours(stack.pop(), True):
+                if other not in seen and self._position[other] > lower:
+                    seen.add(other)
+                    backward.append(other)
+                    stack.append(other)
+
+        by_position = lambda node: self._position[node]
+        nodes = sorted(backward, key=by_position) + sorted(forward, key=by_position)
+        slots = sorted(self._position[node] for node in nodes)
+        for node, slot in zip(nodes, slots):
+            self._position[node] = slot
+        return True
+
+
+_indexes: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+def get_graph_index(session: AsyncSession) -> Optional[LinkGraphIndex]:
+    """Get the link graph index of the database the session is bound to"""
+    if session.bind is None:
+        return None
+    engine = session.bind.sync_engine
+    index = _indexes.get(engine)
+    if index is None:
+        index = _indexes[engine] = LinkGraphIndex()
+    return index
+
+
+@event.listens_for(Session, "after_commit")
+def _follow_graph_version(session: Session) -> None:
+    """Move the index to the version a commit wrote
+
+    Runs in the same synchronous step as the on_commit hooks that apply the
+    commit's link changes, so no read sees one without the other.
+    """
+    version = committed_graph_version(session)
+    index = _indexes.get(session.bind) if version is not None else None
+    if index is not None:
+        index.follow(version)
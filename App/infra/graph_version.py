@@ -0,0 +1,101 @@
+import itertools
+import weakref
+from typing import NamedTuple, Optional
+
+from sqlalchemy import event, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, SessionTransaction
+
+from app.infra.database.models import GraphVersionDB
+
+# session.info key marking a transaction that changed mechanics or links
+_CHANGED = "graph_changed"
+# session.info key of the version written by the commit in progress
+_COMMITTED = "committed_graph_version"
+# session.info key of the version read in the current transaction
+_READ = "read_graph_version"
+
+_CURRENT = select(GraphVersionDB.version).where(GraphVersionDB.id == 1)
+_LOCK = _CURRENT.with_for_update()
+_BUMP = (
+    update(GraphVersionDB)
+    .where(GraphVersionDB.id == 1)
+    .values(version=GraphVersionDB.version + 1)
+    .returning(GraphVersionDB.version)
+)
+
+# Process-local database ids keep in-memory entries of different databases apart
+_sequence = itertools.count(1)
+_databases: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+class GraphVersion(NamedTuple):
+    """Stored graph version of one database"""
+    database: int
+    version: int
+
+
+def database_id(session: AsyncSession) -> int:
+    """Process-local id of the database the session is bound to"""
+    engine = session.bind.sync_engine
+    database = _databases.get(engine)
+    if database is None:
+        database = _databases[engine] = next(_sequence)
+    return database
+
+
+async def get_graph_version(session: AsyncSession, fresh: bool = False) -> GraphVersion:
+    """Get the committed graph version of the session's database
+
+    The version is a row in the database, bumped by every transaction
+    that writes mechanics or links, so writes of other workers and of the
+    CLI change it as well. Reading it is one primary key lookup, done once
+    per transaction unless fresh asks for the latest value again.
+    """
+    if session.bind is None:
+        return GraphVersion(0, 0)
+    if not fresh and _READ in session.info:
+        return session.info[_READ]
+    version = (await session.execute(_CURRENT)).scalar()
+    graph_version = session.info[_READ] = GraphVersion(database_id(session), version or 0)
+    return graph_version
+
+
+async def lock_graph_version(session: AsyncSession) -> bool:
+    """Lock the stored graph version row until the transaction ends
+
+    Writers of every process that take the lock are serialized on it.
+    SQLite has no row locks, False tells the caller to lock in process.
+    """
+    if session.bind.dialect.name != "postgresql":
+        return False
+    version = (await session.execute(_LOCK)).scalar()
+    session.info[_READ] = GraphVersion(database_id(session), version or 0)
+    return True
+
+
+def bump_graph_version(session: AsyncSession) -> None:
+    """Bump the stored graph version when the session's transaction commits
+
+    The row is updated right before COMMIT, which keeps its row lock short.
+    """
+    session.info[_CHANGED] = True
+
+
+def committed_graph_version(session: AsyncSession) -> Optional[int]:
+    """Version written by the commit in progress, for on_commit hooks"""
+    return session.info.get(_COMMITTED)
+
+
+@event.listens_for(Session, "before_commit")
+def _write_graph_version(session: Session) -> None:
+    if session.info.pop(_CHANGED, False):
+        session.info[_COMMITTED] = session.execute(_BUMP).scalar()
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _drop_graph_version(session: Session, transaction: SessionTransaction) -> None:
+    if transaction.parent is None:
+        session.info.pop(_CHANGED, None)
+        session.info.pop(_COMMITTED, None)
+        session.info.pop(_READ, None)
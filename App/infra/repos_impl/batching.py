@@ -0,0 +1,295 @@
+import asyncio
+from collections import defaultdict
+from typing import AsyncIterable, AsyncIterator, Awaitable, Callable, Dict, Generic, Hashable, List, Optional, Sequence, Tuple, TypeVar
+
+from app.entities.mechanic import GameMechanic
+from app.entities.link import EvolutionLink
+from app.entities.graph import MechanicGraph
+from app.entities.link_import import LinkImportReport, LinkImportRow
+from app.interfaces.repos.mechanic_repo import IMechanicRepository
+from app.interfaces.repos.link_repo import ILinkRepository
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class BatchLoader(Generic[K, V]):
+    """DataLoader-style coalescing of single-key loads
+
+    Keys requested during the same event-loop tick are collected and fetched
+    with one call of batch_fn, results are memoized for the loader lifetime.
+    With max_size the oldest resolved keys are dropped beyond that many, so
+    long walks keep flat memory and only reload keys they come back to.
+    Loaders sharing a session must share the lock, an AsyncSession does not
+    allow concurrent statements.
+    """
+
+    def __init__(
+        self,
+        batch_fn: Callable[[List[K]], Awaitable[Dict[K, V]]],
+        lock: Optional[asyncio.Lock] = None,
+        default: Callable[[], V] = lambda: None,
+        max_size: Optional[int] = None,
+    ):
+        self._batch_fn = batch_fn
+        self._lock = lock or asyncio.Lock()
+        self._default = default
+        self._max_size = max_size
+        self._memo: Dict[K, asyncio.Future] = {}
+        self._pending: List[Tuple[K, asyncio.Future]] = []
+        self._tasks: set = set()
+
+    def _enqueue(self, key: K) -> asyncio.Future:
+        future = self._memo.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = self._memo[key] = loop.create_future()
+            if not self._pending:
+                loop.call_soon(self._dispatch)
+            self._pending.append((key, future))
+            self._evict()
+        return future
+
+    async def load(self, key: K) -> V:
+        """Load one key, batched with other loads of this tick"""
+        return await self._enqueue(key)
+
+    async def load_many(self, keys: Sequence[K]) -> List[V]:
+        """Load several keys in one batch"""
+        return list(await asyncio.gather(*(self._enqueue(key) for key in keys)))
+
+    def prime(self, key: K, value: V) -> None:
+        """Memoize a value that is already known"""
+        self.clear(key)
+        future = asyncio.get_running_loop().create_future()
+        future.set_result(value)
+        self._memo[key] = future
+        self._evict()
+
+    def clear(self, key: Optional[K] = None) -> None:
+        """Forget one memoized key, or all of them"""
+        if key is None:
+            self._memo.clear()
+        else:
+            self._memo.pop(key, None)
+
+    def _evict(self) -> None:
+        """Drop the oldest resolved keys while the memo is over max_size"""
+        if self._max_size is None or len(self._memo) <= self._max_size:
+            return
+        excess = len(self._memo) - self._max_size
+        for key in [key for key, future in self._memo.items() if future.done()][:excess]:
+            del self._memo[key]
+
+    def _dispatch(self) -> None:
+        batch, self._pending = self._pending, []
+        task = asyncio.ensure_future(self._run(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: List[Tuple[K, asyncio.Future]]) -> None:
+        try:
+            async with self._lock:
+                values = await self._batch_fn([key for key, _ in batch])
+        except Exception as exc:
+            for key, future in batch:
+                if self._memo.get(key) is future:
+                    del self._memo[key]
+                if not future.done():
+                    future.set_exception(exc)
+            return
+
+        for key, future in batch:
+            if not future.done():
+                future.set_result(values[key] if key in values else self._default())
+
+
+class BatchingMechanicRepository(IMechanicRepository):
+    """Request-scoped mechanic repository that batches lookups by id
+
+    Deleting a mechanic cascades to its links, so the link repository of
+    the same request forgets its memoized links too.
+    """
+
+    def __init__(
+        self,
+        inner: IMechanicRepository,
+        lock: Optional[asyncio.Lock] = None,
+        links: Optional["BatchingLinkRepository"] = None,
+        memo_size: Optional[int] = None,
+    ):
+        self.inner = inner
+        self._links = links
+        self._loader: BatchLoader[int, Optional[GameMechanic]] = BatchLoader(
+            self._load, lock, max_size=memo_size
+        )
+
+    async def _load(self, ids: List[int]) -> Dict[int, GameMechanic]:
+        return {m.id: m for m in await self.inner.get_many(ids)}
+
+    async def create(self, mechanic: GameMechanic) -> GameMechanic:
+        """Create new mechanic"""
+        created = await self.inner.create(mechanic)
+        self._loader.prime(created.id, created)
+        return created
+
+    async def create_many(self, mechanics: Sequence[GameMechanic]) -> List[GameMechanic]:
+        """Create mechanics in one transaction, returned in input order"""
+        created = await self.inner.create_many(mechanics)
+        for mechanic in created:
+            self._loader.prime(mechanic.id, mechanic)
+        return created
+
+    async def get_by_id(self, id: int) -> Optional[GameMechanic]:
+        """Get mechanic by id"""
+        return await self._loader.load(id)
+
+    async def get_many(
+        self, ids: Sequence[int], fields: Optional[Sequence[str]] = None
+    ) -> List[GameMechanic]:
+        """Get existing mechanics with given ids ordered by id
+
+        Sparse reads bypass the loader, its cache holds whole mechanics.
+        """
+        if fields is not None:
+            return await self.inner.get_many(ids, fields)
+        mechanics = await self._loader.load_many(sorted(set(ids)))
+        return [m for m in mechanics if m is not None]
+
+    async def list_all(self) -> List[GameMechanic]:
+        """Get all mechanics"""
+        return await self.inner.list_all()
+
+    async def list_page(
+        self,
+        after: Optional[int] = None,
+        limit: int = 100,
+        fields: Optional[Sequence[str]] = None,
+    ) -> List[GameMechanic]:
+        """Get up to limit mechanics with id greater than after, ordered by id"""
+        return await self.inner.list_page(after, limit, fields)
+
+    def iter_all(self, batch_size: int = 1000) -> AsyncIterator[GameMechanic]:
+        """Iterate over all mechanics in id order, fetching one page at a time"""
+        return self.inner.iter_all(batch_size)
+
+    async def update(self, mechanic: GameMechanic) -> GameMechanic:
+        """Update existing mechanic"""
+        self._loader.clear(mechanic.id)
+        updated = await self.inner.update(mechanic)
+        self._loader.prime(updated.id, updated)
+        return updated
+
+    async def delete(self, id: int) -> bool:
+        """Delete mechanic by id"""
+        self._loader.clear(id)
+        deleted = await self.inner.delete(id)
+        if self._links is not None:
+            self._links.forget()
+        return deleted
+
+
+class BatchingLinkRepository(ILinkRepository):
+    """Request-scoped link repository that batches lookups by endpoint"""
+
+    def __init__(
+        self,
+        inner: ILinkRepository,
+        lock: Optional[asyncio.Lock] = None,
+        memo_size: Optional[int] = None,
+    ):
+        self.inner = inner
+        self._from_loader: BatchLoader[int, List[EvolutionLink]] = BatchLoader(
+            self._load_from, lock, default=list, max_size=memo_size
+        )
+        self._to_loader: BatchLoader[int, List[EvolutionLink]] = BatchLoader(
+            self._load_to, lock, default=list, max_size=memo_size
+        )
+
+    async def _load_from(self, ids: List[int]) -> Dict[int, List[EvolutionLink]]:
+        grouped = defaultdict(list)
+        for link in await self.inner.list_by_from_ids(ids):
+            grouped[link.from_id].append(link)
+        return grouped
+
+    async def _load_to(self, ids: List[int]) -> Dict[int, List[EvolutionLink]]:
+        grouped = defaultdict(list)
+        for link in await self.inner.list_by_to_ids(ids):
+            grouped[link.to_id].append(link)
+        return grouped
+
+    def forget(self) -> None:
+        """Drop memoized links after writes that change them"""
+        self._from_loader.clear()
+        self._to_loader.clear()
+
+    async def create(self, link: EvolutionLink) -> EvolutionLink:
+        """Create new link"""
+        created = await self.inner.create(link)
+        self.forget()
+        return created
+
+    async def import_links(self, batches: AsyncIterable[List[LinkImportRow]]) -> LinkImportReport:
+        """Insert streamed batches of links in one transaction"""
+        report = await self.inner.import_links(batches)
+        self.forget()
+        return report
+
+    async def get_by_id(self, id: int) -> Optional[EvolutionLink]:
+        """Get link by id"""
+        return await self.inner.get_by_id(id)
+
+    async def list_all(self) -> List[EvolutionLink]:
+        """Get all links"""
+        return await self.inner.list_all()
+
+    async def list_page(self, after: Optional[int] = None, limit: int = 100) -> List[EvolutionLink]:
+        """Get up to limit links with id greater than after, ordered by id"""
+        return await self.inner.list_page(after, limit)
+
+    def iter_all(self, batch_size: int = 1000) -> AsyncIterator[EvolutionLink]:
+        """Iterate over all links in id order, fetching one page at a time"""
+        return self.inner.iter_all(batch_size)
+
+    async def list_by_from_id(self, from_id: int) -> List[EvolutionLink]:
+        """Get all links from mechanic"""
+        return list(await self._from_loader.load(from_id))
+
+    async def list_by_to_id(self, to_id: int) -> List[EvolutionLink]:
+        """Get all links into mechanic"""
+        return list(await self._to_loader.load(to_id))
+
+    async def list_by_from_ids(self, from_ids: Sequence[int]) -> List[EvolutionLink]:
+        """Get all links from any of the mechanics"""
+        groups = await self._from_loader.load_many(sorted(set(from_ids)))
+        return sorted((l for group in groups for l in group), key=lambda l: l.id)
+
+    async def list_by_to_ids(self, to_ids: Sequence[int]) -> List[EvolutionLink]:
+        """Get all links into any of the mechanics"""
+        groups = await self._to_loader.load_many(sorted(set(to_ids)))
+        return sorted((l for group in groups for l in group), key=lambda l: l.id)
+
+    async def get_subgraph(
+        self,
+        root_id: int,
+        max_depth: Optional[int] = None,
+        max_nodes: Optional[int] = None,
+        reverse: bool = False,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Optional[MechanicGraph]:
+        """Get mechanics reachable from root with all their outgoing links"""
+        return await self.inner.get_subgraph(root_id, max_depth, max_nodes, reverse, fields)
+
+    async def would_create_cycle(self, from_id: int, to_id: int) -> bool:
+        """Check whether a link from_id -> to_id would close a cycle"""
+        return await self.inner.would_create_cycle(from_id, to_id)
+
+    async def lock_graph(self) -> bool:
+        """Serialize cycle checks with other processes until commit"""
+        return await self.inner.lock_graph()
+
+    async def delete(self, id: int) -> bool:
+        """Delete link by id"""
+        deleted = await self.inner.delete(id)
+        self.forget()
+        return deleted
@@ -1,10 +1,85 @@
-from typing import List, Optional
-from sqlalchemy import select
+from collections import defaultdict
+from typing import AsyncIterable, AsyncIterator, List, Optional, Sequence
+from sqlalchemy import Column, Integer, MetaData, Table, Text, and_, bindparam, case, exists, func, insert, literal, select, tuple_
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
 
 from app.entities.link import EvolutionLink
-from app.infra.database.models import LinkDB
-from app.interfaces.repos.link_repo import ILinkRepository
+from app.entities.link_import import LinkImportReport, LinkImportRow, RejectedLink
+from app.entities.graph import MechanicGraph
+from app.infra.config import settings
+from app.infra.database.models import LinkDB, MechanicDB
+from app.infra.database.routing import primary_reads, use_primary
+from app.infra.database.unit_of_work import has_pending_commit, on_commit
+from app.infra.graph_version import bump_graph_version, get_graph_version, lock_graph_version
+from app.infra.graph_index import LinkGraphIndex, breadth_first, get_graph_index
+from app.infra.repos_impl.mechanic_repo_impl import (
+    IN_BATCH_SIZE,
+    MechanicRepository,
+    mechanic_columns,
+    sparse_mechanic,
+)
+from app.interfaces.repos.link_repo import DuplicateLinkError, ILinkRepository, UnknownMechanicError
+
+
+LINK_TYPE_MAX_LENGTH = LinkDB.__table__.c.type.type.length
+
+# Read paths select plain column rows, the ORM only loads rows it writes
+LINK_COLUMNS = (LinkDB.id, LinkDB.from_id, LinkDB.to_id, LinkDB.type)
+
+# Hot lookups are built once, see mechanic_repo_impl
+_BY_ID = select(*LINK_COLUMNS).where(LinkDB.id == bindparam("id"))
+_BY_FROM_ID = select(*LINK_COLUMNS).where(LinkDB.from_id == bindparam("id"))
+_BY_TO_ID = select(*LINK_COLUMNS).where(LinkDB.to_id == bindparam("id"))
+_BY_FROM_IDS = select(*LINK_COLUMNS).where(LinkDB.from_id.in_(bindparam("ids", expanding=True)))
+_BY_TO_IDS = select(*LINK_COLUMNS).where(LinkDB.to_id.in_(bindparam("ids", expanding=True)))
+
+# Session-local table the COPY import lands in before the merge
+_import_staging = Table(
+    "link_import_staging",
+    MetaData(),
+    Column("line", Integer),
+    Column("from_id", Integer),
+    Column("to_id", Integer),
+    Column("type", Text),
+    prefixes=["TEMPORARY"],
+    postgresql_on_commit="DROP",
+)
+
+
+def _insert_link(session: AsyncSession, link: EvolutionLink):
+    """INSERT of link that skips unknown mechanics and existing links"""
+    dialect_insert = postgresql.insert if session.bind.dialect.name == "postgresql" else sqlite.insert
+    endpoints = select(
+        literal(link.from_id, Integer), literal(link.to_id, Integer), literal(link.type, Text)
+    ).where(
+        exists().where(MechanicDB.id == link.from_id),
+        exists().where(MechanicDB.id == link.to_id),
+    )
+    return (
+        dialect_insert(LinkDB)
+        .from_select(["from_id", "to_id", "type"], endpoints)
+        .on_conflict_do_nothing(index_elements=["from_id", "to_id", "type"])
+        .returning(LinkDB.id)
+    )
+
+
+def _reject_reason(row: LinkImportRow, existing_ids: set, existing_links: set) -> Optional[str]:
+    """Why an import row cannot become a link, None if it can"""
+    if row.from_id not in existing_ids:
+        return "unknown from_id"
+    if row.to_id not in existing_ids:
+        return "unknown to_id"
+    if row.from_id == row.to_id:
+        return "self-link"
+    if not row.type or not row.type.strip():
+        return "empty type"
+    if len(row.type) > LINK_TYPE_MAX_LENGTH:
+        return f"type longer than {LINK_TYPE_MAX_LENGTH} characters"
+    if (row.from_id, row.to_id, row.type) in existing_links:
+        return "duplicate link"
+    return None
 
 
 class LinkRepository(ILinkRepository):
@@ -13,27 +88,192 @@ class LinkRepository(ILinkRepository):
     def __init__(self, session: AsyncSession):
         self.session = session
 
+    async def _graph_index(self) -> Optional[LinkGraphIndex]:
+        """Get loaded link graph index, None when it is disabled
+
+        The index only reflects committed links, a session with uncommitted
+        writes reads from the database to see its own changes. The stored
+        graph version is read once per transaction. An index ahead of it
+        holds writes the session's snapshot, e.g. on a lagging replica, does
+        not see yet. An index behind it missed writes of another process and
+        is rebuilt from the primary, at most every GRAPH_INDEX_REBUILD_SECONDS
+        as a rebuild reads every link. Otherwise the session reads the
+        database.
+        """
+        if not settings.GRAPH_INDEX_ENABLED or has_pending_commit(self.session):
+            return None
+        index = get_graph_index(self.session)
+        if index is None:
+            return None
+        version = (await get_graph_version(self.session)).version
+        if index.loaded and index.version >= version:
+            return index if index.version == version else None
+        if not index.may_rebuild(settings.GRAPH_INDEX_REBUILD_SECONDS):
+            return None
+        index.invalidate()
+        with primary_reads(self.session):
+            loaded_version = (await get_graph_version(self.session, fresh=True)).version
+            await index.load(lambda: self._collect(self.iter_all()), loaded_version)
+        return index if index.loaded and index.version == version else None
+
+    @staticmethod
+    async def _collect(links: AsyncIterator[EvolutionLink]) -> List[EvolutionLink]:
+        return [link async for link in links]
+
     async def create(self, link: EvolutionLink) -> EvolutionLink:
-        """Create new link"""
-        db_link = LinkDB(
-            from_id=link.from_id,
-            to_id=link.to_id,
-            type=link.type
+        """Create new link, raising DuplicateLinkError if it already exists
+
+        One INSERT ... SELECT inserts the link only if both mechanics exist
+        and it does not conflict with uq_links_from_id_to_id_type, no row
+        comes back otherwise. Nothing fails in the database, so the
+        transaction stays usable, and the reason is looked up only then.
+        """
+        row = (await self.session.execute(_insert_link(self.session, link))).first()
+        if row is None:
+            endpoints = {link.from_id, link.to_id}
+            found = await self.session.execute(select(MechanicDB.id).where(MechanicDB.id.in_(endpoints)))
+            missing = endpoints.difference(found.scalars())
+            if missing:
+                raise UnknownMechanicError(f"Mechanic {min(missing)} not found")
+            raise DuplicateLinkError(
+                f"Link {link.from_id} -> {link.to_id} of type {link.type!r} already exists"
+            )
+        bump_graph_version(self.session)
+
+        created = EvolutionLink(id=row.id, from_id=link.from_id, to_id=link.to_id, type=link.type)
+        index = get_graph_index(self.session)
+        if index is not None:
+            on_commit(self.session, lambda: index.add_link(created))
+        return created
+
+    async def import_links(self, batches: AsyncIterable[List[LinkImportRow]]) -> LinkImportReport:
+        """Insert streamed batches of links in the current transaction
+
+        On PostgreSQL batches are COPYed into a temporary staging table and
+        validated and merged into links by single statements. Other databases
+        validate each batch against the mechanics table and insert it with
+        executemany. The graph index is rebuilt on next use after commit.
+        """
+        if self.session.bind.dialect.name == "postgresql":
+            report = await self._import_with_copy(batches)
+        else:
+            report = await self._import_with_executemany(batches)
+        bump_graph_version(self.session)
+
+        index = get_graph_index(self.session)
+        if index is not None:
+            on_commit(self.session, index.invalidate)
+        return report
+
+    async def _import_with_copy(self, batches: AsyncIterable[List[LinkImportRow]]) -> LinkImportReport:
+        """COPY batches into staging, then reject and merge in one statement each"""
+        connection = await self.session.connection()
+        await connection.run_sync(_import_staging.create)
+        raw = await connection.get_raw_connection()
+        columns = ["line", "from_id", "to_id", "type"]
+        async for batch in batches:
+            await raw.driver_connection.copy_records_to_table(
+                _import_staging.name,
+                records=[(r.line, r.from_id, r.to_id, r.type) for r in batch],
+                columns=columns,
+            )
+
+        staged = _import_staging.c
+        source = aliased(MechanicDB)
+        target = aliased(MechanicDB)
+        # Earlier lines of the same import win over later copies of a link
+        copy_number = func.row_number().over(
+            partition_by=(staged.from_id, staged.to_id, staged.type), order_by=staged.line
         )
-        self.session.add(db_link)
-        await self.session.commit()
-        await self.session.refresh(db_link)
-        
-        return EvolutionLink(
-            id=db_link.id,
-            from_id=db_link.from_id,
-            to_id=db_link.to_id,
-            type=db_link.type
+        already_linked = exists().where(
+            and_(
+                LinkDB.from_id == staged.from_id,
+                LinkDB.to_id == staged.to_id,
+                LinkDB.type == staged.type,
+            )
+        )
+        reason = case(
+            (source.id.is_(None), "unknown from_id"),
+            (target.id.is_(None), "unknown to_id"),
+            (staged.from_id == staged.to_id, "self-link"),
+            (func.length(func.trim(func.coalesce(staged.type, ""))) == 0, "empty type"),
+            (
+                func.length(staged.type) > LINK_TYPE_MAX_LENGTH,
+                f"type longer than {LINK_TYPE_MAX_LENGTH} characters",
+            ),
+            (already_linked, "duplicate link"),
+            (copy_number > 1, "duplicate link"),
+        )
+        checked = (
+            select(staged.line, staged.from_id, staged.to_id, staged.type, reason.label("reason"))
+            .outerjoin(source, source.id == staged.from_id)
+            .outerjoin(target, target.id == staged.to_id)
+            .subquery("checked")
+        )
+
+        rejected = await self.session.execute(
+            select(checked.c.line, checked.c.reason)
+            .where(checked.c.reason.is_not(None))
+            .order_by(checked.c.line)
+        )
+        report = LinkImportReport(
+            rejected=[RejectedLink(line=row.line, reason=row.reason) for row in rejected]
+        )
+        merged = await self.session.execute(
+            insert(LinkDB).from_select(
+                ["from_id", "to_id", "type"],
+                select(checked.c.from_id, checked.c.to_id, checked.c.type)
+                .where(checked.c.reason.is_(None))
+                .order_by(checked.c.line),
+            )
         )
+        report.imported = merged.rowcount
+        await connection.run_sync(_import_staging.drop)
+        return report
+
+    async def _import_with_executemany(
+        self, batches: AsyncIterable[List[LinkImportRow]]
+    ) -> LinkImportReport:
+        """Validate each batch in Python and insert it with executemany"""
+        report = LinkImportReport()
+        async for batch in batches:
+            ids = sorted({r.from_id for r in batch} | {r.to_id for r in batch})
+            existing_ids = set()
+            for start in range(0, len(ids), IN_BATCH_SIZE):
+                result = await self.session.execute(
+                    select(MechanicDB.id).where(MechanicDB.id.in_(ids[start:start + IN_BATCH_SIZE]))
+                )
+                existing_ids.update(result.scalars())
+
+            keys = sorted({(r.from_id, r.to_id, r.type) for r in batch})
+            existing_links = set()
+            for start in range(0, len(keys), IN_BATCH_SIZE):
+                result = await self.session.execute(
+                    select(LinkDB.from_id, LinkDB.to_id, LinkDB.type).where(
+                        tuple_(LinkDB.from_id, LinkDB.to_id, LinkDB.type).in_(
+                            keys[start:start + IN_BATCH_SIZE]
+                        )
+                    )
+                )
+                existing_links.update(tuple(row) for row in result)
+
+            accepted = []
+            for row in batch:
+                reason = _reject_reason(row, existing_ids, existing_links)
+                if reason is None:
+                    # Later copies of the row in this import are duplicates
+                    existing_links.add((row.from_id, row.to_id, row.type))
+                    accepted.append({"from_id": row.from_id, "to_id": row.to_id, "type": row.type})
+                else:
+                    report.rejected.append(RejectedLink(line=row.line, reason=reason))
+            if accepted:
+                await self.session.execute(insert(LinkDB), accepted)
+                report.imported += len(accepted)
+        return report
 
     async def get_by_id(self, id: int) -> Optional[EvolutionLink]:
         """Get link by id"""
-        result = await self.session.get(LinkDB, id)
+        result = (await self.session.execute(_BY_ID, {"id": id})).first()
         if not result:
             return None
         
@@ -46,9 +286,9 @@ class LinkRepository(ILinkRepository):
 
     async def list_all(self) -> List[EvolutionLink]:
         """Get all links"""
-        stmt = select(LinkDB)
+        stmt = select(*LINK_COLUMNS)
         result = await self.session.execute(stmt)
-        links = result.scalars().all()
+        links = result.all()
         
         return [
             EvolutionLink(
@@ -60,11 +300,61 @@ class LinkRepository(ILinkRepository):
             for l in links
         ]
 
+    async def list_page(self, after: Optional[int] = None, limit: int = 100) -> List[EvolutionLink]:
+        """Get up to limit links with id greater than after, ordered by id"""
+        stmt = select(*LINK_COLUMNS).order_by(LinkDB.id).limit(limit)
+        if after is not None:
+            stmt = stmt.where(LinkDB.id > after)
+        result = await self.session.execute(stmt)
+
+        return [
+            EvolutionLink(
+                id=l.id,
+                from_id=l.from_id,
+                to_id=l.to_id,
+                type=l.type
+            )
+            for l in result
+        ]
+
+    async def iter_all(self, batch_size: int = 1000) -> AsyncIterator[EvolutionLink]:
+        """Iterate over all links in id order, fetching one page at a time"""
+        after = None
+        while True:
+            page = await self.list_page(after, batch_size)
+            for link in page:
+                yield link
+            if len(page) < batch_size:
+                return
+            after = page[-1].id
+
     async def list_by_from_id(self, from_id: int) -> List[EvolutionLink]:
         """Get links starting from specific mechanic"""
-        stmt = select(LinkDB).where(LinkDB.from_id == from_id)
-        result = await self.session.execute(stmt)
-        links = result.scalars().all()
+        index = await self._graph_index()
+        if index is not None:
+            return sorted(index.links(from_id), key=lambda l: l.id)
+
+        result = await self.session.execute(_BY_FROM_ID, {"id": from_id})
+        links = result.all()
+        
+        return [
+            EvolutionLink(
+                id=l.id,
+                from_id=l.from_id,
+                to_id=l.to_id,
+                type=l.type
+            )
+            for l in links
+        ]
+
+    async def list_by_to_id(self, to_id: int) -> List[EvolutionLink]:
+        """Get links ending at specific mechanic"""
+        index = await self._graph_index()
+        if index is not None:
+            return sorted(index.links(to_id, reverse=True), key=lambda l: l.id)
+
+        result = await self.session.execute(_BY_TO_ID, {"id": to_id})
+        links = result.all()
         
         return [
             EvolutionLink(
@@ -76,6 +366,192 @@ class LinkRepository(ILinkRepository):
             for l in links
         ]
 
+    async def list_by_from_ids(self, from_ids: Sequence[int]) -> List[EvolutionLink]:
+        """Get links starting from any of the mechanics"""
+        return await self._list_by_endpoint(from_ids, reverse=False)
+
+    async def list_by_to_ids(self, to_ids: Sequence[int]) -> List[EvolutionLink]:
+        """Get links ending at any of the mechanics"""
+        return await self._list_by_endpoint(to_ids, reverse=True)
+
+    async def _list_by_endpoint(self, ids: Sequence[int], reverse: bool) -> List[EvolutionLink]:
+        """Get links of many mechanics ordered by id, in batches of IN_BATCH_SIZE"""
+        ids = sorted(set(ids))
+        index = await self._graph_index()
+        if index is not None:
+            links = [l for id in ids for l in index.links(id, reverse)]
+            return sorted(links, key=lambda l: l.id)
+
+        stmt = _BY_TO_IDS if reverse else _BY_FROM_IDS
+        links = []
+        for start in range(0, len(ids), IN_BATCH_SIZE):
+            result = await self.session.execute(stmt, {"ids": ids[start:start + IN_BATCH_SIZE]})
+            links.extend(
+                EvolutionLink(
+                    id=l.id,
+                    from_id=l.from_id,
+                    to_id=l.to_id,
+                    type=l.type
+                )
+                for l in result
+            )
+        return sorted(links, key=lambda l: l.id)
+
+    async def get_subgraph(
+        self,
+        root_id: int,
+        max_depth: Optional[int] = None,
+        max_nodes: Optional[int] = None,
+        reverse: bool = False,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Optional[MechanicGraph]:
+        """Get reachable mechanics and their links in one recursive query
+
+        The walk uses UNION rather than UNION ALL, so every mechanic (or every
+        mechanic and depth pair when the depth is bounded) enters the CTE
+        once and cycles terminate. max_nodes bounds the depth of the walk and
+        the database returns only the nearest max_nodes mechanics with their
+        links. The same statement renders as WITH RECURSIVE on both
+        PostgreSQL and SQLite. When the link graph index is
+        loaded the walk runs in memory and only mechanics are read. With
+        fields only id, name and the listed mechanic columns are selected.
+        """
+        index = await self._graph_index()
+        if index is not None:
+            return await self._get_subgraph_from_index(
+                index, root_id, max_depth, max_nodes, reverse, fields
+            )
+
+        near, far = (LinkDB.to_id, LinkDB.from_id) if reverse else (LinkDB.from_id, LinkDB.to_id)
+        # A mechanic kept under max_nodes is at most max_nodes - 1 links away
+        depth_bound = max_depth
+        if max_nodes is not None:
+            depth_bound = max_nodes - 1 if max_depth is None else min(max_depth, max_nodes - 1)
+        if depth_bound is None:
+            walk = select(literal(root_id).label("id")).cte("walk", recursive=True)
+            walk = walk.union(
+                select(far).join(walk, near == walk.c.id)
+            )
+        else:
+            walk = select(
+                literal(root_id).label("id"), literal(0).label("depth")
+            ).cte("walk", recursive=True)
+            walk = walk.union(
+                select(far, walk.c.depth + 1)
+                .join(walk, near == walk.c.id)
+                .where(walk.c.depth < depth_bound)
+            )
+        if max_nodes is None:
+            reachable = select(walk.c.id).distinct().subquery("reachable")
+        else:
+            # The max_nodes nearest mechanics, a breadth-first prefix of the walk
+            reachable = (
+                select(walk.c.id)
+                .group_by(walk.c.id)
+                .order_by(func.min(walk.c.depth), walk.c.id)
+                .limit(max_nodes)
+                .subquery("reachable")
+            )
+        stmt = (
+            select(
+                *mechanic_columns(fields),
+                LinkDB.id.label("link_id"),
+                far.label("other_id"),
+                LinkDB.type,
+            )
+            .select_from(reachable)
+            .join(MechanicDB, MechanicDB.id == reachable.c.id)
+            .outerjoin(LinkDB, near == MechanicDB.id)
+            .order_by(MechanicDB.id, LinkDB.id)
+        )
+        result = await self.session.execute(stmt)
+
+        mechanics = {}
+        links = []
+        neighbours = defaultdict(list)
+        for row in result:
+            if row.id not in mechanics:
+                mechanics[row.id] = sparse_mechanic(row)
+            if row.link_id is not None:
+                from_id, to_id = (row.other_id, row.id) if reverse else (row.id, row.other_id)
+                links.append(
+                    EvolutionLink(
+                        id=row.link_id,
+                        from_id=from_id,
+                        to_id=to_id,
+                        type=row.type
+                    )
+                )
+                neighbours[row.id].append(row.other_id)
+
+        if root_id not in mechanics:
+            return None
+
+        depths = breadth_first(
+            root_id,
+            lambda node: [n for n in neighbours.get(node, ()) if n in mechanics],
+            max_depth,
+            max_nodes,
+        )
+        return MechanicGraph(
+            root_id=root_id,
+            mechanics={id: m for id, m in mechanics.items() if id in depths},
+            links=[
+                link for link in links
+                if (link.to_id if reverse else link.from_id) in depths
+            ],
+            depths=depths,
+        )
+
+    async def _get_subgraph_from_index(
+        self,
+        index: LinkGraphIndex,
+        root_id: int,
+        max_depth: Optional[int],
+        max_nodes: Optional[int],
+        reverse: bool,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Optional[MechanicGraph]:
+        """Walk the in-memory index and load reached mechanics by id"""
+        depths = index.walk(root_id, reverse, max_depth, max_nodes)
+        mechanics = await MechanicRepository(self.session).get_many(list(depths), fields)
+        graph = MechanicGraph(root_id=root_id, mechanics={m.id: m for m in mechanics})
+        if root_id not in graph.mechanics:
+            return None
+        for mechanic_id in graph.mechanics:
+            graph.depths[mechanic_id] = depths[mechanic_id]
+            graph.links.extend(sorted(index.links(mechanic_id, reverse), key=lambda l: l.id))
+        return graph
+
+    async def would_create_cycle(self, from_id: int, to_id: int) -> bool:
+        """Check whether a link from_id -> to_id would close a cycle
+
+        Uses the topological order kept by the graph index, without the
+        index it walks forward from to_id in a recursive query. Both read
+        the primary, the check guards a write and a replica may lag.
+        """
+        if from_id == to_id:
+            return True
+        use_primary(self.session)
+        index = await self._graph_index()
+        if index is not None:
+            return index.creates_cycle(from_id, to_id)
+
+        walk = select(literal(to_id).label("id")).cte("walk", recursive=True)
+        walk = walk.union(
+            select(LinkDB.to_id).join(walk, LinkDB.from_id == walk.c.id)
+        )
+        stmt = select(walk.c.id).where(walk.c.id == from_id).limit(1)
+        result = await self.session.execute(stmt)
+        return result.first() is not None
+
+    async def lock_graph(self) -> bool:
+        """Serialize cycle checks with other processes until commit
+
+        Locks the stored graph version row FOR UPDATE on PostgreSQL.
+        """
+        return await lock_graph_version(self.session)
+
     async def delete(self, id: int) -> bool:
         """Delete link by id"""
         db_link = await self.session.get(LinkDB, id)
@@ -83,5 +559,10 @@ class LinkRepository(ILinkRepository):
             return False
         
         await self.session.delete(db_link)
-        await self.session.commit()
+        await self.session.flush()
+        bump_graph_version(self.session)
+
+        index = get_graph_index(self.session)
+        if index is not None:
+            on_commit(self.session, lambda: index.remove_link(id))
         return True
@@ -1,11 +1,62 @@
-from typing import List, Optional
-from sqlalchemy import select
+from functools import lru_cache
+from typing import AsyncIterator, List, Optional, Sequence, Tuple
+from sqlalchemy import bindparam, insert, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.entities.mechanic import GameMechanic
 from app.infra.database.models import MechanicDB
+from app.infra.database.unit_of_work import on_commit
+from app.infra.graph_version import bump_graph_version
+from app.infra.graph_index import get_graph_index
 from app.interfaces.repos.mechanic_repo import IMechanicRepository
 
+# Upper bound of ids bound into a single IN (...) clause
+IN_BATCH_SIZE = 500
+
+# Read paths select plain column rows, the ORM only loads rows it writes
+MECHANIC_COLUMNS = (MechanicDB.id, MechanicDB.name, MechanicDB.description, MechanicDB.year)
+
+# Hot lookups are built once, each call only binds parameters and the
+# memoized cache key finds the compiled form in the engine's cache
+_BY_ID = select(*MECHANIC_COLUMNS).where(MechanicDB.id == bindparam("id"))
+_BY_IDS = (
+    select(*MECHANIC_COLUMNS)
+    .where(MechanicDB.id.in_(bindparam("ids", expanding=True)))
+    .order_by(MechanicDB.id)
+)
+
+# Columns every sparse read keeps, a GameMechanic cannot be built without them
+REQUIRED_FIELDS = ("id", "name")
+
+
+def mechanic_columns(fields: Optional[Sequence[str]] = None) -> Tuple:
+    """Columns to select for the requested fields, all of them for None"""
+    if fields is None:
+        return MECHANIC_COLUMNS
+    wanted = set(fields).union(REQUIRED_FIELDS)
+    return tuple(column for column in MECHANIC_COLUMNS if column.key in wanted)
+
+
+@lru_cache(maxsize=None)
+def _by_ids(keys: Tuple[str, ...]):
+    """Prebuilt get_many statement for one column selection"""
+    return (
+        select(*mechanic_columns(keys))
+        .where(MechanicDB.id.in_(bindparam("ids", expanding=True)))
+        .order_by(MechanicDB.id)
+    )
+
+
+def sparse_mechanic(row) -> GameMechanic:
+    """Build a mechanic from a row, columns left out of the select are None"""
+    values = row._mapping
+    return GameMechanic(
+        id=values["id"],
+        name=values["name"],
+        description=values.get("description"),
+        year=values.get("year")
+    )
+
 
 class MechanicRepository(IMechanicRepository):
     """Implementation of mechanic repository"""
@@ -21,8 +72,8 @@ class MechanicRepository(IMechanicRepository):
             year=mechanic.year
         )
         self.session.add(db_mechanic)
-        await self.session.commit()
-        await self.session.refresh(db_mechanic)
+        await self.session.flush()
+        bump_graph_version(self.session)
         
         return GameMechanic(
             id=db_mechanic.id,
@@ -31,9 +82,44 @@ class MechanicRepository(IMechanicRepository):
             year=db_mechanic.year
         )
 
+    async def create_many(self, mechanics: Sequence[GameMechanic]) -> List[GameMechanic]:
+        """Create mechanics with multi-row INSERT ... RETURNING
+
+        SQLAlchemy packs the rows into as few INSERT statements as the driver
+        allows and sorts the returned rows back into parameter order.
+        """
+        if not mechanics:
+            return []
+        stmt = insert(MechanicDB).returning(
+            MechanicDB.id,
+            MechanicDB.name,
+            MechanicDB.description,
+            MechanicDB.year,
+            sort_by_parameter_order=True,
+        )
+        result = await self.session.execute(
+            stmt,
+            [
+                {"name": m.name, "description": m.description, "year": m.year}
+                for m in mechanics
+            ],
+        )
+        rows = result.all()
+        bump_graph_version(self.session)
+
+        return [
+            GameMechanic(
+                id=row.id,
+                name=row.name,
+                description=row.description,
+                year=row.year
+            )
+            for row in rows
+        ]
+
     async def get_by_id(self, id: int) -> Optional[GameMechanic]:
         """Get mechanic by id"""
-        result = await self.session.get(MechanicDB, id)
+        result = (await self.session.execute(_BY_ID, {"id": id})).first()
         if not result:
             return None
         
@@ -44,11 +130,39 @@ class MechanicRepository(IMechanicRepository):
             year=result.year
         )
 
+    async def get_many(
+        self, ids: Sequence[int], fields: Optional[Sequence[str]] = None
+    ) -> List[GameMechanic]:
+        """Get existing mechanics with given ids ordered by id
+
+        With fields only id, name and the listed columns are read.
+        """
+        ids = sorted(set(ids))
+        mechanics = []
+        if fields is not None:
+            stmt = _by_ids(tuple(column.key for column in mechanic_columns(fields)))
+            for start in range(0, len(ids), IN_BATCH_SIZE):
+                result = await self.session.execute(stmt, {"ids": ids[start:start + IN_BATCH_SIZE]})
+                mechanics.extend(sparse_mechanic(row) for row in result)
+            return mechanics
+        for start in range(0, len(ids), IN_BATCH_SIZE):
+            result = await self.session.execute(_BY_IDS, {"ids": ids[start:start + IN_BATCH_SIZE]})
+            mechanics.extend(
+                GameMechanic(
+                    id=m.id,
+                    name=m.name,
+                    description=m.description,
+                    year=m.year
+                )
+                for m in result
+            )
+        return mechanics
+
     async def list_all(self) -> List[GameMechanic]:
         """Get all mechanics"""
-        stmt = select(MechanicDB)
+        stmt = select(*MECHANIC_COLUMNS)
         result = await self.session.execute(stmt)
-        mechanics = result.scalars().all()
+        mechanics = result.all()
         
         return [
             GameMechanic(
@@ -60,6 +174,44 @@ class MechanicRepository(IMechanicRepository):
             for m in mechanics
         ]
 
+    async def list_page(
+        self,
+        after: Optional[int] = None,
+        limit: int = 100,
+        fields: Optional[Sequence[str]] = None,
+    ) -> List[GameMechanic]:
+        """Get up to limit mechanics with id greater than after, ordered by id
+
+        With fields only id, name and the listed columns are read.
+        """
+        stmt = select(*mechanic_columns(fields)).order_by(MechanicDB.id).limit(limit)
+        if after is not None:
+            stmt = stmt.where(MechanicDB.id > after)
+        result = await self.session.execute(stmt)
+        if fields is not None:
+            return [sparse_mechanic(row) for row in result]
+
+        return [
+            GameMechanic(
+                id=m.id,
+                name=m.name,
+                description=m.description,
+                year=m.year
+            )
+            for m in result
+        ]
+
+    async def iter_all(self, batch_size: int = 1000) -> AsyncIterator[GameMechanic]:
+        """Iterate over all mechanics in id order, fetching one page at a time"""
+        after = None
+        while True:
+            page = await self.list_page(after, batch_size)
+            for mechanic in page:
+                yield mechanic
+            if len(page) < batch_size:
+                return
+            after = page[-1].id
+
     async def update(self, mechanic: GameMechanic) -> GameMechanic:
         """Update existing mechanic"""
         db_mechanic = await self.session.get(MechanicDB, mechanic.id)
@@ -70,8 +222,8 @@ class MechanicRepository(IMechanicRepository):
         db_mechanic.description = mechanic.description
         db_mechanic.year = mechanic.year
         
-        await self.session.commit()
-        await self.session.refresh(db_mechanic)
+        await self.session.flush()
+        bump_graph_version(self.session)
         
         return GameMechanic(
             id=db_mechanic.id,
@@ -87,5 +239,10 @@ class MechanicRepository(IMechanicRepository):
             return False
         
         await self.session.delete(db_mechanic)
-        await self.session.commit()
+        await self.session.flush()
+        bump_graph_version(self.session)
+
+        index = get_graph_index(self.session)
+        if index is not None:
+            on_commit(self.session, lambda: index.remove_mechanic(id))
         return True
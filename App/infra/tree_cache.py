@@ -0,0 +1,53 @@
+from collections import OrderedDict
+from typing import Dict, Hashable, Optional
+
+from app.infra.config import settings
+
+
+class LRUCache:
+    """Bounded least-recently-used cache with hit, miss and eviction counters"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, bytes]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[bytes]:
+        """Get cached value and mark it as recently used"""
+        value = self._entries.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key: Hashable, value: bytes) -> None:
+        """Store value, evicting the least recently used entries"""
+        if self.max_entries <= 0:
+            return
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        """Drop all entries, counters are kept"""
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Get cache counters"""
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+# Serialized tree and ancestor responses keyed by (route, params, graph version)
+tree_cache = LRUCache(settings.TREE_CACHE_SIZE)
@@ -0,0 +1,194 @@
+import zlib
+from typing import List, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # optional, only gzip is offered without it
+    brotli = None
+
+# Media types worth compressing, binary formats are compressed already
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "image/svg+xml",
+)
+
+
+class _GzipEncoder:
+    def __init__(self, level: int):
+        # wbits 16 + MAX_WBITS writes the gzip header and trailer
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes, flush: bool) -> bytes:
+        out = self._compressor.compress(data)
+        if flush:
+            out += self._compressor.flush(zlib.Z_SYNC_FLUSH)
+        return out
+
+    def finish(self) -> bytes:
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+class _BrotliEncoder:
+    def __init__(self, level: int):
+        self._compressor = brotli.Compressor(quality=level)
+
+    def compress(self, data: bytes, flush: bool) -> bytes:
+        out = self._compressor.process(data)
+        if flush:
+            out += self._compressor.flush()
+        return out
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+def _weaken_etag(headers: MutableHeaders) -> None:
+    """Mark a strong ETag weak, compressed bytes differ from the identity ones"""
+    etag = headers.get("etag")
+    if etag and not etag.startswith("W/"):
+        headers["ETag"] = f"W/{etag}"
+
+
+def _accepted_codings(accept_encoding: str) -> List[str]:
+    """Codings of an Accept-Encoding header that are not refused with q=0"""
+    codings = []
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if coding and q > 0:
+            codings.append(coding.strip().lower())
+    return codings
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """Pick br when available and accepted, then gzip, None for identity"""
+    codings = _accepted_codings(accept_encoding)
+    if brotli is not None and "br" in codings:
+        return "br"
+    if "gzip" in codings or "*" in codings:
+        return "gzip"
+    return None
+
+
+class CompressionMiddleware:
+    """Compress JSON and text responses with brotli or gzip
+
+    Bodies shorter than minimum_size are sent as they are and cost no CPU.
+    Streamed bodies are buffered only until they reach minimum_size, after
+    that every chunk is compressed and flushed right away, so NDJSON lines
+    still reach the client as they are produced. Compressed responses lose
+    Content-Length and their strong ETag becomes weak, the bytes differ
+    from the identity representation.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_level: int = 4,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_level = brotli_level
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        await _CompressedResponder(self, encoding, send).run(self.app, scope, receive)
+
+
+class _CompressedResponder:
+    """Per-response state of CompressionMiddleware"""
+
+    def __init__(self, middleware: CompressionMiddleware, encoding: Optional[str], send: Send):
+        self.middleware = middleware
+        self.encoding = encoding
+        self.send = send
+        self.start: Optional[Message] = None
+        self.buffer: List[bytes] = []
+        self.buffered = 0
+        self.encoder = None
+        self.passthrough = False
+
+    async def run(self, app: ASGIApp, scope: Scope, receive: Receive) -> None:
+        await app(scope, receive, self.on_message)
+
+    async def on_message(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.start = message
+            self.passthrough = not self._eligible(message)
+            if self.passthrough:
+                await self.send(message)
+            return
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self.encoder is not None:
+            await self._send_compressed(body, more_body)
+            return
+
+        self.buffer.append(body)
+        self.buffered += len(body)
+        if self.buffered < self.middleware.minimum_size:
+            if not more_body:
+                await self._send_identity()
+            return
+
+        self.encoder = self._encoder()
+        headers = MutableHeaders(raw=self.start["headers"])
+        headers["Content-Encoding"] = self.encoding
+        del headers["Content-Length"]
+        _weaken_etag(headers)
+        await self.send(self.start)
+        body, self.buffer = b"".join(self.buffer), []
+        await self._send_compressed(body, more_body)
+
+    def _eligible(self, message: Message) -> bool:
+        """Whether the response may be compressed, marking it Vary if so"""
+        headers = MutableHeaders(raw=message["headers"])
+        if message["status"] == 304 and self.encoding is not None:
+            # Revalidation answers carry the validator the compressed 200 had
+            _weaken_etag(headers)
+            headers.add_vary_header("Accept-Encoding")
+        if message["status"] in (204, 304) or "content-encoding" in headers:
+            return False
+        if not headers.get("content-type", "").startswith(COMPRESSIBLE_TYPES):
+            return False
+        headers.add_vary_header("Accept-Encoding")
+        return self.encoding is not None
+
+    def _encoder(self):
+        if self.encoding == "br":
+            return _BrotliEncoder(self.middleware.brotli_level)
+        return _GzipEncoder(self.middleware.gzip_level)
+
+    async def _send_identity(self) -> None:
+        await self.send(self.start)
+        await self.send({"type": "http.response.body", "body": b"".join(self.buffer)})
+
+    async def _send_compressed(self, body: bytes, more_body: bool) -> None:
+        if more_body:
+            chunk = self.encoder.compress(body, flush=True)
+        else:
+            chunk = self.encoder.compress(body, flush=False) + self.encoder.finish()
+        await self.send({"type": "http.response.body", "body": chunk, "more_body": more_body})
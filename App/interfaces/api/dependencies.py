@@ -1,14 +1,24 @@
-from fastapi import Depends, HTTPException, status, Header
+import asyncio
+from typing import AsyncIterator, Awaitable, Callable
+
+from fastapi import Depends, HTTPException, Request, status, Header
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.infra.config import settings
 from app.infra.database.session import get_session
+from app.infra.database.routing import use_primary
+from app.infra.database.unit_of_work import UnitOfWork
 from app.infra.repos_impl.mechanic_repo_impl import MechanicRepository
 from app.infra.repos_impl.link_repo_impl import LinkRepository
 from app.infra.repos_impl.user_repo_impl import UserRepository
+from app.infra.repos_impl.batching import BatchingMechanicRepository, BatchingLinkRepository
 from app.infra.security import verify_token
+from app.infra.graph_version import GraphVersion, get_graph_version
 from app.interfaces.repos.mechanic_repo import IMechanicRepository
 from app.interfaces.repos.link_repo import ILinkRepository
 from app.interfaces.repos.user_repo import IUserRepository
+from app.interfaces.repos.unit_of_work import IUnitOfWork
+from app.interfaces.api.routing import read_primary_cookie
 from app.entities.user import User
 
 
@@ -18,27 +28,75 @@ async def get_db_session() -> AsyncSession:
         yield session
 
 
-async def get_mechanic_repository(
+async def get_unit_of_work(
+    request: Request,
     session: AsyncSession = Depends(get_db_session),
-) -> IMechanicRepository:
-    """Get mechanic repository"""
-    return MechanicRepository(session)
+) -> AsyncIterator[IUnitOfWork]:
+    """Get the request's unit of work, committed once when the request succeeds
+
+    UnitOfWorkRoute commits it before the response is sent, the exit of
+    this dependency rolls back on error and commits for other routes.
+    A client that wrote recently reads from the primary, see PRIMARY_COOKIE.
+    """
+    if read_primary_cookie(request):
+        use_primary(session)
+    unit_of_work = UnitOfWork(session)
+    request.state.unit_of_work = unit_of_work
+    request.state.db_session = session
+    async with unit_of_work:
+        yield unit_of_work
+
+
+async def get_batch_lock(
+    session: AsyncSession = Depends(get_db_session),
+) -> asyncio.Lock:
+    """Get lock serializing batched loads on the request's session"""
+    return asyncio.Lock()
 
 
 async def get_link_repository(
     session: AsyncSession = Depends(get_db_session),
+    unit_of_work: IUnitOfWork = Depends(get_unit_of_work),
+    lock: asyncio.Lock = Depends(get_batch_lock),
 ) -> ILinkRepository:
-    """Get link repository"""
-    return LinkRepository(session)
+    """Get request-scoped batching link repository"""
+    return BatchingLinkRepository(LinkRepository(session), lock, settings.BATCH_MEMO_SIZE)
+
+
+async def get_mechanic_repository(
+    session: AsyncSession = Depends(get_db_session),
+    unit_of_work: IUnitOfWork = Depends(get_unit_of_work),
+    lock: asyncio.Lock = Depends(get_batch_lock),
+    link_repo: ILinkRepository = Depends(get_link_repository),
+) -> IMechanicRepository:
+    """Get request-scoped batching mechanic repository"""
+    return BatchingMechanicRepository(
+        MechanicRepository(session), lock, link_repo, settings.BATCH_MEMO_SIZE
+    )
 
 
 async def get_user_repository(
     session: AsyncSession = Depends(get_db_session),
+    unit_of_work: IUnitOfWork = Depends(get_unit_of_work),
 ) -> IUserRepository:
     """Get user repository"""
     return UserRepository(session)
 
 
+async def get_graph_version_reader(
+    session: AsyncSession = Depends(get_db_session),
+    unit_of_work: IUnitOfWork = Depends(get_unit_of_work),
+) -> Callable[..., Awaitable[GraphVersion]]:
+    """Get reader of the graph version of the request's database
+
+    Routes call it once their input is valid, so a rejected request runs
+    no query. It depends on the unit of work, a client pinned to the
+    primary reads the version from there as well. The version is read once
+    per transaction, fresh=True reads it again.
+    """
+    return lambda fresh=False: get_graph_version(session, fresh)
+
+
 async def _resolve_user(
     authorization: str,
     user_repo: IUserRepository,
@@ -0,0 +1,43 @@
+import json
+from dataclasses import fields, is_dataclass
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # optional, the standard library encoder is used instead
+    orjson = None
+
+
+def _default(obj: Any) -> Any:
+    """Encode what the JSON encoders do not know natively"""
+    if is_dataclass(obj) and not isinstance(obj, type):
+        return {f.name: getattr(obj, f.name) for f in fields(obj)}
+    if isinstance(obj, (set, frozenset)):
+        return sorted(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """Serialize dicts, lists and dataclasses to compact UTF-8 JSON
+
+    Uses orjson when it is installed, output is the same either way.
+    """
+    if orjson is not None:
+        return orjson.dumps(content, default=_default)
+    return json.dumps(
+        content, ensure_ascii=False, separators=(",", ":"), default=_default
+    ).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered straight from entities and payload dataclasses
+
+    Returning it from a route skips response_model validation and
+    jsonable_encoder, so it is only for data the server built itself and
+    that already has the documented shape.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -0,0 +1,104 @@
+import asyncio
+import functools
+import inspect
+import time
+from typing import Any, Callable, Coroutine
+
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+
+from app.infra.config import settings
+from app.infra.database.routing import has_written
+
+# Holds the time until which the client's reads go to the primary
+PRIMARY_COOKIE = "db_primary_until"
+
+
+def read_primary_cookie(request: Request) -> bool:
+    """Whether the client wrote recently enough to need read-your-writes"""
+    try:
+        return float(request.cookies.get(PRIMARY_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+def _set_primary_cookie(response: Response) -> None:
+    until = time.time() + settings.REPLICA_STICKY_SECONDS
+    response.set_cookie(
+        PRIMARY_COOKIE,
+        f"{until:.3f}",
+        max_age=settings.REPLICA_STICKY_SECONDS,
+        httponly=True,
+        samesite="lax",
+    )
+
+
+# Extra parameter through which wrapped endpoints receive the request
+_REQUEST_PARAM = "_unit_of_work_request"
+
+
+def _commit_on_return(endpoint: Callable[..., Any]) -> Callable[..., Any]:
+    """Wrap an async endpoint to commit the unit of work as soon as it returns
+
+    The commit releases the session's connection to the pool before the
+    return value is validated and serialized. The endpoint's own Request
+    parameter is reused if it has one, FastAPI fills only one per endpoint.
+    """
+    if not asyncio.iscoroutinefunction(endpoint):
+        return endpoint
+
+    signature = inspect.signature(endpoint)
+    request_param = next(
+        (p.name for p in signature.parameters.values() if p.annotation is Request), None
+    )
+    if request_param is None:
+        signature = signature.replace(parameters=[
+            *signature.parameters.values(),
+            inspect.Parameter(_REQUEST_PARAM, inspect.Parameter.KEYWORD_ONLY, annotation=Request),
+        ])
+
+    @functools.wraps(endpoint)
+    async def wrapper(*args, **kwargs):
+        request = kwargs[request_param] if request_param else kwargs.pop(_REQUEST_PARAM)
+        result = await endpoint(*args, **kwargs)
+        unit_of_work = getattr(request.state, "unit_of_work", None)
+        if unit_of_work is not None:
+            await unit_of_work.commit()
+        return result
+
+    wrapper.__signature__ = signature
+    return wrapper
+
+
+class UnitOfWorkRoute(APIRoute):
+    """Route that commits the request's unit of work before responding
+
+    The exit code of yield dependencies may run after the response is sent,
+    a commit there could fail after the client already saw success. The
+    commit runs when the endpoint returns, so the connection is back in the
+    pool while the response is serialized, and once more before responding
+    for anything written later. After a committed write the client is
+    pinned to the primary for REPLICA_STICKY_SECONDS, replicas may not have
+    caught up yet.
+    """
+
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs):
+        super().__init__(path, _commit_on_return(endpoint), **kwargs)
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[None, None, Response]]:
+        handler = super().get_route_handler()
+
+        async def route_handler(request: Request) -> Response:
+            response = await handler(request)
+            unit_of_work = getattr(request.state, "unit_of_work", None)
+            if unit_of_work is not None:
+                try:
+                    await unit_of_work.commit()
+                except Exception:
+                    await unit_of_work.rollback()
+                    raise
+                if has_written(request.state.db_session):
+                    _set_primary_cookie(response)
+            return response
+
+        return route_handler
@@ -0,0 +1,28 @@
+from dataclasses import dataclass
+from typing import List, Optional
+
+from app.entities.link import EvolutionLink
+
+
+# Response bodies the server builds itself, shaped like the matching
+# schemas and rendered by FastJSONResponse without validation
+
+@dataclass
+class GraphNodePayload:
+    """Mechanic in a graph response, shaped like GraphNodeResponse"""
+    id: int
+    name: str
+    description: Optional[str]
+    year: Optional[int]
+    depth: int
+    child_count: int
+    cursor: Optional[str] = None
+
+
+@dataclass
+class MechanicGraphPayload:
+    """Node table and edge list, shaped like MechanicGraphResponse"""
+    root_id: int
+    nodes: List[GraphNodePayload]
+    edges: List[EvolutionLink]
+    truncated: bool = False
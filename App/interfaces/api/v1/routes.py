@@ -1,25 +1,60 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Literal, Optional, Tuple
+import codecs
+import contextlib
+import dataclasses
 
 from app.entities.mechanic import GameMechanic
 from app.entities.link import EvolutionLink
 from app.interfaces.api.v1.schemas import (
     CreateMechanicRequest,
     MechanicResponse,
+    BulkCreateMechanicsRequest,
+    BulkCreateMechanicsResponse,
+    BulkItemResult,
     CreateLinkRequest,
     LinkResponse,
+    LinkImportResponse,
+    RejectedLinkResponse,
+    EvolutionPathResponse,
+    MechanicPathsResponse,
+    BatchId,
+    BatchCreateLink,
+    BatchCreateMechanic,
+    BatchDelete,
+    BatchRequest,
+    BatchResponse,
 )
 from app.interfaces.api.dependencies import (
     get_mechanic_repository,
     get_link_repository,
+    get_unit_of_work,
+    get_graph_version_reader,
 )
+from app.interfaces.api.responses import FastJSONResponse, dumps
+from app.interfaces.api.routing import UnitOfWorkRoute
+from app.interfaces.api.v1.payloads import GraphNodePayload, MechanicGraphPayload
 from app.interfaces.repos.mechanic_repo import IMechanicRepository
-from app.interfaces.repos.link_repo import ILinkRepository
-from app.use_cases.create_mechanic import CreateMechanicUseCase
-from app.use_cases.get_tree import GetMechanicTreeUseCase
+from app.interfaces.repos.link_repo import DuplicateLinkError, ILinkRepository, UnknownMechanicError
+from app.interfaces.repos.unit_of_work import IUnitOfWork
+from app.use_cases.create_mechanic import CreateMechanicUseCase, CreateMechanicsUseCase
+from app.use_cases.create_link import CreateLinkUseCase, LinkCycleError, acyclic_lock
+from app.use_cases.import_links import ImportLinksUseCase
+from app.use_cases.get_tree import GetMechanicTreeUseCase, MechanicTree, TreeTooLargeError
+from app.use_cases.get_graph import GetMechanicGraphUseCase, decode_cursor, encode_cursor
+from app.use_cases.stream_graph import StreamMechanicGraphUseCase
+from app.use_cases.find_path import FindEvolutionPathUseCase
+from app.infra.config import settings
+from app.infra.graph_version import GraphVersion
+from app.infra.tree_cache import tree_cache
+from app.infra.database.session import engine_pool_stats
 
 
-router = APIRouter(prefix="/api/v1", tags=["v1"])
+router = APIRouter(prefix="/api/v1", tags=["v1"], route_class=UnitOfWorkRoute)
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
 
 
 @router.get("/health")
@@ -28,13 +63,135 @@ async def health_check():
     return {"status": "ok"}
 
 
+@router.get("/metrics")
+async def metrics():
+    """Cache and connection pool counters for sizing"""
+    return {"tree_cache": tree_cache.stats(), "db_pool": engine_pool_stats()}
+
+
+# Conditional GET -----------------------------------------------------------
+def _etag(graph_version: GraphVersion, variant: str = "") -> str:
+    """Strong ETag of a representation derived from the graph at graph_version
+
+    Every transaction writing mechanics or links bumps the stored version,
+    whichever process runs it, so the ETag changes whenever the data behind
+    the listing or walk may have.
+    """
+    tag = str(graph_version.version)
+    if variant:
+        tag = f"{tag}-{variant}"
+    return f'"{tag}"'
+
+
+def _validator_headers(etag: str) -> Dict[str, str]:
+    """Headers letting clients cache the body but revalidate before each use"""
+    return {"ETag": etag, "Cache-Control": "no-cache"}
+
+
+def _not_modified(if_none_match: Optional[str], etag: str) -> Optional[Response]:
+    """304 response when the client already holds the current representation"""
+    if not if_none_match:
+        return None
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    if "*" in tags or etag in (tag[2:] if tag.startswith("W/") else tag for tag in tags):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=_validator_headers(etag))
+    return None
+
+
+# Sparse fieldsets ----------------------------------------------------------
+MECHANIC_FIELDS = tuple(f.name for f in dataclasses.fields(GameMechanic))
+LINK_FIELDS = tuple(f.name for f in dataclasses.fields(EvolutionLink))
+
+
+def _parse_fields(fields: Optional[str], allowed: Tuple[str, ...]) -> Optional[Tuple[str, ...]]:
+    """Fields named in a fields=a,b query in declaration order, None for all
+
+    id is always kept, pages continue from it and graph edges refer to it.
+    """
+    if fields is None:
+        return None
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = requested.difference(allowed)
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(sorted(unknown))}",
+        )
+    requested.add("id")
+    if len(requested) == len(allowed):
+        return None
+    return tuple(name for name in allowed if name in requested)
+
+
+def _pick(item, fields: Tuple[str, ...]) -> dict:
+    """Only the requested fields of an entity"""
+    return {name: getattr(item, name) for name in fields}
+
+
+def _sparse_tree(tree: MechanicTree, fields: Tuple[str, ...]) -> dict:
+    """Nested tree with every mechanic narrowed to fields
+
+    Built with an explicit stack, trees may be deeper than the recursion limit.
+    """
+    root: dict = {}
+    stack = [(tree, root)]
+    while stack:
+        node, out = stack.pop()
+        out["mechanic"] = _pick(node.mechanic, fields)
+        out["children"] = [{} for _ in node.children]
+        out["child_count"] = node.child_count
+        out["cursor"] = node.cursor
+        stack.extend(zip(node.children, out["children"]))
+    return root
+
+
 # Mechanics -----------------------------------------------------------------
+def _paginate(
+    request: Request,
+    page: list,
+    limit: int,
+    etag: str,
+    fields: Optional[Tuple[str, ...]] = None,
+) -> FastJSONResponse:
+    """Trim a page fetched with limit + 1 rows and advertise the next cursor
+
+    The cursor is the id of the last returned row, pass it as after to
+    continue. It is sent in the X-Next-Cursor and Link headers so the body
+    stays a plain list. Entities have the documented shape already and are
+    rendered without revalidation, narrowed to fields when given.
+    """
+    headers = _validator_headers(etag)
+    if len(page) > limit:
+        page = page[:limit]
+        cursor = page[-1].id
+        headers["X-Next-Cursor"] = str(cursor)
+        headers["Link"] = f'<{request.url.include_query_params(after=cursor)}>; rel="next"'
+    if fields is not None:
+        page = [_pick(item, fields) for item in page]
+    return FastJSONResponse(page, headers=headers)
+
+
 @router.get("/mechanics/", response_model=List[MechanicResponse])
 async def list_mechanics(
+    request: Request,
+    limit: int = Query(settings.PAGE_SIZE_DEFAULT, ge=1, le=settings.PAGE_SIZE_MAX),
+    after: Optional[int] = Query(None, ge=0),
+    fields: Optional[str] = None,
     mechanic_repo: IMechanicRepository = Depends(get_mechanic_repository),
+    read_graph_version: Callable[..., Awaitable[GraphVersion]] = Depends(get_graph_version_reader),
+    if_none_match: Optional[str] = Header(None),
 ):
-    mechanics = await mechanic_repo.list_all()
-    return mechanics
+    """List mechanics by id, one keyset page at a time
+
+    fields=id,name returns and reads only those columns, id is always kept.
+    """
+    selected = _parse_fields(fields, MECHANIC_FIELDS)
+    etag = _etag(await read_graph_version())
+    not_modified = _not_modified(if_none_match, etag)
+    if not_modified is not None:
+        return not_modified
+    mechanics = await mechanic_repo.list_page(after, limit + 1, selected)
+    return _paginate(request, mechanics, limit, etag, selected)
 
 
 @router.delete("/mechanics/{mechanic_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -64,39 +221,496 @@ async def create_mechanic(
     return created
 
 
+@router.post(
+    "/mechanics/bulk",
+    response_model=BulkCreateMechanicsResponse,
+    status_code=status.HTTP_201_CREATED,
+)
+async def create_mechanics_bulk(
+    payload: BulkCreateMechanicsRequest,
+    response: Response,
+    mechanic_repo: IMechanicRepository = Depends(get_mechanic_repository),
+):
+    """Create many mechanics in one INSERT, invalid items are reported and skipped
+
+    Answers 422 when no item is valid.
+    """
+    if len(payload.items) > settings.BULK_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Batch has more than {settings.BULK_MAX_ITEMS} items",
+        )
+
+    results = []
+    valid = []
+    for index, item in enumerate(payload.items):
+        try:
+            request = CreateMechanicRequest.model_validate(item)
+            mechanic = GameMechanic(
+                id=None,
+                name=request.name,
+                description=request.description or "",
+                year=request.year,
+            )
+        except ValidationError as exc:
+            message = "; ".join(
+                f"{'.'.join(str(p) for p in e['loc']) or 'item'}: {e['msg']}" for e in exc.errors()
+            )
+            results.append(BulkItemResult(index=index, error=message))
+        except ValueError as exc:
+            results.append(BulkItemResult(index=index, error=str(exc)))
+        else:
+            valid.append((index, mechanic))
+
+    use_case = CreateMechanicsUseCase(mechanic_repo, max_items=settings.BULK_MAX_ITEMS)
+    created = await use_case.execute([mechanic for _, mechanic in valid])
+    results.extend(
+        BulkItemResult(index=index, mechanic=MechanicResponse(**vars(mechanic)))
+        for (index, _), mechanic in zip(valid, created)
+    )
+    results.sort(key=lambda r: r.index)
+
+    if results and not created:
+        response.status_code = status.HTTP_422_UNPROCESSABLE_ENTITY
+    return BulkCreateMechanicsResponse(
+        created=len(created),
+        failed=len(results) - len(created),
+        results=results,
+    )
+
+
+async def _walk_mechanic_graph(
+    mechanic_id: int,
+    reverse: bool,
+    response_format: str,
+    max_depth: Optional[int],
+    max_nodes: Optional[int],
+    cursor: Optional[str],
+    mechanic_repo: IMechanicRepository,
+    link_repo: ILinkRepository,
+    read_graph_version: Callable[..., Awaitable[GraphVersion]],
+    accept: Optional[str] = None,
+    if_none_match: Optional[str] = None,
+    fields: Optional[Tuple[str, ...]] = None,
+):
+    """Shared body of the descendant and ancestor tree routes
+
+    Serialized results are cached under the graph version, which every
+    mechanic and link write bumps, so a cached body is never stale.
+    Clients accepting NDJSON get an uncached stream of nodes and edges,
+    which has no tree shape and no node cap, so format=tree and max_nodes
+    are refused for it.
+    A client revalidating the current version gets 304 before any query.
+    fields narrows the mechanics of every format, edges are kept whole.
+    The version is read before the walk in the same session, so the body
+    is never older than it. A body is cached only if the version has not
+    moved while it was built, it could hold newer writes otherwise.
+    """
+    depth_offset = 0
+    if cursor is not None:
+        try:
+            mechanic_id, depth_offset = decode_cursor(cursor)
+        except ValueError as exc:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+
+    stream = bool(accept and NDJSON_MEDIA_TYPE in accept)
+    if stream and (response_format == "tree" or max_nodes is not None):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="NDJSON streams support neither format=tree nor max_nodes",
+        )
+    graph_version = await read_graph_version()
+    etag = _etag(graph_version, "ndjson" if stream else "")
+    not_modified = _not_modified(if_none_match, etag)
+    if not_modified is not None:
+        return not_modified
+    headers = {**_validator_headers(etag), "Vary": "Accept"}
+
+    if stream:
+        use_case = StreamMechanicGraphUseCase(mechanic_repo, link_repo)
+        try:
+            events = await use_case.execute(mechanic_id, max_depth, reverse, fields)
+        except ValueError as exc:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(exc))
+        return StreamingResponse(
+            _ndjson_lines(events, depth_offset, fields), media_type=NDJSON_MEDIA_TYPE, headers=headers
+        )
+
+    cache_key = (
+        reverse, mechanic_id, response_format, max_depth, max_nodes, depth_offset, fields,
+        graph_version,
+    )
+    body = tree_cache.get(cache_key)
+    if body is None:
+        result = await _build_walk_result(
+            mechanic_id, reverse, response_format, max_depth, max_nodes, depth_offset,
+            mechanic_repo, link_repo, fields,
+        )
+        body = dumps(result)
+        if await read_graph_version(fresh=True) == graph_version:
+            tree_cache.put(cache_key, body)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+async def _ndjson_lines(events, depth_offset: int, fields: Optional[Tuple[str, ...]] = None):
+    """Render walk events as NDJSON lines, node lines narrowed to fields"""
+    async for kind, item, depth in events:
+        if fields is not None and kind == "node":
+            line = {"kind": kind, **_pick(item, fields)}
+        else:
+            line = {"kind": kind, **vars(item)}
+        if depth is not None:
+            line["depth"] = depth + depth_offset
+        yield dumps(line) + b"\n"
+
+
+async def _build_walk_result(
+    mechanic_id: int,
+    reverse: bool,
+    response_format: str,
+    max_depth: Optional[int],
+    max_nodes: Optional[int],
+    depth_offset: int,
+    mechanic_repo: IMechanicRepository,
+    link_repo: ILinkRepository,
+    fields: Optional[Tuple[str, ...]] = None,
+):
+    """Run the tree or graph use case for the walk routes"""
+    if response_format == "tree":
+        use_case = GetMechanicTreeUseCase(
+            mechanic_repo, link_repo, node_cap=settings.TREE_MAX_NODES
+        )
+        try:
+            tree = await use_case.execute(
+                mechanic_id, max_depth, max_nodes, depth_offset, reverse, fields
+            )
+        except TreeTooLargeError as exc:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"{exc}, use format=graph or max_depth instead",
+            )
+        except ValueError as exc:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(exc))
+        return tree if fields is None else _sparse_tree(tree, fields)
+
+    use_case = GetMechanicGraphUseCase(link_repo)
+    try:
+        graph = await use_case.execute(
+            mechanic_id, max_depth, max_nodes, depth_offset, reverse, fields
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(exc))
+    if fields is not None:
+        nodes = [
+            {
+                **_pick(m, fields),
+                "depth": graph.depths[id],
+                "child_count": graph.child_counts.get(id, 0),
+                "cursor": encode_cursor(id, graph.depths[id]) if id in graph.truncated else None,
+            }
+            for id, m in graph.mechanics.items()
+        ]
+        return {
+            "root_id": graph.root_id,
+            "nodes": nodes,
+            "edges": graph.links,
+            "truncated": bool(graph.truncated),
+        }
+    return MechanicGraphPayload(
+        root_id=graph.root_id,
+        nodes=[
+            GraphNodePayload(
+                id=m.id,
+                name=m.name,
+                description=m.description,
+                year=m.year,
+                depth=graph.depths[id],
+                child_count=graph.child_counts.get(id, 0),
+                cursor=encode_cursor(id, graph.depths[id]) if id in graph.truncated else None,
+            )
+            for id, m in graph.mechanics.items()
+        ],
+        edges=graph.links,
+        truncated=bool(graph.truncated),
+    )
+
+
 @router.get("/mechanics/{mechanic_id}/tree")
 async def get_mechanic_tree(
     mechanic_id: int,
+    response_format: Literal["graph", "tree"] = Query("graph", alias="format"),
+    max_depth: Optional[int] = Query(None, ge=0),
+    max_nodes: Optional[int] = Query(None, ge=1),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
     mechanic_repo: IMechanicRepository = Depends(get_mechanic_repository),
     link_repo: ILinkRepository = Depends(get_link_repository),
+    read_graph_version: Callable[..., Awaitable[GraphVersion]] = Depends(get_graph_version_reader),
+    accept: Optional[str] = Header(None),
+    if_none_match: Optional[str] = Header(None),
 ):
-    use_case = GetMechanicTreeUseCase(mechanic_repo, link_repo)
+    """Get evolution graph of a mechanic, or the nested tree with format=tree
+
+    max_depth and max_nodes bound the expansion, truncated mechanics carry
+    a child count and a cursor that continues the walk from them.
+    fields=id,name returns and reads only those mechanic columns.
+    """
+    return await _walk_mechanic_graph(
+        mechanic_id, False, response_format, max_depth, max_nodes, cursor,
+        mechanic_repo, link_repo, read_graph_version, accept, if_none_match,
+        _parse_fields(fields, MECHANIC_FIELDS),
+    )
+
+
+@router.get("/mechanics/{mechanic_id}/ancestors")
+async def get_mechanic_ancestors(
+    mechanic_id: int,
+    response_format: Literal["graph", "tree"] = Query("graph", alias="format"),
+    max_depth: Optional[int] = Query(None, ge=0),
+    max_nodes: Optional[int] = Query(None, ge=1),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    mechanic_repo: IMechanicRepository = Depends(get_mechanic_repository),
+    link_repo: ILinkRepository = Depends(get_link_repository),
+    read_graph_version: Callable[..., Awaitable[GraphVersion]] = Depends(get_graph_version_reader),
+    accept: Optional[str] = Header(None),
+    if_none_match: Optional[str] = Header(None),
+):
+    """Get mechanics this mechanic evolved from, following incoming links"""
+    return await _walk_mechanic_graph(
+        mechanic_id, True, response_format, max_depth, max_nodes, cursor,
+        mechanic_repo, link_repo, read_graph_version, accept, if_none_match,
+        _parse_fields(fields, MECHANIC_FIELDS),
+    )
+
+
+@router.get("/mechanics/{from_id}/path/{to_id}", response_model=MechanicPathsResponse)
+async def get_evolution_path(
+    from_id: int,
+    to_id: int,
+    k: int = Query(1, ge=1, le=settings.PATH_MAX_K),
+    max_depth: Optional[int] = Query(None, ge=0),
+    mechanic_repo: IMechanicRepository = Depends(get_mechanic_repository),
+    link_repo: ILinkRepository = Depends(get_link_repository),
+):
+    """Get the k shortest chains of links leading from one mechanic to another"""
+    use_case = FindEvolutionPathUseCase(mechanic_repo, link_repo)
     try:
-        tree = await use_case.execute(mechanic_id)
+        paths, mechanics = await use_case.execute(from_id, to_id, k, max_depth)
     except ValueError as exc:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(exc))
-    return tree
+    return MechanicPathsResponse(
+        from_id=from_id,
+        to_id=to_id,
+        paths=[
+            EvolutionPathResponse(
+                length=path.length,
+                mechanics=[MechanicResponse(**vars(mechanics[id])) for id in path.mechanic_ids],
+                links=[LinkResponse(**vars(l)) for l in path.links],
+            )
+            for path in paths
+        ],
+    )
 
 
 # Links ---------------------------------------------------------------------
 @router.get("/mechanics/links", response_model=List[LinkResponse])
 async def list_links(
+    request: Request,
+    limit: int = Query(settings.PAGE_SIZE_DEFAULT, ge=1, le=settings.PAGE_SIZE_MAX),
+    after: Optional[int] = Query(None, ge=0),
+    fields: Optional[str] = None,
     link_repo: ILinkRepository = Depends(get_link_repository),
+    read_graph_version: Callable[..., Awaitable[GraphVersion]] = Depends(get_graph_version_reader),
+    if_none_match: Optional[str] = Header(None),
 ):
-    links = await link_repo.list_all()
-    return links
+    """List links by id, one keyset page at a time
+
+    fields=id,type narrows the returned links. All link columns are still
+    read, they are small and an EvolutionLink is not valid without them.
+    """
+    selected = _parse_fields(fields, LINK_FIELDS)
+    etag = _etag(await read_graph_version())
+    not_modified = _not_modified(if_none_match, etag)
+    if not_modified is not None:
+        return not_modified
+    links = await link_repo.list_page(after, limit + 1)
+    return _paginate(request, links, limit, etag, selected)
 
 
 @router.post("/mechanics/links", response_model=LinkResponse, status_code=status.HTTP_201_CREATED)
 async def create_link(
     payload: CreateLinkRequest,
     link_repo: ILinkRepository = Depends(get_link_repository),
+    unit_of_work: IUnitOfWork = Depends(get_unit_of_work),
 ):
+    use_case = CreateLinkUseCase(
+        link_repo, enforce_acyclic=settings.ENFORCE_ACYCLIC_LINKS, unit_of_work=unit_of_work
+    )
     link = EvolutionLink(
         id=None,
         from_id=payload.from_id,
         to_id=payload.to_id,
         type=payload.type,
     )
-    created = await link_repo.create(link)
+    try:
+        created = await use_case.execute(link)
+    except UnknownMechanicError as exc:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(exc))
+    except (LinkCycleError, DuplicateLinkError) as exc:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(exc))
     return created
+
+
+@router.post("/mechanics/links/import", response_model=LinkImportResponse)
+async def import_links(
+    request: Request,
+    import_format: Literal["csv", "ndjson"] = Query("csv", alias="format"),
+    link_repo: ILinkRepository = Depends(get_link_repository),
+):
+    """Import links from a CSV (from_id,to_id,type) or NDJSON request body
+
+    The body is parsed while it streams in, rejected lines are reported
+    and do not abort the import. Cycle checks of acyclic mode do not apply.
+    """
+    use_case = ImportLinksUseCase(link_repo, batch_size=settings.LINK_IMPORT_BATCH_SIZE)
+    report = await use_case.execute(_body_lines(request), import_format)
+    return LinkImportResponse(
+        imported=report.imported,
+        rejected_count=report.rejected_count,
+        rejected=[RejectedLinkResponse(**vars(r)) for r in report.rejected],
+    )
+
+
+async def _body_lines(request: Request) -> AsyncIterator[str]:
+    """Split a streamed UTF-8 request body into lines"""
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    pending = ""
+    async for chunk in request.stream():
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending.rstrip("\r")
+
+
+# Batch ---------------------------------------------------------------------
+def _resolve_id(value: BatchId, refs: Dict[str, int]) -> int:
+    """Id given directly or as "$<ref>" of an earlier create operation"""
+    if isinstance(value, int):
+        return value
+    if value.startswith("$") and value[1:] in refs:
+        return refs[value[1:]]
+    raise HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail=f"Unknown reference {value!r}, refer to an earlier operation as $<ref>",
+    )
+
+
+async def _run_batch_operation(
+    operation,
+    refs: Dict[str, int],
+    mechanic_repo: IMechanicRepository,
+    link_repo: ILinkRepository,
+) -> Tuple[int, object]:
+    """Run one batch operation, returning the status and body of its own route"""
+    if isinstance(operation, BatchCreateMechanic):
+        try:
+            mechanic = GameMechanic(
+                id=None,
+                name=operation.name,
+                description=operation.description or "",
+                year=operation.year,
+            )
+            created = await CreateMechanicUseCase(mechanic_repo).execute(mechanic)
+        except ValueError as exc:
+            raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(exc))
+        return status.HTTP_201_CREATED, created
+
+    if isinstance(operation, BatchCreateLink):
+        try:
+            link = EvolutionLink(
+                id=None,
+                from_id=_resolve_id(operation.from_id, refs),
+                to_id=_resolve_id(operation.to_id, refs),
+                type=operation.type,
+            )
+        except ValueError as exc:
+            raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(exc))
+        use_case = CreateLinkUseCase(link_repo, enforce_acyclic=settings.ENFORCE_ACYCLIC_LINKS)
+        try:
+            created = await use_case.execute_locked(link)
+        except UnknownMechanicError as exc:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(exc))
+        except (LinkCycleError, DuplicateLinkError) as exc:
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(exc))
+        return status.HTTP_201_CREATED, created
+
+    if isinstance(operation, BatchDelete):
+        repo = mechanic_repo if operation.op == "delete_mechanic" else link_repo
+        if not await repo.delete(_resolve_id(operation.id, refs)):
+            noun = "Mechanic" if operation.op == "delete_mechanic" else "Link"
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"{noun} not found")
+        return status.HTTP_204_NO_CONTENT, None
+
+    body = await _build_walk_result(
+        _resolve_id(operation.id, refs), operation.reverse, operation.format,
+        operation.max_depth, operation.max_nodes, 0, mechanic_repo, link_repo,
+        _parse_fields(operation.fields, MECHANIC_FIELDS),
+    )
+    return status.HTTP_200_OK, body
+
+
+@router.post("/batch", response_model=BatchResponse)
+async def run_batch(
+    payload: BatchRequest,
+    mechanic_repo: IMechanicRepository = Depends(get_mechanic_repository),
+    link_repo: ILinkRepository = Depends(get_link_repository),
+    unit_of_work: IUnitOfWork = Depends(get_unit_of_work),
+):
+    """Run create, delete and get_tree operations in order in one transaction
+
+    A create with ref lets later operations pass "$<ref>" for its id. The
+    first failing operation rolls back the whole batch and its status is
+    returned with the operation index. Walks see the batch's own writes,
+    they are not served from the tree cache, whose graph version only moves
+    on commit. In acyclic mode the batch holds the link lock until it has
+    committed, like a single link creation.
+    """
+    operations = payload.operations
+    if len(operations) > settings.BATCH_MAX_OPERATIONS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Batch has more than {settings.BATCH_MAX_OPERATIONS} operations",
+        )
+
+    locks_links = settings.ENFORCE_ACYCLIC_LINKS and any(
+        isinstance(operation, BatchCreateLink) for operation in operations
+    )
+    refs: Dict[str, int] = {}
+    results = []
+    async with acyclic_lock(link_repo) if locks_links else contextlib.nullcontext():
+        for index, operation in enumerate(operations):
+            ref = getattr(operation, "ref", None)
+            try:
+                if ref is not None and ref in refs:
+                    raise HTTPException(
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        detail=f"Reference {ref!r} is already defined",
+                    )
+                status_code, body = await _run_batch_operation(
+                    operation, refs, mechanic_repo, link_repo
+                )
+            except HTTPException as exc:
+                raise HTTPException(
+                    status_code=exc.status_code,
+                    detail=f"Operation {index} ({operation.op}): {exc.detail}",
+                )
+            if ref is not None:
+                refs[ref] = body.id
+            results.append({"index": index, "status": status_code, "body": body})
+        if locks_links:
+            await unit_of_work.commit()
+    return FastJSONResponse({"results": results})
@@ -1,5 +1,5 @@
-from typing import Optional
-from pydantic import BaseModel, EmailStr
+from typing import Annotated, Any, List, Literal, Optional, Union
+from pydantic import BaseModel, EmailStr, Field
 
 
 class UserRegisterRequest(BaseModel):
@@ -46,6 +46,25 @@ class MechanicResponse(BaseModel):
     year: Optional[int] = None
 
 
+class BulkCreateMechanicsRequest(BaseModel):
+    """Bulk mechanic creation request, items are validated one by one"""
+    items: List[Any]
+
+
+class BulkItemResult(BaseModel):
+    """Outcome of one bulk item, either the created mechanic or an error"""
+    index: int
+    mechanic: Optional[MechanicResponse] = None
+    error: Optional[str] = None
+
+
+class BulkCreateMechanicsResponse(BaseModel):
+    """Bulk mechanic creation response in input order"""
+    created: int
+    failed: int
+    results: List[BulkItemResult]
+
+
 class CreateLinkRequest(BaseModel):
     """Create link request"""
     from_id: int
@@ -59,3 +78,104 @@ class LinkResponse(BaseModel):
     from_id: int
     to_id: int
     type: str
+
+
+class RejectedLinkResponse(BaseModel):
+    """Import line that was skipped"""
+    line: int
+    reason: str
+
+
+class LinkImportResponse(BaseModel):
+    """Bulk link import outcome, rejected lists at most the first rejections"""
+    imported: int
+    rejected_count: int
+    rejected: List[RejectedLinkResponse]
+
+
+class GraphNodeResponse(MechanicResponse):
+    """Mechanic in a graph response, truncated nodes carry a cursor"""
+    depth: int
+    child_count: int
+    cursor: Optional[str] = None
+
+
+class MechanicGraphResponse(BaseModel):
+    """Reachable mechanics as a node table and an edge list"""
+    root_id: int
+    nodes: List[GraphNodeResponse]
+    edges: List[LinkResponse]
+    truncated: bool = False
+
+
+class EvolutionPathResponse(BaseModel):
+    """One chain of links between two mechanics"""
+    length: int
+    mechanics: List[MechanicResponse]
+    links: List[LinkResponse]
+
+
+class MechanicPathsResponse(BaseModel):
+    """Paths between two mechanics, shortest first"""
+    from_id: int
+    to_id: int
+    paths: List[EvolutionPathResponse]
+
+
+# An id, or "$<ref>" for the id created by an earlier operation of the batch
+BatchId = Union[int, str]
+
+
+class BatchCreateMechanic(CreateMechanicRequest):
+    """Batch operation creating a mechanic, ref names its id for later operations"""
+    op: Literal["create_mechanic"]
+    ref: Optional[str] = None
+
+
+class BatchCreateLink(BaseModel):
+    """Batch operation creating a link"""
+    op: Literal["create_link"]
+    ref: Optional[str] = None
+    from_id: BatchId
+    to_id: BatchId
+    type: str
+
+
+class BatchDelete(BaseModel):
+    """Batch operation deleting a mechanic or a link"""
+    op: Literal["delete_mechanic", "delete_link"]
+    id: BatchId
+
+
+class BatchGetTree(BaseModel):
+    """Batch operation reading a walk like GET /mechanics/{id}/tree"""
+    op: Literal["get_tree"]
+    id: BatchId
+    format: Literal["graph", "tree"] = "graph"
+    max_depth: Optional[int] = Field(None, ge=0)
+    max_nodes: Optional[int] = Field(None, ge=1)
+    reverse: bool = False
+    fields: Optional[str] = None
+
+
+BatchOperation = Annotated[
+    Union[BatchCreateMechanic, BatchCreateLink, BatchDelete, BatchGetTree],
+    Field(discriminator="op"),
+]
+
+
+class BatchRequest(BaseModel):
+    """Operations run in order in one transaction"""
+    operations: List[BatchOperation]
+
+
+class BatchResult(BaseModel):
+    """Outcome of one operation, body is what its own route would return"""
+    index: int
+    status: int
+    body: Any = None
+
+
+class BatchResponse(BaseModel):
+    """Batch outcome in operation order"""
+    results: List[BatchResult]
@@ -1,7 +1,17 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import AsyncIterable, AsyncIterator, List, Optional, Sequence
 
 from app.entities.link import EvolutionLink
+from app.entities.link_import import LinkImportReport, LinkImportRow
+from app.entities.graph import MechanicGraph
+
+
+class DuplicateLinkError(ValueError):
+    """Raised when a link with the same endpoints and type already exists"""
+
+
+class UnknownMechanicError(LookupError):
+    """Raised when a link refers to a mechanic that does not exist"""
 
 
 class ILinkRepository(ABC):
@@ -9,7 +19,20 @@ class ILinkRepository(ABC):
 
     @abstractmethod
     async def create(self, link: EvolutionLink) -> EvolutionLink:
-        """Create new link"""
+        """Create new link
+
+        Raises DuplicateLinkError if it already exists and
+        UnknownMechanicError if one of its mechanics does not.
+        """
+        pass
+
+    @abstractmethod
+    async def import_links(self, batches: AsyncIterable[List[LinkImportRow]]) -> LinkImportReport:
+        """Insert streamed batches of links in one transaction
+
+        Rows with unknown mechanics, self-links, empty types or links that
+        already exist are reported as rejected and the rest is imported.
+        """
         pass
 
     @abstractmethod
@@ -22,11 +45,67 @@ class ILinkRepository(ABC):
         """Get all links"""
         pass
 
+    @abstractmethod
+    async def list_page(self, after: Optional[int] = None, limit: int = 100) -> List[EvolutionLink]:
+        """Get up to limit links with id greater than after, ordered by id"""
+        pass
+
+    @abstractmethod
+    def iter_all(self, batch_size: int = 1000) -> AsyncIterator[EvolutionLink]:
+        """Iterate over all links in id order, fetching one page at a time"""
+        pass
+
     @abstractmethod
     async def list_by_from_id(self, from_id: int) -> List[EvolutionLink]:
         """Get all links from mechanic"""
         pass
 
+    @abstractmethod
+    async def list_by_to_id(self, to_id: int) -> List[EvolutionLink]:
+        """Get all links into mechanic"""
+        pass
+
+    @abstractmethod
+    async def list_by_from_ids(self, from_ids: Sequence[int]) -> List[EvolutionLink]:
+        """Get all links from any of the mechanics"""
+        pass
+
+    @abstractmethod
+    async def list_by_to_ids(self, to_ids: Sequence[int]) -> List[EvolutionLink]:
+        """Get all links into any of the mechanics"""
+        pass
+
+    @abstractmethod
+    async def get_subgraph(
+        self,
+        root_id: int,
+        max_depth: Optional[int] = None,
+        max_nodes: Optional[int] = None,
+        reverse: bool = False,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Optional[MechanicGraph]:
+        """Get mechanics reachable from root with all their outgoing links
+
+        At most max_nodes mechanics within max_depth links are returned in
+        breadth-first order, None if root is missing. With reverse the walk
+        follows incoming links and returns those instead. fields limits the
+        mechanic columns read as in IMechanicRepository.get_many.
+        """
+        pass
+
+    @abstractmethod
+    async def would_create_cycle(self, from_id: int, to_id: int) -> bool:
+        """Check whether a link from_id -> to_id would close a cycle"""
+        pass
+
+    @abstractmethod
+    async def lock_graph(self) -> bool:
+        """Serialize cycle checks with other processes until commit
+
+        False when the database cannot, the caller then locks in process.
+        """
+        pass
+
     @abstractmethod
     async def delete(self, id: int) -> bool:
         """Delete link by id"""
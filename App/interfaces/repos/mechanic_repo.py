@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import AsyncIterator, List, Optional, Sequence
 
 from app.entities.mechanic import GameMechanic
 
@@ -12,16 +12,50 @@ class IMechanicRepository(ABC):
         """Create new mechanic"""
         pass
 
+    @abstractmethod
+    async def create_many(self, mechanics: Sequence[GameMechanic]) -> List[GameMechanic]:
+        """Create mechanics in one transaction, returned in input order"""
+        pass
+
     @abstractmethod
     async def get_by_id(self, id: int) -> Optional[GameMechanic]:
         """Get mechanic by id"""
         pass
 
+    @abstractmethod
+    async def get_many(
+        self, ids: Sequence[int], fields: Optional[Sequence[str]] = None
+    ) -> List[GameMechanic]:
+        """Get existing mechanics with given ids ordered by id
+
+        fields limits the columns read to id, name and the listed ones,
+        attributes left out are None.
+        """
+        pass
+
     @abstractmethod
     async def list_all(self) -> List[GameMechanic]:
         """Get all mechanics"""
         pass
 
+    @abstractmethod
+    async def list_page(
+        self,
+        after: Optional[int] = None,
+        limit: int = 100,
+        fields: Optional[Sequence[str]] = None,
+    ) -> List[GameMechanic]:
+        """Get up to limit mechanics with id greater than after, ordered by id
+
+        fields limits the columns read as in get_many.
+        """
+        pass
+
+    @abstractmethod
+    def iter_all(self, batch_size: int = 1000) -> AsyncIterator[GameMechanic]:
+        """Iterate over all mechanics in id order, fetching one page at a time"""
+        pass
+
     @abstractmethod
     async def update(self, mechanic: GameMechanic) -> GameMechanic:
         """Update existing mechanic"""
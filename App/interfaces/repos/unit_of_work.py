@@ -0,0 +1,29 @@
+from abc import ABC, abstractmethod
+
+
+class IUnitOfWork(ABC):
+    """Interface for a transaction spanning many repository calls
+
+    Repositories only flush their writes, nothing is durable until commit.
+    Used as an async context manager it commits on success and rolls back
+    on error.
+    """
+
+    @abstractmethod
+    async def commit(self) -> None:
+        """Commit all writes made since the last commit"""
+        pass
+
+    @abstractmethod
+    async def rollback(self) -> None:
+        """Discard all writes made since the last commit"""
+        pass
+
+    async def __aenter__(self) -> "IUnitOfWork":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            await self.commit()
+        else:
+            await self.rollback()
@@ -4,6 +4,7 @@ from fastapi.staticfiles import StaticFiles
 import os
 
 from app.interfaces.api.v1.routes import router as v1_router
+from app.interfaces.api.compression import CompressionMiddleware
 from app.infra.database.session import init_models, dispose_models
 from app.infra.config import settings
 
@@ -22,7 +23,17 @@ def create_app() -> FastAPI:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["Link", "X-Next-Cursor"],
     )
+
+    # Compression of JSON, NDJSON and static text responses
+    if settings.COMPRESSION_ENABLED:
+        app.add_middleware(
+            CompressionMiddleware,
+            minimum_size=settings.COMPRESSION_MIN_SIZE,
+            gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+            brotli_level=settings.COMPRESSION_BROTLI_LEVEL,
+        )
     
     # Include API router
     app.include_router(v1_router)
@@ -0,0 +1,69 @@
+import asyncio
+import contextlib
+from typing import AsyncIterator, Optional
+
+from app.entities.link import EvolutionLink
+from app.interfaces.repos.link_repo import ILinkRepository
+from app.interfaces.repos.unit_of_work import IUnitOfWork
+
+# Check and insert must not interleave, or two links could close a cycle
+# together. Databases without row locks fall back to this process-wide lock
+_acyclic_lock = asyncio.Lock()
+
+
+@contextlib.asynccontextmanager
+async def acyclic_lock(link_repo: ILinkRepository) -> AsyncIterator[None]:
+    """Lock held from the cycle check until the new link is committed
+
+    The database lock of link_repo covers every worker and ends with the
+    transaction, the block has to commit before it exits.
+    """
+    if await link_repo.lock_graph():
+        yield
+        return
+    async with _acyclic_lock:
+        yield
+
+
+class LinkCycleError(ValueError):
+    """Raised when a link would close a cycle in acyclic mode"""
+
+
+class CreateLinkUseCase:
+    """Use case for creating a link between mechanics"""
+
+    def __init__(
+        self,
+        link_repo: ILinkRepository,
+        enforce_acyclic: bool = False,
+        unit_of_work: Optional[IUnitOfWork] = None,
+    ):
+        self.link_repo = link_repo
+        self.enforce_acyclic = enforce_acyclic
+        self.unit_of_work = unit_of_work
+
+    async def execute(self, link: EvolutionLink) -> EvolutionLink:
+        """Execute link creation, rejecting cycles when enforce_acyclic is set
+
+        In acyclic mode the link is committed before the lock is released,
+        otherwise a concurrent check could miss it.
+        """
+        if not self.enforce_acyclic:
+            return await self.link_repo.create(link)
+
+        async with acyclic_lock(self.link_repo):
+            created = await self.execute_locked(link)
+            if self.unit_of_work is not None:
+                await self.unit_of_work.commit()
+            return created
+
+    async def execute_locked(self, link: EvolutionLink) -> EvolutionLink:
+        """Execute link creation while the caller holds acyclic_lock()
+
+        Nothing is committed, the caller keeps the lock until it commits.
+        """
+        if self.enforce_acyclic and await self.link_repo.would_create_cycle(link.from_id, link.to_id):
+            raise LinkCycleError(
+                f"Link {link.from_id} -> {link.to_id} would create a cycle"
+            )
+        return await self.link_repo.create(link)
@@ -1,3 +1,5 @@
+from typing import List, Sequence
+
 from app.entities.mechanic import GameMechanic
 from app.interfaces.repos.mechanic_repo import IMechanicRepository
 
@@ -14,3 +16,21 @@ class CreateMechanicUseCase:
             raise ValueError("Mechanic name cannot be empty")
         
         return await self.mechanic_repo.create(mechanic)
+
+
+class CreateMechanicsUseCase:
+    """Use case for creating a batch of mechanics"""
+
+    def __init__(self, mechanic_repo: IMechanicRepository, max_items: int = 1000):
+        self.mechanic_repo = mechanic_repo
+        self.max_items = max_items
+
+    async def execute(self, mechanics: Sequence[GameMechanic]) -> List[GameMechanic]:
+        """Execute batch creation, all mechanics are inserted or none"""
+        if len(mechanics) > self.max_items:
+            raise ValueError(f"Batch has more than {self.max_items} mechanics")
+        for mechanic in mechanics:
+            if not mechanic.name or not mechanic.name.strip():
+                raise ValueError("Mechanic name cannot be empty")
+
+        return await self.mechanic_repo.create_many(mechanics)
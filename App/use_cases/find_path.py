@@ -0,0 +1,183 @@
+from dataclasses import dataclass
+from typing import AbstractSet, Dict, List, Optional, Tuple
+
+from app.entities.mechanic import GameMechanic
+from app.entities.link import EvolutionLink
+from app.interfaces.repos.mechanic_repo import IMechanicRepository
+from app.interfaces.repos.link_repo import ILinkRepository
+
+# mechanic id -> (distance from the search origin, link it was reached by)
+_Visited = Dict[int, Tuple[int, Optional[EvolutionLink]]]
+
+
+@dataclass
+class EvolutionPath:
+    """Chain of links leading from one mechanic to another"""
+    mechanic_ids: List[int]
+    links: List[EvolutionLink]
+
+    @property
+    def length(self) -> int:
+        return len(self.links)
+
+
+class FindEvolutionPathUseCase:
+    """Use case for finding how one mechanic led to another"""
+
+    def __init__(
+        self,
+        mechanic_repo: IMechanicRepository,
+        link_repo: ILinkRepository,
+    ):
+        self.mechanic_repo = mechanic_repo
+        self.link_repo = link_repo
+
+    async def execute(
+        self,
+        from_id: int,
+        to_id: int,
+        k: int = 1,
+        max_depth: Optional[int] = None,
+    ) -> Tuple[List[EvolutionPath], Dict[int, GameMechanic]]:
+        """Execute path search
+
+        Returns up to k loopless paths ordered by length together with the
+        mechanics on them. The first path is found by bidirectional BFS, the
+        following ones by Yen's algorithm on top of it.
+        """
+        endpoints = await self.mechanic_repo.get_many([from_id, to_id])
+        if len(endpoints) < len({from_id, to_id}):
+            raise ValueError("Mechanic not found")
+
+        paths = await self._k_shortest(from_id, to_id, k, max_depth)
+        ids = sorted({id for path in paths for id in path.mechanic_ids})
+        mechanics = {m.id: m for m in await self.mechanic_repo.get_many(ids)}
+        return paths, mechanics
+
+    async def _k_shortest(
+        self,
+        from_id: int,
+        to_id: int,
+        k: int,
+        max_depth: Optional[int],
+    ) -> List[EvolutionPath]:
+        """Yen's k shortest loopless paths over unit-length links"""
+        first = await self._shortest(from_id, to_id, max_depth=max_depth)
+        if first is None:
+            return []
+
+        found = [first]
+        seen = {tuple(l.id for l in first.links)}
+        candidates: List[EvolutionPath] = []
+        while len(found) < k:
+            previous = found[-1]
+            for i in range(len(previous.links)):
+                root_ids = previous.mechanic_ids[:i + 1]
+                banned_links = {
+                    path.links[i].id
+                    for path in found
+                    if path.length > i and path.mechanic_ids[:i + 1] == root_ids
+                }
+                spur = await self._shortest(
+                    root_ids[-1],
+                    to_id,
+                    banned_links,
+                    set(root_ids[:-1]),
+                    None if max_depth is None else max_depth - i,
+                )
+                if spur is None:
+                    continue
+                candidate = EvolutionPath(
+                    mechanic_ids=root_ids[:-1] + spur.mechanic_ids,
+                    links=previous.links[:i] + spur.links,
+                )
+                key = tuple(l.id for l in candidate.links)
+                if key not in seen:
+                    seen.add(key)
+                    candidates.append(candidate)
+
+            if not candidates:
+                break
+            best = min(candidates, key=lambda p: (p.length, [l.id for l in p.links]))
+            candidates.remove(best)
+            found.append(best)
+        return found
+
+    async def _shortest(
+        self,
+        from_id: int,
+        to_id: int,
+        banned_links: AbstractSet[int] = frozenset(),
+        banned_ids: AbstractSet[int] = frozenset(),
+        max_depth: Optional[int] = None,
+    ) -> Optional[EvolutionPath]:
+        """Bidirectional BFS, forward from from_id and backward from to_id
+
+        The smaller frontier is expanded one whole level at a time and the
+        search stops after the first level on which the frontiers meet.
+        """
+        if from_id == to_id:
+            return EvolutionPath(mechanic_ids=[from_id], links=[])
+
+        forward: _Visited = {from_id: (0, None)}
+        backward: _Visited = {to_id: (0, None)}
+        forward_level, backward_level = [from_id], [to_id]
+        searched = 0
+        while forward_level and backward_level:
+            if max_depth is not None and searched >= max_depth:
+                return None
+            searched += 1
+
+            if len(backward_level) < len(forward_level):
+                links = await self.link_repo.list_by_to_ids(backward_level)
+                backward_level, meets = self._advance(links, backward, forward, banned_links, banned_ids, True)
+            else:
+                links = await self.link_repo.list_by_from_ids(forward_level)
+                forward_level, meets = self._advance(links, forward, backward, banned_links, banned_ids, False)
+
+            if meets:
+                middle = min(meets, key=lambda id: (forward[id][0] + backward[id][0], id))
+                return self._join(middle, forward, backward)
+        return None
+
+    @staticmethod
+    def _advance(
+        links: List[EvolutionLink],
+        visited: _Visited,
+        other: _Visited,
+        banned_links: AbstractSet[int],
+        banned_ids: AbstractSet[int],
+        reverse: bool,
+    ) -> Tuple[List[int], List[int]]:
+        """Visit the far ends of links, returning the new level and meeting points"""
+        level, meets = [], []
+        for link in links:
+            near, far = (link.to_id, link.from_id) if reverse else (link.from_id, link.to_id)
+            if far in visited or far in banned_ids or link.id in banned_links:
+                continue
+            visited[far] = (visited[near][0] + 1, link)
+            level.append(far)
+            if far in other:
+                meets.append(far)
+        return level, meets
+
+    @staticmethod
+    def _join(middle: int, forward: _Visited, backward: _Visited) -> EvolutionPath:
+        """Stitch the two search trees together at the meeting mechanic"""
+        ids, links = [middle], []
+        node = middle
+        while forward[node][1] is not None:
+            link = forward[node][1]
+            links.append(link)
+            node = link.from_id
+            ids.append(node)
+        ids.reverse()
+        links.reverse()
+
+        node = middle
+        while backward[node][1] is not None:
+            link = backward[node][1]
+            links.append(link)
+            node = link.to_id
+            ids.append(node)
+        return EvolutionPath(mechanic_ids=ids, links=links)
@@ -0,0 +1,64 @@
+import base64
+import binascii
+import json
+from typing import Optional, Sequence, Tuple
+
+from app.entities.graph import MechanicGraph
+from app.interfaces.repos.link_repo import ILinkRepository
+
+
+def encode_cursor(mechanic_id: int, depth: int) -> str:
+    """Encode continuation cursor of a truncated mechanic"""
+    raw = json.dumps({"id": mechanic_id, "depth": depth}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[int, int]:
+    """Decode continuation cursor into mechanic id and depth"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        data = json.loads(raw)
+        return int(data["id"]), int(data["depth"])
+    except (binascii.Error, ValueError, TypeError, KeyError):
+        raise ValueError("Invalid cursor")
+
+
+class GetMechanicGraphUseCase:
+    """Use case for getting reachable mechanics as a node table and edge list"""
+
+    def __init__(self, link_repo: ILinkRepository):
+        self.link_repo = link_repo
+
+    async def execute(
+        self,
+        mechanic_id: int,
+        max_depth: Optional[int] = None,
+        max_nodes: Optional[int] = None,
+        depth_offset: int = 0,
+        reverse: bool = False,
+        fields: Optional[Sequence[str]] = None,
+    ) -> MechanicGraph:
+        """Execute graph building, every mechanic is returned exactly once
+
+        Mechanics with links leaving the max_depth/max_nodes window are marked
+        as truncated. depth_offset shifts depths when a cursor is expanded.
+        With reverse the graph holds ancestors and child counts count parents.
+        fields narrows the mechanic columns read.
+        """
+        graph = await self.link_repo.get_subgraph(
+            mechanic_id, max_depth, max_nodes, reverse, fields
+        )
+        if not graph:
+            raise ValueError("Mechanic not found")
+
+        links = []
+        for link in graph.links:
+            near, far = (link.to_id, link.from_id) if reverse else (link.from_id, link.to_id)
+            graph.child_counts[near] = graph.child_counts.get(near, 0) + 1
+            if far in graph.mechanics:
+                links.append(link)
+            else:
+                graph.truncated.add(near)
+        graph.links = links
+        graph.depths = {id: depth + depth_offset for id, depth in graph.depths.items()}
+        return graph
@@ -1,10 +1,13 @@
+from collections import defaultdict
 from dataclasses import dataclass
-from typing import List
+from typing import Dict, Iterator, List, Optional, Sequence
 
 from app.entities.mechanic import GameMechanic
 from app.entities.link import EvolutionLink
+from app.entities.graph import MechanicGraph
 from app.interfaces.repos.mechanic_repo import IMechanicRepository
 from app.interfaces.repos.link_repo import ILinkRepository
+from app.use_cases.get_graph import encode_cursor
 
 
 @dataclass
@@ -12,38 +15,108 @@ class MechanicTree:
     """Tree structure for mechanic"""
     mechanic: GameMechanic
     children: List["MechanicTree"]
+    child_count: Optional[int] = None
+    cursor: Optional[str] = None
+
+
+class TreeTooLargeError(ValueError):
+    """Raised when the nested tree would exceed the node cap"""
 
 
 class GetMechanicTreeUseCase:
     """Use case for getting mechanic evolution tree"""
-    
-    def __init__(self, mechanic_repo: IMechanicRepository, link_repo: ILinkRepository):
+
+    def __init__(
+        self,
+        mechanic_repo: IMechanicRepository,
+        link_repo: ILinkRepository,
+        node_cap: Optional[int] = None,
+    ):
         self.mechanic_repo = mechanic_repo
         self.link_repo = link_repo
-    
-    async def execute(self, mechanic_id: int) -> MechanicTree:
-        """Execute tree building"""
-        mechanic = await self.mechanic_repo.get_by_id(mechanic_id)
-        if not mechanic:
+        self.node_cap = node_cap
+
+    async def execute(
+        self,
+        mechanic_id: int,
+        max_depth: Optional[int] = None,
+        max_nodes: Optional[int] = None,
+        depth_offset: int = 0,
+        reverse: bool = False,
+        fields: Optional[Sequence[str]] = None,
+    ) -> MechanicTree:
+        """Execute tree building
+
+        Only mechanics within max_depth links and the first max_nodes
+        mechanics in breadth-first order are expanded, the rest is left to
+        the cursors of truncated nodes. With reverse the children of a node
+        are the mechanics it evolved from. fields narrows the mechanic columns
+        read, see ILinkRepository.get_subgraph.
+        """
+        graph = await self.link_repo.get_subgraph(
+            mechanic_id, max_depth, max_nodes, reverse, fields
+        )
+        if not graph:
             raise ValueError("Mechanic not found")
-        
-        tree = await self._build_tree(mechanic_id, visited=set())
-        return tree
-    
-    async def _build_tree(self, mechanic_id: int, visited: set) -> MechanicTree:
-        """Recursively build mechanic tree"""
-        if mechanic_id in visited:
-            mechanic = await self.mechanic_repo.get_by_id(mechanic_id)
-            return MechanicTree(mechanic=mechanic, children=[])
-        
-        visited.add(mechanic_id)
-        
-        mechanic = await self.mechanic_repo.get_by_id(mechanic_id)
-        links = await self.link_repo.list_by_from_id(mechanic_id)
-        
-        children = []
-        for link in links:
-            child_tree = await self._build_tree(link.to_id, visited.copy())
-            children.append(child_tree)
-        
-        return MechanicTree(mechanic=mechanic, children=children)
+
+        return self._build_tree(graph, max_depth, depth_offset, reverse)
+
+    def _build_tree(
+        self,
+        graph: MechanicGraph,
+        max_depth: Optional[int] = None,
+        depth_offset: int = 0,
+        reverse: bool = False,
+    ) -> MechanicTree:
+        """Assemble mechanic tree from a fetched subgraph
+
+        A mechanic that is already on the current path is emitted as a leaf,
+        which is how cycles are cut. Shared mechanics are expanded once per
+        path, so the node count is capped by node_cap.
+        """
+        children: Dict[int, List[int]] = defaultdict(list)
+        child_counts: Dict[int, int] = defaultdict(int)
+        for link in graph.links:
+            near, far = (link.to_id, link.from_id) if reverse else (link.from_id, link.to_id)
+            child_counts[near] += 1
+            if far in graph.mechanics:
+                children[near].append(far)
+
+        def make_node(mechanic_id: int, depth: int) -> MechanicTree:
+            node = MechanicTree(mechanic=graph.mechanics[mechanic_id], children=[])
+            at_limit = max_depth is not None and depth >= max_depth
+            if child_counts[mechanic_id] and (
+                at_limit or len(children[mechanic_id]) < child_counts[mechanic_id]
+            ):
+                node.child_count = child_counts[mechanic_id]
+                node.cursor = encode_cursor(mechanic_id, depth + depth_offset)
+            return node
+
+        def expand(mechanic_id: int, depth: int) -> Iterator[int]:
+            if max_depth is not None and depth >= max_depth:
+                return iter(())
+            return iter(children[mechanic_id])
+
+        root = make_node(graph.root_id, 0)
+        size = 1
+        path = {graph.root_id}
+        stack = [(root, 0, expand(graph.root_id, 0))]
+        while stack:
+            node, depth, pending = stack[-1]
+            child_id = next(pending, None)
+            if child_id is None:
+                stack.pop()
+                path.discard(node.mechanic.id)
+                continue
+
+            size += 1
+            if self.node_cap is not None and size > self.node_cap:
+                raise TreeTooLargeError(f"Tree has more than {self.node_cap} nodes")
+
+            child = make_node(child_id, depth + 1)
+            node.children.append(child)
+            if child_id not in path:
+                path.add(child_id)
+                stack.append((child, depth + 1, expand(child_id, depth + 1)))
+
+        return root
@@ -0,0 +1,108 @@
+import csv
+import json
+from typing import AsyncIterable, AsyncIterator, List, Optional
+
+from app.entities.link_import import LinkImportReport, LinkImportRow, RejectedLink
+from app.interfaces.repos.link_repo import ILinkRepository
+
+# Ids are stored as 32-bit integers, larger values would abort a COPY
+MAX_ID = 2 ** 31 - 1
+
+
+def _parse_id(value, name: str) -> int:
+    if isinstance(value, bool):
+        raise ValueError(f"{name} must be an integer")
+    try:
+        parsed = int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{name} must be an integer")
+    if isinstance(value, float) and value != parsed:
+        raise ValueError(f"{name} must be an integer")
+    if not 0 < parsed <= MAX_ID:
+        raise ValueError(f"{name} is out of range")
+    return parsed
+
+
+def parse_csv_line(line: str, number: int) -> Optional[LinkImportRow]:
+    """Parse a from_id,to_id,type line, None for the header"""
+    cells = next(csv.reader([line]))
+    if number == 1 and cells and cells[0].strip().lower() == "from_id":
+        return None
+    if len(cells) != 3:
+        raise ValueError("expected from_id,to_id,type")
+    return LinkImportRow(
+        line=number,
+        from_id=_parse_id(cells[0].strip(), "from_id"),
+        to_id=_parse_id(cells[1].strip(), "to_id"),
+        type=cells[2].strip(),
+    )
+
+
+def parse_ndjson_line(line: str, number: int) -> LinkImportRow:
+    """Parse a {"from_id": ..., "to_id": ..., "type": ...} line"""
+    try:
+        item = json.loads(line)
+    except json.JSONDecodeError:
+        raise ValueError("invalid JSON")
+    if not isinstance(item, dict):
+        raise ValueError("expected a JSON object")
+    link_type = item.get("type")
+    if link_type is not None and not isinstance(link_type, str):
+        raise ValueError("type must be a string")
+    return LinkImportRow(
+        line=number,
+        from_id=_parse_id(item.get("from_id"), "from_id"),
+        to_id=_parse_id(item.get("to_id"), "to_id"),
+        type=(link_type or "").strip(),
+    )
+
+
+class ImportLinksUseCase:
+    """Use case for importing a large set of links from CSV or NDJSON lines"""
+
+    def __init__(
+        self,
+        link_repo: ILinkRepository,
+        batch_size: int = 5000,
+        max_reported: int = 1000,
+    ):
+        self.link_repo = link_repo
+        self.batch_size = batch_size
+        self.max_reported = max_reported
+
+    async def execute(self, lines: AsyncIterable[str], fmt: str = "csv") -> LinkImportReport:
+        """Execute import
+
+        Lines are parsed and handed to the repository batch by batch, so
+        the input is never held in memory at once. Malformed lines are
+        rejected here, the repository rejects rows that do not fit the
+        graph. At most max_reported rejections are listed.
+        """
+        parse = parse_ndjson_line if fmt == "ndjson" else parse_csv_line
+        rejected: List[RejectedLink] = []
+
+        async def batches() -> AsyncIterator[List[LinkImportRow]]:
+            batch = []
+            number = 0
+            async for line in lines:
+                number += 1
+                if not line.strip():
+                    continue
+                try:
+                    row = parse(line, number)
+                except ValueError as exc:
+                    rejected.append(RejectedLink(line=number, reason=str(exc)))
+                    continue
+                if row is not None:
+                    batch.append(row)
+                if len(batch) >= self.batch_size:
+                    yield batch
+                    batch = []
+            if batch:
+                yield batch
+
+        report = await self.link_repo.import_links(batches())
+        rejected = sorted(rejected + report.rejected, key=lambda r: r.line)
+        report.rejected_count = len(rejected)
+        report.rejected = rejected[:self.max_reported]
+        return report
@@ -0,0 +1,84 @@
+from typing import AsyncIterator, Optional, Sequence, Tuple, Union
+
+from app.entities.mechanic import GameMechanic
+from app.entities.link import EvolutionLink
+from app.interfaces.repos.mechanic_repo import IMechanicRepository
+from app.interfaces.repos.link_repo import ILinkRepository
+
+# ("node", mechanic, depth) or ("edge", link, None)
+GraphEvent = Tuple[str, Union[GameMechanic, EvolutionLink], Optional[int]]
+
+
+class StreamMechanicGraphUseCase:
+    """Use case for walking the evolution graph as a stream of nodes and edges"""
+
+    def __init__(
+        self,
+        mechanic_repo: IMechanicRepository,
+        link_repo: ILinkRepository,
+        batch_size: int = 500,
+    ):
+        self.mechanic_repo = mechanic_repo
+        self.link_repo = link_repo
+        self.batch_size = batch_size
+
+    async def execute(
+        self,
+        mechanic_id: int,
+        max_depth: Optional[int] = None,
+        reverse: bool = False,
+        fields: Optional[Sequence[str]] = None,
+    ) -> AsyncIterator[GraphEvent]:
+        """Check the root exists and return the event stream of its walk
+
+        fields narrows the mechanic columns read, see IMechanicRepository.get_many.
+        """
+        roots = await self.mechanic_repo.get_many([mechanic_id], fields)
+        if not roots:
+            raise ValueError("Mechanic not found")
+
+        return self._walk(roots[0], max_depth, reverse, fields)
+
+    async def _walk(
+        self,
+        root: GameMechanic,
+        max_depth: Optional[int],
+        reverse: bool,
+        fields: Optional[Sequence[str]],
+    ) -> AsyncIterator[GraphEvent]:
+        """Breadth-first walk that yields each batch as soon as it is loaded
+
+        Only the current level and the ids seen so far are held in memory,
+        mechanics and links are handed out and dropped batch by batch.
+        """
+        list_links = self.link_repo.list_by_to_ids if reverse else self.link_repo.list_by_from_ids
+        seen = {root.id}
+        missing = set()
+        yield "node", root, 0
+
+        level = [root.id]
+        depth = 0
+        while level and (max_depth is None or depth < max_depth):
+            depth += 1
+            next_level = []
+            for start in range(0, len(level), self.batch_size):
+                links = await list_links(level[start:start + self.batch_size])
+
+                new_ids = []
+                for link in links:
+                    far = link.from_id if reverse else link.to_id
+                    if far not in seen:
+                        seen.add(far)
+                        new_ids.append(far)
+
+                found = set()
+                for mechanic in await self.mechanic_repo.get_many(new_ids, fields):
+                    found.add(mechanic.id)
+                    next_level.append(mechanic.id)
+                    yield "node", mechanic, depth
+                missing.update(id for id in new_ids if id not in found)
+
+                for link in links:
+                    if (link.from_id if reverse else link.to_id) not in missing:
+                        yield "edge", link, None
+            level = next_level
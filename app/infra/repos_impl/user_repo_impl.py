@@ -1,11 +1,16 @@
 from typing import Optional
-from sqlalchemy import select
+from sqlalchemy import bindparam, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.entities.user import User
 from app.infra.database.models import UserDB
 from app.interfaces.repos.user_repo import IUserRepository
 
+# Lookups run on every authenticated request, so they are built once
+_BY_ID = select(UserDB).where(UserDB.id == bindparam("id"))
+_BY_EMAIL = select(UserDB).where(UserDB.email == bindparam("email"))
+_BY_USERNAME = select(UserDB).where(UserDB.username == bindparam("username"))
+
 
 class UserRepository(IUserRepository):
     """Implementation of user repository"""
@@ -22,7 +27,7 @@ class UserRepository(IUserRepository):
             is_verified=user.is_verified
         )
         self.session.add(db_user)
-        await self.session.commit()
+        await self.session.flush()
         await self.session.refresh(db_user)
         
         return User(
@@ -36,8 +41,7 @@ class UserRepository(IUserRepository):
 
     async def get_by_email(self, email: str) -> Optional[User]:
         """Get user by email"""
-        stmt = select(UserDB).where(UserDB.email == email)
-        result = await self.session.execute(stmt)
+        result = await self.session.execute(_BY_EMAIL, {"email": email})
         db_user = result.scalars().first()
         
         if not db_user:
@@ -54,8 +58,7 @@ class UserRepository(IUserRepository):
 
     async def get_by_username(self, username: str) -> Optional[User]:
         """Get user by username"""
-        stmt = select(UserDB).where(UserDB.username == username)
-        result = await self.session.execute(stmt)
+        result = await self.session.execute(_BY_USERNAME, {"username": username})
         db_user = result.scalars().first()
         
         if not db_user:
@@ -72,7 +75,8 @@ class UserRepository(IUserRepository):
 
     async def get_by_id(self, id: int) -> Optional[User]:
         """Get user by id"""
-        db_user = await self.session.get(UserDB, id)
+        result = await self.session.execute(_BY_ID, {"id": id})
+        db_user = result.scalars().first()
         if not db_user:
             return None
         
@@ -96,8 +100,7 @@ class UserRepository(IUserRepository):
         db_user.hashed_password = user.hashed_password
         db_user.is_verified = user.is_verified
         
-        await self.session.commit()
-        await self.session.refresh(db_user)
+        await self.session.flush()
         
         return User(
             id=db_user.id,
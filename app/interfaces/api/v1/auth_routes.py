@@ -6,16 +6,21 @@ from app.interfaces.api.dependencies import (
     get_user_repo,
     get_email_token_repo,
     get_current_user,
+    get_unit_of_work,
 )
+from app.interfaces.api.routing import UnitOfWorkRoute
+from app.interfaces.repos.unit_of_work import IUnitOfWork
 from app.use_cases.auth import RegisterUserUseCase, VerifyEmailUseCase, AuthenticateUserUseCase
 
-router = APIRouter(prefix="/auth", tags=["auth"])
+# Repositories only flush, the request's unit of work commits their writes
+router = APIRouter(prefix="/auth", tags=["auth"], route_class=UnitOfWorkRoute)
 
 
 @router.post("/register", response_model=auth_schemas.RegisterResponse, status_code=201)
 async def register(
     request: auth_schemas.UserRegisterRequest,
     session=Depends(get_db_session),
+    unit_of_work: IUnitOfWork = Depends(get_unit_of_work),
 ):
     """Register new user"""
     user_repo = get_user_repo(session)
@@ -38,6 +43,7 @@ async def register(
 async def verify_email(
     request: auth_schemas.VerifyEmailRequest,
     session=Depends(get_db_session),
+    unit_of_work: IUnitOfWork = Depends(get_unit_of_work),
 ):
     """Verify email with token"""
     user_repo = get_user_repo(session)
@@ -7,13 +7,17 @@ from app.interfaces.api.dependencies import (
     get_mechanic_repo,
     get_link_repo,
     get_current_user,
+    get_unit_of_work,
 )
+from app.interfaces.api.routing import UnitOfWorkRoute
+from app.interfaces.repos.unit_of_work import IUnitOfWork
 from app.use_cases.create_mechanic import CreateMechanicUseCase
 from app.use_cases.get_tree import GetMechanicTreeUseCase
 from app.entities.mechanic import GameMechanic
 from app.entities.link import EvolutionLink
 
-router = APIRouter(prefix="/mechanics", tags=["mechanics"])
+# Repositories only flush, the request's unit of work commits their writes
+router = APIRouter(prefix="/mechanics", tags=["mechanics"], route_class=UnitOfWorkRoute)
 
 
 @router.post("/", response_model=schemas.MechanicDTO, status_code=201)
@@ -21,6 +25,7 @@ async def create_mechanic(
     dto: schemas.MechanicDTO,
     current_user: str = Depends(get_current_user),
     session=Depends(get_db_session),
+    unit_of_work: IUnitOfWork = Depends(get_unit_of_work),
 ):
     """Create a new game mechanic (requires authentication)"""
     repo = get_mechanic_repo(session)
@@ -39,6 +44,7 @@ async def create_link(
     dto: schemas.LinkDTO,
     current_user: str = Depends(get_current_user),
     session=Depends(get_db_session),
+    unit_of_work: IUnitOfWork = Depends(get_unit_of_work),
 ):
     """Create a link between two mechanics (requires authentication)"""
     repo = get_link_repo(session)
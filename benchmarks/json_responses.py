@@ -0,0 +1,77 @@
+"""Cost of rendering listing and tree bodies the validated way vs FastJSONResponse
+
+    python -m benchmarks.json_responses [rows] [repeat]
+
+The validated path is what a route returning entities with a response_model
+does: validate them into the response model, dump it in JSON mode and
+render it with the standard library. The tree had no response model and
+went through jsonable_encoder. The fast path renders the entities directly,
+with orjson when it is installed and with the standard library otherwise.
+"""
+import sys
+import time
+from typing import List
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+from app.entities.mechanic import GameMechanic
+from app.interfaces.api import responses
+from app.interfaces.api.responses import FastJSONResponse
+from app.interfaces.api.v1.schemas import MechanicResponse
+from app.use_cases.get_tree import MechanicTree
+
+
+def _tree(mechanics: List[GameMechanic], fanout: int = 4) -> MechanicTree:
+    """Complete tree over the mechanics in breadth-first order"""
+    nodes = [MechanicTree(mechanic=m, children=[]) for m in mechanics]
+    for i, node in enumerate(nodes[1:], start=1):
+        nodes[(i - 1) // fanout].children.append(node)
+    return nodes[0]
+
+
+def _best_of(repeat: int, render) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        render()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(rows: int = 10000, repeat: int = 5) -> None:
+    mechanics = [
+        GameMechanic(id=i, name=f"Mechanic {i}", description="x" * 40, year=1980 + i % 40)
+        for i in range(1, rows + 1)
+    ]
+    tree = _tree(mechanics)
+    listing = TypeAdapter(List[MechanicResponse])
+
+    def validated_listing():
+        content = listing.dump_python(listing.validate_python(mechanics, from_attributes=True), mode="json")
+        return JSONResponse(content).body
+
+    cases = [
+        ("listing", validated_listing, lambda: FastJSONResponse(mechanics).body),
+        ("tree", lambda: JSONResponse(jsonable_encoder(tree)).body, lambda: FastJSONResponse(tree).body),
+    ]
+
+    orjson = responses.orjson
+    print(f"{rows} mechanics, best of {repeat}")
+    for name, validated, fast in cases:
+        assert validated() == fast()
+        before = _best_of(repeat, validated)
+        after = _best_of(repeat, fast)
+        responses.orjson = None
+        stdlib = _best_of(repeat, fast)
+        responses.orjson = orjson
+        print(f"  {name}:")
+        print(f"    validated:        {before * 1000:7.1f} ms")
+        if orjson is not None:
+            print(f"    fast, orjson:     {after * 1000:7.1f} ms  ({before / after:.1f}x)")
+        print(f"    fast, json:       {stdlib * 1000:7.1f} ms  ({before / stdlib:.1f}x)")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
@@ -0,0 +1,60 @@
+"""Per-row cost of loading a mechanics listing as ORM instances vs column rows
+
+    python -m benchmarks.listing_projection [rows] [repeat]
+
+Runs against an in-memory SQLite database, so the numbers show the Python
+side of the read path rather than network or server time.
+"""
+import asyncio
+import sys
+import time
+
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.entities.mechanic import GameMechanic
+from app.infra.database.models import Base, MechanicDB
+from app.infra.repos_impl.mechanic_repo_impl import MechanicRepository
+
+
+async def _orm_listing(session: AsyncSession, limit: int):
+    """The listing as it was read before: full ORM instances"""
+    result = await session.execute(select(MechanicDB).order_by(MechanicDB.id).limit(limit))
+    return [
+        GameMechanic(id=m.id, name=m.name, description=m.description, year=m.year)
+        for m in result.scalars()
+    ]
+
+
+async def _best_of(repeat: int, session_factory, read) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        async with session_factory() as session:
+            start = time.perf_counter()
+            await read(session)
+            best = min(best, time.perf_counter() - start)
+    return best
+
+
+async def main(rows: int = 20000, repeat: int = 5) -> None:
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(
+            insert(MechanicDB),
+            [{"name": f"Mechanic {i}", "description": "x" * 40, "year": 1980 + i % 40} for i in range(rows)],
+        )
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+
+    orm = await _best_of(repeat, session_factory, lambda s: _orm_listing(s, rows))
+    columns = await _best_of(repeat, session_factory, lambda s: MechanicRepository(s).list_page(limit=rows))
+    await engine.dispose()
+
+    print(f"{rows} rows, best of {repeat}")
+    print(f"  ORM instances: {orm * 1000:8.1f} ms  {orm / rows * 1e6:6.2f} us/row")
+    print(f"  column rows:   {columns * 1000:8.1f} ms  {columns / rows * 1e6:6.2f} us/row")
+    print(f"  speedup:       {orm / columns:8.2f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(*(int(arg) for arg in sys.argv[1:3])))
@@ -0,0 +1,83 @@
+"""Per-query Python overhead of building a lookup on every call vs a prebuilt statement
+
+    python -m benchmarks.statement_cache [queries] [repeat]
+
+Runs the repositories' hot lookups on a synchronous in-memory SQLite
+connection, so driver and thread hand-off costs are near zero and the
+numbers show SQLAlchemy's side of a query: statement construction, cache
+key generation, compiled cache lookup and result handling.
+"""
+import sys
+import time
+
+from sqlalchemy import create_engine, insert, select
+
+from app.infra.database.models import Base, LinkDB, MechanicDB, UserDB
+from app.infra.repos_impl import link_repo_impl, mechanic_repo_impl, user_repo_impl
+
+ROWS = 1000
+
+# (name, statement built per call, prebuilt statement, parameter name)
+LOOKUPS = [
+    (
+        "mechanic by id",
+        lambda id: select(*mechanic_repo_impl.MECHANIC_COLUMNS).where(MechanicDB.id == id),
+        mechanic_repo_impl._BY_ID,
+        "id",
+    ),
+    (
+        "links from id",
+        lambda id: select(*link_repo_impl.LINK_COLUMNS).where(LinkDB.from_id == id),
+        link_repo_impl._BY_FROM_ID,
+        "id",
+    ),
+    (
+        "user by email",
+        lambda email: select(UserDB).where(UserDB.email == email),
+        user_repo_impl._BY_EMAIL,
+        "email",
+    ),
+]
+
+
+def _best_of(repeat: int, queries: int, run) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for i in range(queries):
+            run(i % ROWS + 1)
+        best = min(best, time.perf_counter() - start)
+    return best / queries
+
+
+def main(queries: int = 20000, repeat: int = 5) -> None:
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(MechanicDB), [{"name": f"Mechanic {i}"} for i in range(ROWS)])
+        conn.execute(
+            insert(LinkDB),
+            [{"from_id": i, "to_id": i % ROWS + 1, "type": "evolution"} for i in range(1, ROWS + 1)],
+        )
+        conn.execute(
+            insert(UserDB),
+            [
+                {"email": f"user{i}@example.com", "username": f"user{i}", "hashed_password": "x"}
+                for i in range(1, ROWS + 1)
+            ],
+        )
+
+    print(f"{queries} queries, best of {repeat}")
+    with engine.connect() as conn:
+        for name, build, prebuilt, param in LOOKUPS:
+            value = (lambda i: f"user{i}@example.com") if param == "email" else (lambda i: i)
+            built = _best_of(repeat, queries, lambda i: conn.execute(build(value(i))).all())
+            cached = _best_of(repeat, queries, lambda i: conn.execute(prebuilt, {param: value(i)}).all())
+            print(f"  {name}:")
+            print(f"    built per call: {built * 1e6:6.1f} us/query")
+            print(f"    prebuilt:       {cached * 1e6:6.1f} us/query  ({built / cached:.2f}x)")
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
@@ -1,6 +1,24 @@
 import { create } from 'zustand'
 
 const API_BASE = import.meta.env.VITE_API_URL || 'http://localhost:8000'
+const PAGE_SIZE = 1000
+// Sends the db_primary_until cookie, reads after a write then see that write
+const CREDENTIALS = 'include'
+
+// Follow X-Next-Cursor until the listing is exhausted
+const fetchAllPages = async (url) => {
+  const items = []
+  let cursor = null
+  do {
+    const params = new URLSearchParams({ limit: PAGE_SIZE })
+    if (cursor !== null) params.set('after', cursor)
+    const response = await fetch(`${url}?${params}`, { credentials: CREDENTIALS })
+    if (!response.ok) throw new Error(`Request failed: ${response.status}`)
+    items.push(...(await response.json()))
+    cursor = response.headers.get('X-Next-Cursor')
+  } while (cursor)
+  return items
+}
 
 export const useStore = create((set, get) => ({
   // State
@@ -21,8 +39,7 @@ export const useStore = create((set, get) => ({
   fetchMechanics: async () => {
     try {
       set({ isLoading: true })
-      const response = await fetch(`${API_BASE}/api/v1/mechanics/`)
-      const data = await response.json()
+      const data = await fetchAllPages(`${API_BASE}/api/v1/mechanics/`)
       set({ mechanics: data, isLoading: false })
     } catch (err) {
       set({ error: err.message, isLoading: false })
@@ -32,7 +49,9 @@ export const useStore = create((set, get) => ({
   fetchMechanicTree: async (id) => {
     try {
       set({ isLoading: true })
-      const response = await fetch(`${API_BASE}/api/v1/mechanics/${id}/tree`)
+      const response = await fetch(`${API_BASE}/api/v1/mechanics/${id}/tree?format=tree`, {
+        credentials: CREDENTIALS
+      })
       const data = await response.json()
       set({ isLoading: false })
       return data
@@ -44,8 +63,7 @@ export const useStore = create((set, get) => ({
 
   fetchLinks: async () => {
     try {
-      const response = await fetch(`${API_BASE}/api/v1/mechanics/links`)
-      const data = await response.json()
+      const data = await fetchAllPages(`${API_BASE}/api/v1/mechanics/links`)
       set({ links: data })
     } catch (err) {
       set({ error: err.message })
@@ -56,6 +74,7 @@ export const useStore = create((set, get) => ({
     try {
       const response = await fetch(`${API_BASE}/api/v1/mechanics/`, {
         method: 'POST',
+        credentials: CREDENTIALS,
         headers: {
           'Content-Type': 'application/json'
         },
@@ -75,6 +94,7 @@ export const useStore = create((set, get) => ({
     try {
       const response = await fetch(`${API_BASE}/api/v1/mechanics/links`, {
         method: 'POST',
+        credentials: CREDENTIALS,
         headers: {
           'Content-Type': 'application/json'
         },
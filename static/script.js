@@ -1,5 +1,7 @@
 // API Configuration
 const API_BASE = 'http://localhost:8000/api/v1';
+// Sends the db_primary_until cookie, reads after a write then see that write
+const CREDENTIALS = 'include';
 
 // State
 let accessToken = null;
@@ -235,19 +237,28 @@ function showNodeInfo(data) {
     `;
 }
 
-async function loadAllMechanics() {
-    try {
-        const response = await fetch(`${API_BASE}/mechanics/`, {
+// Follow X-Next-Cursor until the listing is exhausted
+async function fetchAllPages(url) {
+    const items = [];
+    let cursor = null;
+    do {
+        const params = new URLSearchParams({ limit: 1000 });
+        if (cursor !== null) params.set('after', cursor);
+        const response = await fetch(`${url}?${params}`, {
+            credentials: CREDENTIALS,
             headers: getAuthHeaders()
         });
+        if (!response.ok) throw new Error(`Failed to load ${url}`);
+        items.push(...(await response.json()));
+        cursor = response.headers.get('X-Next-Cursor');
+    } while (cursor);
+    return items;
+}
 
-        if (!response.ok) throw new Error('Failed to load mechanics');
-
-        const mechanics = await response.json();
-        const linksResponse = await fetch(`${API_BASE}/mechanics/links`, {
-            headers: getAuthHeaders()
-        });
-        const links = linksResponse.ok ? await linksResponse.json() : [];
+async function loadAllMechanics() {
+    try {
+        const mechanics = await fetchAllPages(`${API_BASE}/mechanics/`);
+        const links = await fetchAllPages(`${API_BASE}/mechanics/links`).catch(() => []);
         displayGraph(mechanics, links);
     } catch (error) {
         console.error('Error loading mechanics:', error);
@@ -300,6 +311,7 @@ async function addMechanic() {
     try {
         const response = await fetch(`${API_BASE}/mechanics/`, {
             method: 'POST',
+            credentials: CREDENTIALS,
             headers: getAuthHeaders(),
             body: JSON.stringify({ name, description: description || null, year })
         });
@@ -330,6 +342,7 @@ async function addLink() {
     try {
         const response = await fetch(`${API_BASE}/mechanics/links`, {
             method: 'POST',
+            credentials: CREDENTIALS,
             headers: getAuthHeaders(),
             body: JSON.stringify({ from_id, to_id, type })
         });
@@ -355,7 +368,8 @@ async function viewTree() {
     }
 
     try {
-        const response = await fetch(`${API_BASE}/mechanics/${rootId}/tree`, {
+        const response = await fetch(`${API_BASE}/mechanics/${rootId}/tree?format=tree`, {
+            credentials: CREDENTIALS,
             headers: getAuthHeaders()
         });
 
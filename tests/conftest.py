@@ -106,32 +106,39 @@ async def sample_user():
 
 
 @pytest.fixture
-async def created_mechanic(mechanic_repo, sample_mechanic):
-    """Create and return a mechanic in database"""
-    return await mechanic_repo.create(sample_mechanic)
+async def created_mechanic(test_db_session, mechanic_repo, sample_mechanic):
+    """Create, commit and return a mechanic in database"""
+    mechanic = await mechanic_repo.create(sample_mechanic)
+    await test_db_session.commit()
+    return mechanic
 
 
 @pytest.fixture
-async def created_mechanics(mechanic_repo, sample_mechanic, sample_mechanic_2):
-    """Create and return multiple mechanics"""
+async def created_mechanics(test_db_session, mechanic_repo, sample_mechanic, sample_mechanic_2):
+    """Create, commit and return multiple mechanics"""
     mech1 = await mechanic_repo.create(sample_mechanic)
     mech2 = await mechanic_repo.create(sample_mechanic_2)
+    await test_db_session.commit()
     return [mech1, mech2]
 
 
 @pytest.fixture
-async def created_link(link_repo, created_mechanics):
-    """Create and return a link between two mechanics"""
+async def created_link(test_db_session, link_repo, created_mechanics):
+    """Create, commit and return a link between two mechanics"""
     link = EvolutionLink(
         id=None,
         from_id=created_mechanics[0].id,
         to_id=created_mechanics[1].id,
         type="inheritance"
     )
-    return await link_repo.create(link)
+    created = await link_repo.create(link)
+    await test_db_session.commit()
+    return created
 
 
 @pytest.fixture
-async def created_user(user_repo, sample_user):
-    """Create and return a user in database"""
-    return await user_repo.create(sample_user)
+async def created_user(test_db_session, user_repo, sample_user):
+    """Create, commit and return a user in database"""
+    user = await user_repo.create(sample_user)
+    await test_db_session.commit()
+    return user
@@ -93,7 +93,7 @@ class TestMechanicsAPI:
     @pytest.mark.asyncio
     async def test_get_mechanic_tree(self, client, created_mechanic):
         """Test GET /api/v1/mechanics/{id}/tree"""
-        response = client.get(f"/api/v1/mechanics/{created_mechanic.id}/tree")
+        response = client.get(f"/api/v1/mechanics/{created_mechanic.id}/tree?format=tree")
         
         assert response.status_code == 200
         data = response.json()
@@ -0,0 +1,161 @@
+import asyncio
+import gzip
+import zlib
+
+import pytest
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
+from httpx import AsyncClient
+
+from app.interfaces.api.compression import CompressionMiddleware, choose_encoding
+
+LARGE = [{"id": i, "name": f"Mechanic {i}", "description": None, "year": 1990} for i in range(200)]
+
+
+def _app(minimum_size=500):
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=minimum_size, gzip_level=6)
+
+    @app.get("/large")
+    async def large():
+        return JSONResponse(LARGE, headers={"ETag": '"v1"'})
+
+    @app.get("/cached")
+    async def cached(request: Request):
+        if request.headers.get("if-none-match") in ('"v1"', 'W/"v1"'):
+            return Response(status_code=304, headers={"ETag": '"v1"'})
+        return JSONResponse(LARGE, headers={"ETag": '"v1"'})
+
+    @app.get("/small")
+    async def small():
+        return {"status": "ok"}
+
+    @app.get("/stream")
+    async def stream():
+        async def lines():
+            for item in LARGE[:50]:
+                yield JSONResponse(item).body + b"\n"
+        return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+    return app
+
+
+async def _call(app, path, accept_encoding="gzip", headers=()):
+    """Run one request through the ASGI app, returning the sent messages"""
+    scope = {
+        "type": "http", "method": "GET", "path": path, "raw_path": path.encode(),
+        "query_string": b"", "root_path": "", "scheme": "http", "http_version": "1.1",
+        "server": ("test", 80), "client": ("test", 1234),
+        "headers": [(b"accept-encoding", accept_encoding.encode()), *headers],
+    }
+    messages = []
+    requested = asyncio.Event()
+
+    async def receive():
+        if requested.is_set():
+            await asyncio.Event().wait()  # the client never disconnects
+        requested.set()
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    await app(scope, receive, send)
+    return messages[0], messages[1:]
+
+
+class TestCompressionMiddleware:
+    """Tests for response compression"""
+
+    def test_negotiates_encoding(self):
+        """Test Accept-Encoding parsing, gzip is the fallback without brotli"""
+        assert choose_encoding("gzip, deflate") == "gzip"
+        assert choose_encoding("gzip;q=0, identity") is None
+        assert choose_encoding("*") == "gzip"
+        assert choose_encoding("") is None
+
+    @pytest.mark.asyncio
+    async def test_compresses_large_body(self):
+        """Test that a large JSON body is gzipped and its ETag weakened"""
+        async with AsyncClient(app=_app(), base_url="http://test") as client:
+            response = await client.get("/large", headers={"Accept-Encoding": "gzip"})
+
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.headers["etag"] == 'W/"v1"'
+        assert "Accept-Encoding" in response.headers["vary"]
+        assert response.json() == LARGE
+        assert int(response.headers.get("content-length", 0)) != len(response.content)
+
+    @pytest.mark.asyncio
+    async def test_not_modified_keeps_the_weak_etag(self):
+        """Test that a 304 repeats the validator of the compressed 200"""
+        codings = ["gzip", "identity"]
+        if choose_encoding("br") == "br":
+            codings.append("br")
+        for accept_encoding in codings:
+            start, _ = await _call(_app(), "/cached", accept_encoding)
+            etag = dict(start["headers"])[b"etag"]
+            start, body = await _call(
+                _app(), "/cached", accept_encoding, [(b"if-none-match", etag)]
+            )
+
+            assert start["status"] == 304
+            assert dict(start["headers"])[b"etag"] == etag
+            assert etag == (b'"v1"' if accept_encoding == "identity" else b'W/"v1"')
+
+    @pytest.mark.asyncio
+    async def test_small_body_is_not_compressed(self):
+        """Test that bodies under the threshold pass through untouched"""
+        start, body = await _call(_app(), "/small")
+        headers = dict(start["headers"])
+
+        assert b"content-encoding" not in headers
+        assert headers[b"content-length"] == b"15"
+        assert body[0]["body"] == b'{"status":"ok"}'
+
+    @pytest.mark.asyncio
+    async def test_identity_when_not_accepted(self):
+        """Test that clients without gzip get the plain body"""
+        start, body = await _call(_app(), "/large", accept_encoding="identity")
+
+        assert b"content-encoding" not in dict(start["headers"])
+        assert b"".join(m.get("body", b"") for m in body) == JSONResponse(LARGE).body
+
+    @pytest.mark.asyncio
+    async def test_stream_is_flushed_per_chunk(self):
+        """Test that a streamed body is compressed chunk by chunk"""
+        start, body = await _call(_app(minimum_size=100), "/stream")
+        assert dict(start["headers"])[b"content-encoding"] == b"gzip"
+
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        decoded = [decompressor.decompress(m["body"]) for m in body]
+        # Every flushed chunk decodes to whole lines on its own
+        assert all(chunk.endswith(b"\n") for chunk in decoded if chunk)
+        assert len([chunk for chunk in decoded if chunk]) > 1
+        assert gzip.decompress(b"".join(m["body"] for m in body)).count(b"\n") == 50
+
+    @pytest.mark.asyncio
+    async def test_brotli_round_trip(self):
+        """Test that br is preferred when installed and decodes to the body"""
+        brotli = pytest.importorskip("brotli")
+        assert choose_encoding("gzip, br") == "br"
+
+        start, body = await _call(_app(), "/large", accept_encoding="br")
+        headers = dict(start["headers"])
+
+        assert headers[b"content-encoding"] == b"br"
+        assert headers[b"etag"] == b'W/"v1"'
+        assert brotli.decompress(b"".join(m["body"] for m in body)) == JSONResponse(LARGE).body
+
+    @pytest.mark.asyncio
+    async def test_brotli_stream_is_flushed_per_chunk(self):
+        """Test that a streamed body is brotli compressed chunk by chunk"""
+        brotli = pytest.importorskip("brotli")
+        start, body = await _call(_app(minimum_size=100), "/stream", accept_encoding="br")
+        assert dict(start["headers"])[b"content-encoding"] == b"br"
+
+        decompressor = brotli.Decompressor()
+        decoded = [decompressor.process(m["body"]) for m in body]
+        assert all(chunk.endswith(b"\n") for chunk in decoded if chunk)
+        assert len([chunk for chunk in decoded if chunk]) > 1
+        assert brotli.decompress(b"".join(m["body"] for m in body)).count(b"\n") == 50
@@ -0,0 +1,87 @@
+from typing import List
+
+import pytest
+from fastapi import APIRouter, Depends, FastAPI
+from httpx import AsyncClient
+from pydantic import BaseModel, field_validator
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.infra.database.models import Base
+from app.infra.database.pool_metrics import metered_pool_class
+from app.interfaces.api.dependencies import get_db_session, get_mechanic_repository
+from app.interfaces.api.routing import UnitOfWorkRoute
+from app.interfaces.api.v1.routes import router as v1_router
+from app.interfaces.repos.mechanic_repo import IMechanicRepository
+
+# Connections checked out while a response was being serialized
+checked_out_during_serialization: List[int] = []
+
+
+@pytest.fixture
+async def engine(tmp_path):
+    """File database behind a metered queue pool"""
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'app.db'}",
+        poolclass=metered_pool_class(AsyncAdaptedQueuePool),
+        pool_size=2,
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield engine
+    await engine.dispose()
+
+
+@pytest.fixture
+async def api_client(engine):
+    """Client whose requests open real sessions on the metered engine"""
+
+    class MechanicNames(BaseModel):
+        names: List[str]
+
+        @field_validator("names")
+        @classmethod
+        def record_pool(cls, names):
+            checked_out_during_serialization.append(engine.pool.checkedout())
+            return names
+
+    probe = APIRouter(route_class=UnitOfWorkRoute)
+
+    @probe.get("/probe", response_model=MechanicNames)
+    async def list_names(mechanic_repo: IMechanicRepository = Depends(get_mechanic_repository)):
+        return {"names": [m.name for m in await mechanic_repo.list_all()]}
+
+    app = FastAPI()
+    app.include_router(v1_router)
+    app.include_router(probe)
+
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def override_get_db_session():
+        async with session_factory() as session:
+            yield session
+
+    app.dependency_overrides[get_db_session] = override_get_db_session
+
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        yield client
+
+
+@pytest.mark.asyncio
+async def test_invalid_request_checks_out_no_connection(api_client, engine):
+    checkouts = engine.pool.metrics.checkouts
+    r_list = await api_client.get("/api/v1/mechanics/", params={"limit": 0})
+    assert r_list.status_code == 422
+    assert engine.pool.metrics.checkouts == checkouts
+
+
+@pytest.mark.asyncio
+async def test_connection_released_before_serialization(api_client, engine):
+    r_create = await api_client.post("/api/v1/mechanics/", json={"name": "Jump"})
+    assert r_create.status_code == 201
+
+    checked_out_during_serialization.clear()
+    r_probe = await api_client.get("/probe")
+    assert r_probe.json() == {"names": ["Jump"]}
+    assert checked_out_during_serialization == [0]
+    assert engine.pool.checkedout() == 0
@@ -1,6 +1,9 @@
+import json
+
 import pytest
 from fastapi import FastAPI
 from httpx import AsyncClient
+from sqlalchemy import event, text
 
 from app.interfaces.api.v1.routes import router as v1_router
 from app.interfaces.api.dependencies import get_db_session
@@ -64,6 +67,18 @@ async def test_create_link_between_mechanics(api_client):
     link = r_link.json()
     assert link["from_id"] == m1["id"] and link["to_id"] == m2["id"]
 
+    r_duplicate = await api_client.post(
+        "/api/v1/mechanics/links",
+        json={"from_id": m1["id"], "to_id": m2["id"], "type": "evolution"},
+    )
+    assert r_duplicate.status_code == 409
+
+    r_unknown = await api_client.post(
+        "/api/v1/mechanics/links",
+        json={"from_id": m1["id"], "to_id": 9999, "type": "evolution"},
+    )
+    assert r_unknown.status_code == 404
+
     r_links = await api_client.get("/api/v1/mechanics/links")
     assert r_links.status_code == 200
     data = r_links.json()
@@ -97,4 +112,440 @@ async def test_links_removed_when_mechanic_deleted(api_client):
 
     r_links_after = await api_client.get("/api/v1/mechanics/links")
     assert r_links_after.status_code == 200
-    assert r_links_after.json() == []
\ No newline at end of file
+    assert r_links_after.json() == []
+
+
+@pytest.mark.asyncio
+async def test_tree_graph_format_lists_shared_mechanic_once(api_client):
+    ids = []
+    for name in ("Root", "Left", "Right", "Shared"):
+        r = await api_client.post("/api/v1/mechanics/", json={"name": name})
+        ids.append(r.json()["id"])
+    for from_idx, to_idx in [(0, 1), (0, 2), (1, 3), (2, 3)]:
+        await api_client.post(
+            "/api/v1/mechanics/links",
+            json={"from_id": ids[from_idx], "to_id": ids[to_idx], "type": "evolution"},
+        )
+
+    r_graph = await api_client.get(f"/api/v1/mechanics/{ids[0]}/tree")
+    assert r_graph.status_code == 200
+    graph = r_graph.json()
+    assert graph["root_id"] == ids[0]
+    assert sorted(n["id"] for n in graph["nodes"]) == sorted(ids)
+    assert len(graph["edges"]) == 4
+
+    r_tree = await api_client.get(f"/api/v1/mechanics/{ids[0]}/tree?format=tree")
+    assert r_tree.status_code == 200
+    assert r_tree.json()["mechanic"]["id"] == ids[0]
+
+    r_missing = await api_client.get("/api/v1/mechanics/9999/tree")
+    assert r_missing.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_tree_expands_frontier_with_cursor(api_client):
+    ids = []
+    for name in ("A", "B", "C", "D"):
+        r = await api_client.post("/api/v1/mechanics/", json={"name": name})
+        ids.append(r.json()["id"])
+    for from_id, to_id in zip(ids, ids[1:]):
+        await api_client.post(
+            "/api/v1/mechanics/links",
+            json={"from_id": from_id, "to_id": to_id, "type": "evolution"},
+        )
+
+    r_first = await api_client.get(f"/api/v1/mechanics/{ids[0]}/tree", params={"max_depth": 1})
+    first = r_first.json()
+    assert first["truncated"] is True
+    frontier = [n for n in first["nodes"] if n["cursor"]]
+    assert [n["id"] for n in frontier] == [ids[1]]
+    assert frontier[0]["child_count"] == 1
+
+    r_next = await api_client.get(
+        f"/api/v1/mechanics/{ids[0]}/tree",
+        params={"max_depth": 1, "cursor": frontier[0]["cursor"]},
+    )
+    following = r_next.json()
+    assert {n["id"]: n["depth"] for n in following["nodes"]} == {ids[1]: 1, ids[2]: 2}
+
+    r_bad = await api_client.get(f"/api/v1/mechanics/{ids[0]}/tree", params={"cursor": "!!"})
+    assert r_bad.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_ancestors_of_shared_mechanic(api_client):
+    ids = []
+    for name in ("Root", "Left", "Right", "Shared"):
+        r = await api_client.post("/api/v1/mechanics/", json={"name": name})
+        ids.append(r.json()["id"])
+    for from_idx, to_idx in [(0, 1), (0, 2), (1, 3), (2, 3)]:
+        await api_client.post(
+            "/api/v1/mechanics/links",
+            json={"from_id": ids[from_idx], "to_id": ids[to_idx], "type": "evolution"},
+        )
+
+    r_all = await api_client.get(f"/api/v1/mechanics/{ids[3]}/ancestors")
+    assert r_all.status_code == 200
+    depths = {n["id"]: n["depth"] for n in r_all.json()["nodes"]}
+    assert depths == {ids[3]: 0, ids[1]: 1, ids[2]: 1, ids[0]: 2}
+
+    r_parents = await api_client.get(
+        f"/api/v1/mechanics/{ids[3]}/ancestors", params={"max_depth": 1, "format": "tree"}
+    )
+    tree = r_parents.json()
+    assert [c["mechanic"]["id"] for c in tree["children"]] == [ids[1], ids[2]]
+    assert all(c["child_count"] == 1 for c in tree["children"])
+
+
+@pytest.mark.asyncio
+async def test_tree_cache_is_invalidated_by_writes(api_client):
+    r1 = await api_client.post("/api/v1/mechanics/", json={"name": "A"})
+    r2 = await api_client.post("/api/v1/mechanics/", json={"name": "B"})
+    m1, m2 = r1.json(), r2.json()
+
+    before = (await api_client.get("/api/v1/metrics")).json()["tree_cache"]
+    first = await api_client.get(f"/api/v1/mechanics/{m1['id']}/tree")
+    second = await api_client.get(f"/api/v1/mechanics/{m1['id']}/tree")
+    after = (await api_client.get("/api/v1/metrics")).json()["tree_cache"]
+    assert first.json() == second.json()
+    assert after["hits"] == before["hits"] + 1
+
+    await api_client.post(
+        "/api/v1/mechanics/links",
+        json={"from_id": m1["id"], "to_id": m2["id"], "type": "evolution"},
+    )
+    third = await api_client.get(f"/api/v1/mechanics/{m1['id']}/tree")
+    assert len(third.json()["nodes"]) == 2
+
+
+@pytest.mark.asyncio
+async def test_tree_streams_ndjson(api_client):
+    r1 = await api_client.post("/api/v1/mechanics/", json={"name": "A"})
+    r2 = await api_client.post("/api/v1/mechanics/", json={"name": "B"})
+    m1, m2 = r1.json(), r2.json()
+    await api_client.post(
+        "/api/v1/mechanics/links",
+        json={"from_id": m1["id"], "to_id": m2["id"], "type": "evolution"},
+    )
+
+    r_stream = await api_client.get(
+        f"/api/v1/mechanics/{m1['id']}/tree", headers={"Accept": "application/x-ndjson"}
+    )
+    assert r_stream.status_code == 200
+    assert r_stream.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in r_stream.text.splitlines()]
+    assert [(l["kind"], l["id"]) for l in lines[:2]] == [("node", m1["id"]), ("node", m2["id"])]
+    assert lines[2]["kind"] == "edge" and lines[2]["to_id"] == m2["id"]
+
+    for params in ({"format": "tree"}, {"max_nodes": 1}):
+        r_refused = await api_client.get(
+            f"/api/v1/mechanics/{m1['id']}/tree",
+            params=params,
+            headers={"Accept": "application/x-ndjson"},
+        )
+        assert r_refused.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_evolution_path_between_mechanics(api_client):
+    ids = []
+    for name in ("Jump", "Double Jump", "Wall Jump"):
+        r = await api_client.post("/api/v1/mechanics/", json={"name": name})
+        ids.append(r.json()["id"])
+    for from_idx, to_idx in [(0, 1), (1, 2), (0, 2)]:
+        await api_client.post(
+            "/api/v1/mechanics/links",
+            json={"from_id": ids[from_idx], "to_id": ids[to_idx], "type": "evolution"},
+        )
+
+    r_path = await api_client.get(f"/api/v1/mechanics/{ids[0]}/path/{ids[2]}", params={"k": 2})
+    assert r_path.status_code == 200
+    paths = r_path.json()["paths"]
+    assert [p["length"] for p in paths] == [1, 2]
+    assert [m["name"] for m in paths[1]["mechanics"]] == ["Jump", "Double Jump", "Wall Jump"]
+
+    r_missing = await api_client.get(f"/api/v1/mechanics/{ids[0]}/path/9999")
+    assert r_missing.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_acyclic_mode_rejects_cycle_forming_link(api_client, monkeypatch):
+    from app.infra.config import settings
+    monkeypatch.setattr(settings, "ENFORCE_ACYCLIC_LINKS", True)
+    r1 = await api_client.post("/api/v1/mechanics/", json={"name": "A"})
+    r2 = await api_client.post("/api/v1/mechanics/", json={"name": "B"})
+    m1, m2 = r1.json(), r2.json()
+
+    r_forward = await api_client.post(
+        "/api/v1/mechanics/links",
+        json={"from_id": m1["id"], "to_id": m2["id"], "type": "evolution"},
+    )
+    r_back = await api_client.post(
+        "/api/v1/mechanics/links",
+        json={"from_id": m2["id"], "to_id": m1["id"], "type": "evolution"},
+    )
+    assert r_forward.status_code == 201
+    assert r_back.status_code == 409
+
+
+@pytest.mark.asyncio
+async def test_bulk_create_reports_items(api_client):
+    items = [
+        {"name": "Jump", "year": 1981},
+        {"name": "   "},
+        {"description": "no name"},
+        {"name": "Dash", "year": "soon"},
+        {"name": "Roll"},
+    ]
+
+    r_bulk = await api_client.post("/api/v1/mechanics/bulk", json={"items": items})
+    assert r_bulk.status_code == 201
+    data = r_bulk.json()
+    assert (data["created"], data["failed"]) == (2, 3)
+    assert [r["index"] for r in data["results"]] == [0, 1, 2, 3, 4]
+    assert data["results"][0]["mechanic"]["name"] == "Jump"
+    assert data["results"][1]["error"] == "Mechanic name cannot be empty"
+    assert data["results"][2]["error"].startswith("name:")
+    assert data["results"][3]["error"].startswith("year:")
+
+    names = [m["name"] for m in (await api_client.get("/api/v1/mechanics/")).json()]
+    assert names == ["Jump", "Roll"]
+
+    r_invalid = await api_client.post("/api/v1/mechanics/bulk", json={"items": [{}]})
+    assert r_invalid.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_import_links_from_csv_body(api_client):
+    r1 = await api_client.post("/api/v1/mechanics/", json={"name": "A"})
+    r2 = await api_client.post("/api/v1/mechanics/", json={"name": "B"})
+    m1, m2 = r1.json(), r2.json()
+    body = f"from_id,to_id,type\r\n{m1['id']},{m2['id']},evolution\r\n{m1['id']},9999,evolution\r\n"
+
+    r_import = await api_client.post(
+        "/api/v1/mechanics/links/import", content=body.encode(), headers={"Content-Type": "text/csv"}
+    )
+    assert r_import.status_code == 200
+    assert r_import.json() == {
+        "imported": 1,
+        "rejected_count": 1,
+        "rejected": [{"line": 3, "reason": "unknown to_id"}],
+    }
+
+    r_tree = await api_client.get(f"/api/v1/mechanics/{m1['id']}/tree")
+    assert [n["id"] for n in r_tree.json()["nodes"]] == [m1["id"], m2["id"]]
+
+
+@pytest.mark.asyncio
+async def test_list_mechanics_follows_next_cursor(api_client):
+    await api_client.post(
+        "/api/v1/mechanics/bulk", json={"items": [{"name": f"M{i}"} for i in range(5)]}
+    )
+
+    names = []
+    r_page = await api_client.get("/api/v1/mechanics/", params={"limit": 2})
+    while True:
+        assert r_page.status_code == 200
+        names.extend(m["name"] for m in r_page.json())
+        cursor = r_page.headers.get("x-next-cursor")
+        if cursor is None:
+            break
+        assert f"after={cursor}" in r_page.headers["link"]
+        r_page = await api_client.get("/api/v1/mechanics/", params={"limit": 2, "after": cursor})
+
+    assert names == [f"M{i}" for i in range(5)]
+    assert (await api_client.get("/api/v1/mechanics/", params={"limit": 0})).status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_request_commits_before_responding(api_client, test_db_session):
+    r_create = await api_client.post("/api/v1/mechanics/", json={"name": "Jump"})
+    assert r_create.status_code == 201
+
+    assert not test_db_session.in_transaction()
+
+
+@pytest.mark.asyncio
+async def test_metrics_report_pool_counters(api_client):
+    r_metrics = await api_client.get("/api/v1/metrics")
+    assert r_metrics.status_code == 200
+    pool = r_metrics.json()["db_pool"]["primary"]
+    assert {"size", "checked_out", "overflow", "checkouts", "wait_seconds_max"} <= set(pool)
+
+
+@pytest.mark.asyncio
+async def test_conditional_get_skips_queries(api_client, test_db_session):
+    r_jump = await api_client.post("/api/v1/mechanics/", json={"name": "Jump"})
+    r_double = await api_client.post("/api/v1/mechanics/", json={"name": "Double Jump"})
+    jump, double = r_jump.json(), r_double.json()
+
+    etags = {}
+    statements = []
+    engine = test_db_session.bind.sync_engine
+    listener = lambda *args: statements.append(args[2])
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        for url in ["/api/v1/mechanics/", "/api/v1/mechanics/links", f"/api/v1/mechanics/{jump['id']}/tree"]:
+            r_first = await api_client.get(url)
+            etag = etags[url] = r_first.headers["etag"]
+            assert r_first.status_code == 200 and r_first.headers["cache-control"] == "no-cache"
+
+            statements.clear()
+            r_again = await api_client.get(url, headers={"If-None-Match": f'"other", {etag}'})
+            assert r_again.status_code == 304
+            assert r_again.headers["etag"] == etag
+            assert r_again.content == b""
+            assert len(statements) == 1 and "graph_version" in statements[0]
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+
+    await api_client.post(
+        "/api/v1/mechanics/links",
+        json={"from_id": jump["id"], "to_id": double["id"], "type": "evolution"},
+    )
+    etag = etags["/api/v1/mechanics/links"]
+    r_changed = await api_client.get("/api/v1/mechanics/links", headers={"If-None-Match": etag})
+    assert r_changed.status_code == 200
+    assert r_changed.headers["etag"] != etag
+    assert len(r_changed.json()) == 1
+
+
+@pytest.mark.asyncio
+async def test_fields_narrow_columns_and_output(api_client, test_db_session):
+    r_jump = await api_client.post(
+        "/api/v1/mechanics/", json={"name": "Jump", "description": "Leave the ground", "year": 1981}
+    )
+    r_double = await api_client.post(
+        "/api/v1/mechanics/", json={"name": "Double Jump", "description": "Jump again", "year": 1987}
+    )
+    jump, double = r_jump.json(), r_double.json()
+    await api_client.post(
+        "/api/v1/mechanics/links",
+        json={"from_id": jump["id"], "to_id": double["id"], "type": "evolution"},
+    )
+
+    statements = []
+    engine = test_db_session.bind.sync_engine
+    listener = lambda *args: statements.append(args[2])
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        r_list = await api_client.get("/api/v1/mechanics/", params={"fields": "name", "limit": 1})
+        r_graph = await api_client.get(f"/api/v1/mechanics/{jump['id']}/tree", params={"fields": "year"})
+        r_tree = await api_client.get(
+            f"/api/v1/mechanics/{jump['id']}/tree", params={"fields": "name", "format": "tree"}
+        )
+        r_stream = await api_client.get(
+            f"/api/v1/mechanics/{jump['id']}/tree",
+            params={"fields": "name"},
+            headers={"Accept": "application/x-ndjson"},
+        )
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+
+    assert statements and not any("description" in sql for sql in statements)
+    assert r_list.json() == [{"id": jump["id"], "name": "Jump"}]
+    assert r_list.headers["x-next-cursor"] == str(jump["id"])
+    assert [node["year"] for node in r_graph.json()["nodes"]] == [1981, 1987]
+    assert "name" not in r_graph.json()["nodes"][0]
+    assert r_tree.json()["children"][0]["mechanic"] == {"id": double["id"], "name": "Double Jump"}
+    lines = [json.loads(line) for line in r_stream.text.splitlines()]
+    assert lines[0] == {"kind": "node", "id": jump["id"], "name": "Jump", "depth": 0}
+
+    r_links = await api_client.get("/api/v1/mechanics/links", params={"fields": "type"})
+    assert [set(link) for link in r_links.json()] == [{"id", "type"}]
+    r_unknown = await api_client.get("/api/v1/mechanics/", params={"fields": "name,secret"})
+    assert r_unknown.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_batch_runs_operations_in_one_transaction(api_client):
+    r_existing = await api_client.post("/api/v1/mechanics/", json={"name": "Run"})
+    run = r_existing.json()
+    r_cached = await api_client.get(f"/api/v1/mechanics/{run['id']}/tree")
+    assert r_cached.json()["nodes"][0]["child_count"] == 0
+
+    r_batch = await api_client.post(
+        "/api/v1/batch",
+        json={"operations": [
+            {"op": "create_mechanic", "ref": "jump", "name": "Jump"},
+            {"op": "create_mechanic", "ref": "double", "name": "Double Jump", "year": 1987},
+            {"op": "create_link", "from_id": "$jump", "to_id": "$double", "type": "evolution"},
+            {"op": "create_link", "from_id": run["id"], "to_id": "$jump", "type": "evolution"},
+            {"op": "get_tree", "id": run["id"], "format": "tree", "fields": "name"},
+        ]},
+    )
+    assert r_batch.status_code == 200
+    results = r_batch.json()["results"]
+    assert [r["status"] for r in results] == [201, 201, 201, 201, 200]
+    jump, double = results[0]["body"], results[1]["body"]
+    assert results[2]["body"]["from_id"] == jump["id"]
+    tree = results[4]["body"]
+    assert tree["children"][0]["mechanic"] == {"id": jump["id"], "name": "Jump"}
+    assert tree["children"][0]["children"][0]["mechanic"]["id"] == double["id"]
+
+    r_list = await api_client.get("/api/v1/mechanics/")
+    assert [m["name"] for m in r_list.json()] == ["Run", "Jump", "Double Jump"]
+    r_tree = await api_client.get(f"/api/v1/mechanics/{run['id']}/tree")
+    assert len(r_tree.json()["nodes"]) == 3
+
+
+@pytest.mark.asyncio
+async def test_batch_failure_rolls_back_everything(api_client):
+    operations = [
+        {"op": "create_mechanic", "ref": "a", "name": "A"},
+        {"op": "create_mechanic", "ref": "b", "name": "B"},
+        {"op": "create_link", "from_id": "$a", "to_id": "$b", "type": "evolution"},
+        {"op": "create_link", "from_id": "$a", "to_id": "$b", "type": "evolution"},
+    ]
+    r_duplicate = await api_client.post("/api/v1/batch", json={"operations": operations})
+    assert r_duplicate.status_code == 409
+    assert r_duplicate.json()["detail"].startswith("Operation 3 (create_link)")
+    assert (await api_client.get("/api/v1/mechanics/")).json() == []
+
+    r_forward = await api_client.post(
+        "/api/v1/batch",
+        json={"operations": [
+            {"op": "delete_mechanic", "id": "$later"},
+            {"op": "create_mechanic", "ref": "later", "name": "Later"},
+        ]},
+    )
+    assert r_forward.status_code == 400
+    r_missing = await api_client.post(
+        "/api/v1/batch", json={"operations": [{"op": "delete_link", "id": 9999}]}
+    )
+    assert r_missing.status_code == 404
+    r_invalid = await api_client.post("/api/v1/batch", json={"operations": [{"op": "rename"}]})
+    assert r_invalid.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_batch_rejects_cycle_within_batch(api_client, monkeypatch):
+    from app.infra.config import settings
+    monkeypatch.setattr(settings, "ENFORCE_ACYCLIC_LINKS", True)
+
+    r_cycle = await api_client.post(
+        "/api/v1/batch",
+        json={"operations": [
+            {"op": "create_mechanic", "ref": "a", "name": "A"},
+            {"op": "create_mechanic", "ref": "b", "name": "B"},
+            {"op": "create_link", "from_id": "$a", "to_id": "$b", "type": "evolution"},
+            {"op": "create_link", "from_id": "$b", "to_id": "$a", "type": "evolution"},
+        ]},
+    )
+    assert r_cycle.status_code == 409
+    assert (await api_client.get("/api/v1/mechanics/")).json() == []
+
+
+@pytest.mark.asyncio
+async def test_etag_follows_writes_of_other_processes(api_client, test_db_session):
+    await api_client.post("/api/v1/mechanics/", json={"name": "Jump"})
+    r_first = await api_client.get("/api/v1/mechanics/")
+    etag = r_first.headers["etag"]
+
+    # What a commit of another worker or of the import CLI leaves behind
+    await test_db_session.execute(text("UPDATE graph_version SET version = version + 1"))
+    await test_db_session.commit()
+
+    r_again = await api_client.get("/api/v1/mechanics/", headers={"If-None-Match": etag})
+    assert r_again.status_code == 200
+    assert r_again.headers["etag"] != etag
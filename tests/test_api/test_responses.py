@@ -0,0 +1,57 @@
+import json
+
+import pytest
+
+from app.entities.link import EvolutionLink
+from app.entities.mechanic import GameMechanic
+from app.interfaces.api import responses
+from app.interfaces.api.responses import FastJSONResponse, dumps
+from app.interfaces.api.v1.schemas import LinkResponse, MechanicResponse
+
+CONTENT = {
+    "mechanics": [GameMechanic(id=1, name="Прыжок", description=None, year=1981)],
+    "links": [EvolutionLink(id=2, from_id=1, to_id=3, type="evolution")],
+    "ids": {3, 1},
+}
+
+
+class TestFastJSON:
+    """Tests for the fast JSON rendering path"""
+
+    def test_matches_validated_rendering(self):
+        """Test that entities render like the pydantic response models"""
+        mechanic = CONTENT["mechanics"][0]
+        link = CONTENT["links"][0]
+
+        assert json.loads(dumps(CONTENT)) == {
+            "mechanics": [MechanicResponse(**vars(mechanic)).model_dump()],
+            "links": [LinkResponse(**vars(link)).model_dump()],
+            "ids": [1, 3],
+        }
+
+    def test_orjson_is_used_when_installed(self, monkeypatch):
+        """Test that rendering goes through orjson when it is available"""
+        orjson_dumps = pytest.importorskip("orjson").dumps
+        calls = []
+
+        def spy(content, default=None):
+            calls.append(content)
+            return orjson_dumps(content, default=default)
+
+        monkeypatch.setattr(responses.orjson, "dumps", spy)
+
+        assert FastJSONResponse(CONTENT).body == dumps(CONTENT)
+        assert len(calls) == 2
+
+    def test_standard_library_fallback_is_identical(self, monkeypatch):
+        """Test that output does not depend on orjson being installed"""
+        fast = dumps(CONTENT)
+        monkeypatch.setattr(responses, "orjson", None)
+
+        assert dumps(CONTENT) == fast
+        assert "Прыжок".encode() in fast
+
+    def test_unknown_types_are_rejected(self):
+        """Test that objects without a JSON form still fail loudly"""
+        with pytest.raises(TypeError):
+            FastJSONResponse({"value": object()})
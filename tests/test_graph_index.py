@@ -0,0 +1,127 @@
+import asyncio
+
+import pytest
+
+from app.entities.link import EvolutionLink
+from app.infra.graph_index import LinkGraphIndex
+
+
+def _link(id, from_id, to_id, type="evolution"):
+    return EvolutionLink(id=id, from_id=from_id, to_id=to_id, type=type)
+
+
+@pytest.fixture
+def index():
+    """Index over 1 -> 2 -> 3 and 1 -> 3"""
+    index = LinkGraphIndex(compact_threshold=2)
+    index.build([_link(1, 1, 2), _link(2, 2, 3, "inheritance"), _link(3, 1, 3)])
+    return index
+
+
+class TestLinkGraphIndex:
+    """Unit tests for LinkGraphIndex"""
+
+    def test_forward_and_reverse_links(self, index):
+        """Test adjacency lookups in both directions"""
+        assert sorted(l.to_id for l in index.links(1)) == [2, 3]
+        assert sorted(l.from_id for l in index.links(3, reverse=True)) == [1, 2]
+        assert index.links(2)[0].type == "inheritance"
+        assert index.links(42) == []
+
+    def test_reachable(self, index):
+        """Test breadth-first reachability"""
+        assert index.walk(1) == {1: 0, 2: 1, 3: 1}
+        assert index.walk(3, reverse=True) == {3: 0, 1: 1, 2: 1}
+        assert index.walk(3) == {3: 0}
+
+    def test_walk_limits(self, index):
+        """Test depth and node limits of the walk"""
+        index.add_link(_link(4, 3, 4))
+
+        assert index.walk(1, max_depth=1) == {1: 0, 2: 1, 3: 1}
+        assert index.walk(1, max_nodes=2) == {1: 0, 2: 1}
+        assert index.walk(1, max_depth=0) == {1: 0}
+
+    def test_incremental_updates(self, index):
+        """Test that added and removed links are visible before compaction"""
+        index.add_link(_link(4, 3, 4))
+        index.remove_link(1)
+
+        assert list(index.walk(1)) == [1, 3, 4]
+        assert index.edge_count == 3
+
+    def test_updates_survive_compaction(self, index):
+        """Test that folding the overlay keeps the same graph"""
+        index.add_link(_link(4, 3, 4))
+        index.add_link(_link(5, 4, 5))
+        index.remove_link(2)
+
+        assert list(index.walk(1)) == [1, 2, 3, 4, 5]
+        assert sorted(l.from_id for l in index.links(3, reverse=True)) == [1]
+        assert index.edge_count == 4
+
+    def test_remove_mechanic(self, index):
+        """Test that deleting a mechanic drops links in both directions"""
+        index.remove_mechanic(2)
+
+        assert list(index.walk(1)) == [1, 3]
+        assert index.links(3, reverse=True)[0].from_id == 1
+
+    def test_writes_before_load_invalidate(self):
+        """Test that a write while the index is not loaded blocks a racing load"""
+        index = LinkGraphIndex()
+
+        async def fetch():
+            index.add_link(_link(1, 1, 2))
+            return []
+
+        asyncio.run(index.load(fetch))
+
+        assert index.loaded is False
+
+    def test_follow_detects_missed_commits(self, index):
+        """Test that the index follows consecutive versions and drops itself on a gap"""
+        index.version = 5
+
+        index.follow(6)
+        index.follow(6)
+        assert index.loaded and index.version == 6
+
+        index.follow(8)
+        assert index.loaded is False
+
+    def test_creates_cycle(self, index):
+        """Test cycle checks against the maintained topological order"""
+        assert index.creates_cycle(3, 1) is True
+        assert index.creates_cycle(2, 1) is True
+        assert index.creates_cycle(2, 2) is True
+        assert index.creates_cycle(1, 2) is False
+        assert index.creates_cycle(3, 42) is False
+        assert index.creates_cycle(42, 1) is False
+
+    def test_order_follows_reordering_inserts(self):
+        """Test that backwards inserts keep the order consistent with reachability"""
+        import random
+        rng = random.Random(7)
+        index = LinkGraphIndex()
+        index.build([])
+        link_id = 0
+        for _ in range(300):
+            from_id, to_id = rng.randrange(40), rng.randrange(40)
+            expected = from_id == to_id or from_id in index.walk(to_id)
+            assert index.creates_cycle(from_id, to_id) is expected
+            if not expected:
+                link_id += 1
+                index.add_link(_link(link_id, from_id, to_id))
+        assert index._order is not None
+
+    def test_cyclic_graph_falls_back_to_walk(self, index):
+        """Test checks on a graph that already has a cycle"""
+        index.add_link(_link(4, 3, 1))
+
+        assert index.creates_cycle(2, 1) is True
+        assert index.creates_cycle(1, 5) is False
+
+        index.remove_link(4)
+        assert index.creates_cycle(1, 5) is False
+        assert index._order is not None
@@ -0,0 +1,70 @@
+import pytest
+from sqlalchemy import inspect, select, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.infra.database.migrations import MIGRATIONS, migrate
+from app.infra.database.models import LinkDB, SchemaVersionDB
+
+# Schema as create_all built it before migrations were introduced
+_OLD_SCHEMA = [
+    "CREATE TABLE mechanics (id INTEGER PRIMARY KEY, name VARCHAR(100) NOT NULL, "
+    "description TEXT, year INTEGER)",
+    "CREATE TABLE links (id INTEGER PRIMARY KEY, from_id INTEGER NOT NULL REFERENCES mechanics (id), "
+    "to_id INTEGER NOT NULL REFERENCES mechanics (id), type VARCHAR(50) NOT NULL)",
+    "INSERT INTO mechanics (id, name) VALUES (1, 'Jump'), (2, 'Double Jump')",
+    "INSERT INTO links (id, from_id, to_id, type) VALUES "
+    "(1, 1, 2, 'evolution'), (2, 1, 2, 'evolution'), (3, 1, 2, 'inheritance')",
+]
+
+
+@pytest.fixture
+async def engine():
+    """Empty in-memory SQLite database"""
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    yield engine
+    await engine.dispose()
+
+
+def _indexes(connection, table):
+    return {i["name"]: i for i in inspect(connection).get_indexes(table)}
+
+
+class TestMigrations:
+    """Tests for schema migrations"""
+
+    @pytest.mark.asyncio
+    async def test_fresh_database_is_stamped(self, engine):
+        """Test that a new database gets the latest schema without running migrations"""
+        async with engine.begin() as conn:
+            applied = await conn.run_sync(migrate)
+            versions = (await conn.execute(select(SchemaVersionDB.version))).scalars().all()
+            links = await conn.run_sync(_indexes, "links")
+            mechanics = await conn.run_sync(_indexes, "mechanics")
+
+        assert applied == versions == [m.version for m in MIGRATIONS]
+        assert links["uq_links_from_id_to_id_type"]["unique"]
+        assert "ix_links_to_id" in links
+        assert "ix_mechanics_year" in mechanics
+
+    @pytest.mark.asyncio
+    async def test_existing_database_is_upgraded(self, engine):
+        """Test that migrations add the indexes and drop duplicate links"""
+        async with engine.begin() as conn:
+            for statement in _OLD_SCHEMA:
+                await conn.execute(text(statement))
+
+        async with engine.begin() as conn:
+            applied = await conn.run_sync(migrate)
+            links = await conn.run_sync(_indexes, "links")
+            mechanics = await conn.run_sync(_indexes, "mechanics")
+            rows = (await conn.execute(select(LinkDB.id, LinkDB.type).order_by(LinkDB.id))).all()
+
+        assert applied == [m.version for m in MIGRATIONS]
+        assert links["uq_links_from_id_to_id_type"]["column_names"] == ["from_id", "to_id", "type"]
+        assert links["uq_links_from_id_to_id_type"]["unique"]
+        assert links["ix_links_to_id"]["column_names"] == ["to_id"]
+        assert mechanics["ix_mechanics_year"]["column_names"] == ["year"]
+        assert [tuple(row) for row in rows] == [(1, "evolution"), (3, "inheritance")]
+
+        async with engine.begin() as conn:
+            assert await conn.run_sync(migrate) == []
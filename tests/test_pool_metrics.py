@@ -0,0 +1,52 @@
+import pytest
+from sqlalchemy import exc, text
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.infra.database.pool_metrics import metered_pool_class, pool_stats
+
+
+@pytest.fixture
+async def engine(tmp_path):
+    """Engine with a metered pool of one connection and no overflow"""
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}",
+        poolclass=metered_pool_class(AsyncAdaptedQueuePool),
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.05,
+    )
+    yield engine
+    await engine.dispose()
+
+
+class TestPoolMetrics:
+    """Tests for connection pool counters"""
+
+    @pytest.mark.asyncio
+    async def test_counts_checkouts_and_occupancy(self, engine):
+        """Test that checked out connections and checkouts are reported"""
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+            stats = pool_stats(engine.pool)
+            assert stats["pool"] == "MeteredAsyncAdaptedQueuePool"
+            assert stats["checked_out"] == 1
+            assert stats["overflow"] == 0
+
+        stats = pool_stats(engine.pool)
+        assert stats["checked_out"] == 0
+        assert stats["checkouts"] == 1
+        assert stats["timeouts"] == 0
+
+    @pytest.mark.asyncio
+    async def test_records_wait_and_timeout(self, engine):
+        """Test that a checkout blocked on a full pool is timed"""
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+            with pytest.raises(exc.TimeoutError):
+                async with engine.connect():
+                    pass
+
+        stats = pool_stats(engine.pool)
+        assert stats["timeouts"] == 1
+        assert stats["wait_seconds_max"] >= 0.05
@@ -2,6 +2,7 @@ import pytest
 
 from app.entities.mechanic import GameMechanic
 from app.entities.link import EvolutionLink
+from app.interfaces.repos.link_repo import DuplicateLinkError, UnknownMechanicError
 
 
 class TestMechanicRepository:
@@ -42,6 +43,57 @@ class TestMechanicRepository:
         assert any(m.id == created_mechanics[0].id for m in mechanics)
         assert any(m.id == created_mechanics[1].id for m in mechanics)
 
+    @pytest.mark.asyncio
+    async def test_list_mechanics_by_page(self, mechanic_repo):
+        """Test keyset pages and the paging iterator"""
+        created = await mechanic_repo.create_many(
+            [GameMechanic(id=None, name=f"M{i}") for i in range(5)]
+        )
+        ids = [m.id for m in created]
+
+        assert [m.id for m in await mechanic_repo.list_page(limit=2)] == ids[:2]
+        assert [m.id for m in await mechanic_repo.list_page(ids[1], 2)] == ids[2:4]
+        assert await mechanic_repo.list_page(ids[-1]) == []
+        assert [m.id async for m in mechanic_repo.iter_all(batch_size=2)] == ids
+
+    @pytest.mark.asyncio
+    async def test_get_many_mechanics(self, mechanic_repo, created_mechanics):
+        """Test getting several mechanics in one call"""
+        ids = [m.id for m in created_mechanics]
+
+        mechanics = await mechanic_repo.get_many(list(reversed(ids)) + [9999])
+
+        assert [m.id for m in mechanics] == sorted(ids)
+
+    @pytest.mark.asyncio
+    async def test_sparse_reads_leave_out_columns(self, mechanic_repo, created_mechanics):
+        """Test fields limits the columns read to id, name and the listed ones"""
+        ids = [m.id for m in created_mechanics]
+
+        page = await mechanic_repo.list_page(fields=["year"])
+        many = await mechanic_repo.get_many(ids, fields=[])
+
+        assert [(m.name, m.description, m.year) for m in page] == [
+            (m.name, None, m.year) for m in created_mechanics
+        ]
+        assert [(m.id, m.name, m.description, m.year) for m in many] == [
+            (m.id, m.name, None, None) for m in created_mechanics
+        ]
+
+    @pytest.mark.asyncio
+    async def test_create_many_mechanics(self, mechanic_repo):
+        """Test batch insert keeps input order"""
+        names = [f"Mechanic {i}" for i in range(25, 0, -1)]
+
+        created = await mechanic_repo.create_many(
+            [GameMechanic(id=None, name=name, year=2000) for name in names]
+        )
+
+        assert [m.name for m in created] == names
+        assert len({m.id for m in created}) == len(names)
+        assert (await mechanic_repo.get_by_id(created[-1].id)).name == names[-1]
+        assert await mechanic_repo.create_many([]) == []
+
     @pytest.mark.asyncio
     async def test_update_mechanic(self, mechanic_repo, created_mechanic):
         """Test updating a mechanic"""
@@ -96,6 +148,33 @@ class TestLinkRepository:
         assert created.to_id == link.to_id
         assert created.type == link.type
 
+    @pytest.mark.asyncio
+    async def test_create_duplicate_link(self, test_db_session, link_repo, created_link, created_mechanics):
+        """Test that a duplicate is refused and the transaction stays usable"""
+        duplicate = EvolutionLink(
+            id=None, from_id=created_link.from_id, to_id=created_link.to_id, type=created_link.type
+        )
+        with pytest.raises(DuplicateLinkError):
+            await link_repo.create(duplicate)
+
+        other = await link_repo.create(EvolutionLink(
+            id=None, from_id=created_mechanics[1].id, to_id=created_mechanics[0].id, type="inheritance"
+        ))
+        await test_db_session.commit()
+
+        links = await link_repo.list_all()
+        assert {link.id for link in links} == {created_link.id, other.id}
+
+    @pytest.mark.asyncio
+    async def test_create_link_to_unknown_mechanic(self, link_repo, created_link, created_mechanics):
+        """Test that a link to a missing mechanic is refused without an error in the database"""
+        with pytest.raises(UnknownMechanicError, match="Mechanic 9999 not found"):
+            await link_repo.create(EvolutionLink(
+                id=None, from_id=created_mechanics[0].id, to_id=9999, type="inheritance"
+            ))
+
+        assert [link.id for link in await link_repo.list_all()] == [created_link.id]
+
     @pytest.mark.asyncio
     async def test_get_link_by_id(self, link_repo, created_link):
         """Test getting link by id"""
@@ -121,6 +200,17 @@ class TestLinkRepository:
         assert len(links) >= 1
         assert any(l.id == created_link.id for l in links)
 
+    @pytest.mark.asyncio
+    async def test_list_links_by_page(self, link_repo, created_link, created_mechanics):
+        """Test keyset pages and the paging iterator of links"""
+        second = await link_repo.create(
+            EvolutionLink(id=None, from_id=created_mechanics[1].id, to_id=created_mechanics[0].id, type="evolution")
+        )
+
+        assert [l.id for l in await link_repo.list_page(limit=1)] == [created_link.id]
+        assert [l.id for l in await link_repo.list_page(created_link.id)] == [second.id]
+        assert [l.id async for l in link_repo.iter_all(batch_size=1)] == [created_link.id, second.id]
+
     @pytest.mark.asyncio
     async def test_list_links_by_from_id(self, link_repo, created_link, created_mechanics):
         """Test listing links from specific mechanic"""
@@ -139,6 +229,335 @@ class TestLinkRepository:
         retrieved = await link_repo.get_by_id(created_link.id)
         assert retrieved is None
 
+    @pytest.mark.asyncio
+    async def test_get_subgraph(self, mechanic_repo, link_repo, created_link, created_mechanics):
+        """Test fetching reachable mechanics and links in one call"""
+        extra = await mechanic_repo.create(GameMechanic(id=None, name="Unrelated"))
+
+        graph = await link_repo.get_subgraph(created_mechanics[0].id)
+
+        assert graph.root_id == created_mechanics[0].id
+        assert set(graph.mechanics) == {created_mechanics[0].id, created_mechanics[1].id}
+        assert extra.id not in graph.mechanics
+        assert [l.id for l in graph.links] == [created_link.id]
+
+    @pytest.mark.asyncio
+    async def test_get_subgraph_with_cycle(self, mechanic_repo, link_repo, created_link, created_mechanics):
+        """Test that recursive traversal terminates on cycles"""
+        await link_repo.create(
+            EvolutionLink(
+                id=None,
+                from_id=created_mechanics[1].id,
+                to_id=created_mechanics[0].id,
+                type="inheritance"
+            )
+        )
+
+        graph = await link_repo.get_subgraph(created_mechanics[1].id)
+
+        assert len(graph.mechanics) == 2
+        assert len(graph.links) == 2
+
+    @pytest.mark.asyncio
+    async def test_get_subgraph_without_index(self, link_repo, created_link, created_mechanics, monkeypatch):
+        """Test that the recursive query path matches the index path"""
+        from app.infra.config import settings
+        indexed = await link_repo.get_subgraph(created_mechanics[0].id)
+        monkeypatch.setattr(settings, "GRAPH_INDEX_ENABLED", False)
+
+        graph = await link_repo.get_subgraph(created_mechanics[0].id)
+
+        assert graph == indexed
+        assert graph.depths == {created_mechanics[0].id: 0, created_mechanics[1].id: 1}
+        limited = await link_repo.get_subgraph(created_mechanics[0].id, max_depth=0)
+        assert list(limited.mechanics) == [created_mechanics[0].id]
+        assert limited.links == indexed.links
+        sparse = await link_repo.get_subgraph(created_mechanics[0].id, fields=["year"])
+        assert sparse.links == indexed.links
+        assert all(m.description is None and m.year is not None for m in sparse.mechanics.values())
+
+    @pytest.mark.asyncio
+    async def test_get_subgraph_without_index_limits_rows(
+        self, test_db_session, mechanic_repo, link_repo, monkeypatch
+    ):
+        """Test that max_nodes bounds the rows the recursive query returns"""
+        from app.infra.config import settings
+        ids = [(await mechanic_repo.create(GameMechanic(id=None, name=f"M{i}"))).id for i in range(6)]
+        for from_idx, to_idx in [(0, 1), (0, 2), (1, 3), (2, 4), (4, 5), (5, 0)]:
+            await link_repo.create(
+                EvolutionLink(id=None, from_id=ids[from_idx], to_id=ids[to_idx], type="evolution")
+            )
+        await test_db_session.commit()
+        indexed = await link_repo.get_subgraph(ids[0], max_nodes=3)
+        monkeypatch.setattr(settings, "GRAPH_INDEX_ENABLED", False)
+        rows = []
+        execute = test_db_session.execute
+
+        async def spy(*args, **kwargs):
+            result = (await execute(*args, **kwargs)).all()
+            rows.extend(result)
+            return result
+
+        monkeypatch.setattr(test_db_session, "execute", spy)
+        graph = await link_repo.get_subgraph(ids[0], max_nodes=3)
+
+        assert graph == indexed
+        assert graph.depths == {ids[0]: 0, ids[1]: 1, ids[2]: 1}
+        # One row per outgoing link of the three kept mechanics
+        assert len({row.id for row in rows}) == 3 and len(rows) == 4
+
+    @pytest.mark.asyncio
+    async def test_index_follows_writes(
+        self, test_db_session, mechanic_repo, link_repo, created_link, created_mechanics
+    ):
+        """Test that reads see links created and deleted after the index is loaded"""
+        await link_repo.list_by_from_id(created_mechanics[0].id)
+        third = await mechanic_repo.create(GameMechanic(id=None, name="Third"))
+        await link_repo.create(
+            EvolutionLink(id=None, from_id=created_mechanics[1].id, to_id=third.id, type="inheritance")
+        )
+        await link_repo.delete(created_link.id)
+        await test_db_session.commit()
+
+        assert await link_repo.list_by_from_id(created_mechanics[0].id) == []
+        assert [l.to_id for l in await link_repo.list_by_from_id(created_mechanics[1].id)] == [third.id]
+
+        await mechanic_repo.delete(created_mechanics[1].id)
+        await test_db_session.commit()
+        assert await link_repo.list_by_from_id(created_mechanics[1].id) == []
+
+        from app.infra.graph_index import get_graph_index
+        from app.infra.graph_version import get_graph_version
+        index = get_graph_index(test_db_session)
+        assert index.loaded and index.version == (await get_graph_version(test_db_session)).version
+
+    @pytest.mark.asyncio
+    async def test_index_reloads_after_writes_of_other_processes(
+        self, test_db_session, link_repo, created_link, created_mechanics, monkeypatch
+    ):
+        """Test that a stored version ahead of the index triggers a rebuild"""
+        from sqlalchemy import text
+        from app.infra.config import settings
+        from app.infra.graph_index import get_graph_index
+        monkeypatch.setattr(settings, "GRAPH_INDEX_REBUILD_SECONDS", 0)
+        first, second = (m.id for m in created_mechanics)
+        await link_repo.list_by_from_id(first)
+        index = get_graph_index(test_db_session)
+        loaded_at = index.version
+
+        # What a commit of another worker or of the import CLI leaves behind
+        await test_db_session.execute(
+            text("INSERT INTO links (from_id, to_id, type) VALUES (:a, :b, 'evolution')"),
+            {"a": second, "b": first},
+        )
+        await test_db_session.execute(text("UPDATE graph_version SET version = version + 1"))
+        await test_db_session.commit()
+
+        assert [l.to_id for l in await link_repo.list_by_from_id(second)] == [first]
+        assert index.loaded and index.version == loaded_at + 1
+        assert await link_repo.would_create_cycle(first, second) is True
+
+    @pytest.mark.asyncio
+    async def test_index_rebuilds_are_throttled(
+        self, test_db_session, link_repo, created_link, created_mechanics, monkeypatch
+    ):
+        """Test that reads fall back to SQL until the rebuild interval passes"""
+        from sqlalchemy import event, text
+        from app.infra.config import settings
+        from app.infra.graph_index import get_graph_index
+        monkeypatch.setattr(settings, "GRAPH_INDEX_REBUILD_SECONDS", 3600)
+        first, second = (m.id for m in created_mechanics)
+        await link_repo.list_by_from_id(first)
+        index = get_graph_index(test_db_session)
+        loaded_at = index.version
+
+        await test_db_session.execute(
+            text("INSERT INTO links (from_id, to_id, type) VALUES (:a, :b, 'evolution')"),
+            {"a": second, "b": first},
+        )
+        await test_db_session.execute(text("UPDATE graph_version SET version = version + 1"))
+        await test_db_session.commit()
+
+        statements = []
+        engine = test_db_session.bind.sync_engine
+        listener = lambda *args: statements.append(args[2])
+        event.listen(engine, "before_cursor_execute", listener)
+        try:
+            assert [l.to_id for l in await link_repo.list_by_from_id(second)] == [first]
+            assert await link_repo.would_create_cycle(first, second) is True
+        finally:
+            event.remove(engine, "before_cursor_execute", listener)
+        assert index.version == loaded_at
+        # The version is read once for the whole transaction
+        assert len([s for s in statements if "graph_version" in s]) == 1
+
+    @pytest.mark.asyncio
+    async def test_list_links_by_many_endpoints(self, link_repo, created_link, created_mechanics, monkeypatch):
+        """Test batch link lookups with and without the index"""
+        from app.infra.config import settings
+        ids = [m.id for m in created_mechanics]
+        indexed = (await link_repo.list_by_from_ids(ids), await link_repo.list_by_to_ids(ids))
+        monkeypatch.setattr(settings, "GRAPH_INDEX_ENABLED", False)
+
+        assert (await link_repo.list_by_from_ids(ids), await link_repo.list_by_to_ids(ids)) == indexed
+        assert [l.id for l in indexed[0]] == [created_link.id]
+        assert await link_repo.list_by_from_ids([]) == []
+
+    @pytest.mark.asyncio
+    async def test_list_links_by_to_id(self, link_repo, created_link, created_mechanics):
+        """Test listing links into specific mechanic"""
+        links = await link_repo.list_by_to_id(created_mechanics[1].id)
+
+        assert [l.id for l in links] == [created_link.id]
+        assert await link_repo.list_by_to_id(created_mechanics[0].id) == []
+
+    @pytest.mark.asyncio
+    async def test_get_reverse_subgraph(self, link_repo, created_link, created_mechanics, monkeypatch):
+        """Test walking incoming links with and without the index"""
+        from app.infra.config import settings
+        indexed = await link_repo.get_subgraph(created_mechanics[1].id, reverse=True)
+        monkeypatch.setattr(settings, "GRAPH_INDEX_ENABLED", False)
+
+        graph = await link_repo.get_subgraph(created_mechanics[1].id, reverse=True)
+
+        assert graph == indexed
+        assert graph.depths == {created_mechanics[1].id: 0, created_mechanics[0].id: 1}
+        assert [(l.from_id, l.to_id) for l in graph.links] == [
+            (created_mechanics[0].id, created_mechanics[1].id)
+        ]
+
+    @pytest.mark.asyncio
+    async def test_would_create_cycle(self, link_repo, created_link, created_mechanics, monkeypatch):
+        """Test cycle checks with and without the index"""
+        from app.infra.config import settings
+        first, second = (m.id for m in created_mechanics)
+        for enabled in (True, False):
+            monkeypatch.setattr(settings, "GRAPH_INDEX_ENABLED", enabled)
+
+            assert await link_repo.would_create_cycle(second, first) is True
+            assert await link_repo.would_create_cycle(first, first) is True
+            assert await link_repo.would_create_cycle(first, second) is False
+
+    @pytest.mark.asyncio
+    async def test_get_subgraph_nonexistent_root(self, link_repo):
+        """Test subgraph of non-existent mechanic returns None"""
+        assert await link_repo.get_subgraph(9999) is None
+
+
+class TestUnitOfWork:
+    """Unit tests for UnitOfWork"""
+
+    @pytest.mark.asyncio
+    async def test_writes_apply_on_commit(self, test_db_session, link_repo, created_link, created_mechanics):
+        """Test that uncommitted writes are read back and published on commit"""
+        from app.infra.database.unit_of_work import UnitOfWork
+        from app.infra.graph_version import get_graph_version
+        first, second = (m.id for m in created_mechanics)
+        await link_repo.list_by_from_id(first)
+        version = (await get_graph_version(test_db_session)).version
+
+        async with UnitOfWork(test_db_session):
+            back = await link_repo.create(EvolutionLink(id=None, from_id=second, to_id=first, type="evolution"))
+            assert [l.id for l in await link_repo.list_by_from_id(second)] == [back.id]
+            assert (await get_graph_version(test_db_session)).version == version
+
+        assert (await get_graph_version(test_db_session)).version > version
+        assert [l.id for l in await link_repo.list_by_from_id(second)] == [back.id]
+
+    @pytest.mark.asyncio
+    async def test_rollback_discards_writes(self, test_db_session, link_repo, created_link, created_mechanics):
+        """Test that a failed unit of work leaves database, index and version untouched"""
+        from app.infra.database.unit_of_work import UnitOfWork
+        from app.infra.graph_version import get_graph_version
+        first, second = (m.id for m in created_mechanics)
+        await link_repo.list_by_from_id(first)
+        version = (await get_graph_version(test_db_session)).version
+
+        with pytest.raises(RuntimeError):
+            async with UnitOfWork(test_db_session):
+                await link_repo.create(EvolutionLink(id=None, from_id=second, to_id=first, type="evolution"))
+                await link_repo.delete(created_link.id)
+                raise RuntimeError("abort")
+
+        assert (await get_graph_version(test_db_session)).version == version
+        assert await link_repo.list_by_from_id(second) == []
+        assert [l.id for l in await link_repo.list_by_from_id(first)] == [created_link.id]
+
+
+class TestBatchingRepositories:
+    """Unit tests for request-scoped batching repositories"""
+
+    @pytest.mark.asyncio
+    async def test_get_by_id_calls_are_coalesced(self, mechanic_repo, created_mechanics, monkeypatch):
+        """Test lookups of one tick share a single query and are memoized"""
+        import asyncio
+        from app.infra.repos_impl.batching import BatchingMechanicRepository
+        calls = []
+        get_many = mechanic_repo.get_many
+
+        async def spy(ids):
+            calls.append(list(ids))
+            return await get_many(ids)
+
+        monkeypatch.setattr(mechanic_repo, "get_many", spy)
+        repo = BatchingMechanicRepository(mechanic_repo)
+        ids = [m.id for m in created_mechanics]
+
+        found = await asyncio.gather(*(repo.get_by_id(i) for i in ids + [9999, ids[0]]))
+        again = await repo.get_by_id(ids[1])
+
+        assert [m.id if m else None for m in found] == ids + [None, ids[0]]
+        assert again is found[1]
+        assert calls == [ids + [9999]]
+
+    @pytest.mark.asyncio
+    async def test_writes_refresh_memoized_values(self, mechanic_repo, created_mechanic):
+        """Test updates and deletes are visible through the memo"""
+        from app.infra.repos_impl.batching import BatchingMechanicRepository
+        repo = BatchingMechanicRepository(mechanic_repo)
+        mechanic = await repo.get_by_id(created_mechanic.id)
+        mechanic.name = "Renamed"
+
+        await repo.update(mechanic)
+        assert (await repo.get_by_id(created_mechanic.id)).name == "Renamed"
+
+        await repo.delete(created_mechanic.id)
+        assert await repo.get_by_id(created_mechanic.id) is None
+
+    @pytest.mark.asyncio
+    async def test_link_lookups_are_coalesced(self, link_repo, created_link, created_mechanics):
+        """Test per-mechanic link lookups of one tick share a single query"""
+        import asyncio
+        from app.infra.repos_impl.batching import BatchingLinkRepository
+        repo = BatchingLinkRepository(link_repo)
+        ids = [m.id for m in created_mechanics]
+
+        outgoing, incoming = await asyncio.gather(
+            asyncio.gather(*(repo.list_by_from_id(i) for i in ids)),
+            asyncio.gather(*(repo.list_by_to_id(i) for i in ids)),
+        )
+
+        assert [[l.id for l in links] for links in outgoing] == [[created_link.id], []]
+        assert [[l.id for l in links] for links in incoming] == [[], [created_link.id]]
+
+        await repo.delete(created_link.id)
+        assert await repo.list_by_from_id(ids[0]) == []
+
+    @pytest.mark.asyncio
+    async def test_mechanic_delete_forgets_cascaded_links(
+        self, mechanic_repo, link_repo, created_link, created_mechanics
+    ):
+        """Test links removed with their mechanic are not served from the memo"""
+        from app.infra.repos_impl.batching import BatchingLinkRepository, BatchingMechanicRepository
+        links = BatchingLinkRepository(link_repo)
+        mechanics = BatchingMechanicRepository(mechanic_repo, links=links)
+        ids = [m.id for m in created_mechanics]
+        assert [l.id for l in await links.list_by_to_id(ids[1])] == [created_link.id]
+
+        await mechanics.delete(ids[0])
+
+        assert await links.list_by_to_id(ids[1]) == []
+
 
 class TestUserRepository:
     """Unit tests for UserRepository"""
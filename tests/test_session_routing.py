@@ -0,0 +1,130 @@
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.entities.mechanic import GameMechanic
+from app.infra.database.models import Base, MechanicDB
+from app.infra.database.routing import RoutingSession, has_written
+from app.infra.graph_index import get_graph_index
+from app.infra.repos_impl.mechanic_repo_impl import MechanicRepository
+from app.interfaces.api.dependencies import get_db_session
+from app.interfaces.api.routing import PRIMARY_COOKIE
+from app.interfaces.api.v1.routes import router as v1_router
+
+
+@pytest.fixture
+async def session_factory(tmp_path):
+    """Routing sessions over a primary and a replica database file
+
+    The files are not replicated, the replica holds one mechanic of its
+    own so tests can tell where a read went.
+    """
+    primary = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'primary.db'}")
+    replica = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'replica.db'}")
+    for engine in (primary, replica):
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+    async with replica.begin() as conn:
+        await conn.execute(insert(MechanicDB).values(name="On replica"))
+
+    yield async_sessionmaker(
+        primary,
+        class_=AsyncSession,
+        sync_session_class=RoutingSession,
+        replicas=[replica.sync_engine],
+        expire_on_commit=False,
+    )
+    await primary.dispose()
+    await replica.dispose()
+
+
+class TestRoutingSession:
+    """Tests for read/write routing between primary and replica"""
+
+    @pytest.mark.asyncio
+    async def test_reads_go_to_replica_until_first_write(self, session_factory):
+        """Test that a session reads its own writes from the primary"""
+        async with session_factory() as session:
+            repo = MechanicRepository(session)
+            assert [m.name for m in await repo.list_all()] == ["On replica"]
+            assert not has_written(session)
+
+            await repo.create(GameMechanic(id=None, name="On primary", description=None, year=None))
+            assert has_written(session)
+            assert [m.name for m in await repo.list_all()] == ["On primary"]
+            await session.commit()
+
+        async with session_factory() as session:
+            assert [m.name for m in await MechanicRepository(session).list_all()] == ["On replica"]
+
+
+@pytest.mark.asyncio
+async def test_client_reads_primary_after_write(session_factory):
+    app = FastAPI()
+    app.include_router(v1_router)
+
+    async def override_get_db_session():
+        async with session_factory() as session:
+            yield session
+
+    app.dependency_overrides[get_db_session] = override_get_db_session
+
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        r_list = await client.get("/api/v1/mechanics/")
+        assert [m["name"] for m in r_list.json()] == ["On replica"]
+        assert PRIMARY_COOKIE not in r_list.cookies
+
+        r_create = await client.post("/api/v1/mechanics/", json={"name": "On primary"})
+        assert r_create.status_code == 201
+        assert PRIMARY_COOKIE in r_create.cookies
+
+        r_list = await client.get("/api/v1/mechanics/")
+        assert [m["name"] for m in r_list.json()] == ["On primary"]
+
+        client.cookies.clear()
+        r_list = await client.get("/api/v1/mechanics/")
+        assert [m["name"] for m in r_list.json()] == ["On replica"]
+
+
+@pytest.mark.asyncio
+async def test_walks_read_replica_until_client_writes(session_factory):
+    app = FastAPI()
+    app.include_router(v1_router)
+
+    async def override_get_db_session():
+        async with session_factory() as session:
+            yield session
+
+    app.dependency_overrides[get_db_session] = override_get_db_session
+
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        r_create = await client.post("/api/v1/mechanics/", json={"name": "On primary"})
+        mechanic_id = r_create.json()["id"]
+
+        r_tree = await client.get(f"/api/v1/mechanics/{mechanic_id}/tree")
+        assert [n["name"] for n in r_tree.json()["nodes"]] == ["On primary"]
+
+        # Loading the graph index from the primary leaves the walk on the replica
+        async with session_factory() as session:
+            get_graph_index(session).invalidate()
+        client.cookies.clear()
+        r_tree = await client.get(f"/api/v1/mechanics/{mechanic_id}/tree")
+        assert [n["name"] for n in r_tree.json()["nodes"]] == ["On replica"]
+
+
+@pytest.mark.asyncio
+async def test_cors_lets_the_spa_send_the_primary_cookie():
+    from app.main import create_app
+    origin = "http://localhost:3000"
+
+    async with AsyncClient(app=create_app(), base_url="http://test") as client:
+        r_preflight = await client.options(
+            "/api/v1/mechanics/",
+            headers={"Origin": origin, "Access-Control-Request-Method": "POST"},
+        )
+
+    # Credentialed requests need the explicit origin, browsers refuse "*"
+    assert r_preflight.headers["access-control-allow-origin"] == origin
+    assert r_preflight.headers["access-control-allow-credentials"] == "true"
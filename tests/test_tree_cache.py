@@ -0,0 +1,35 @@
+from app.infra.tree_cache import LRUCache
+
+
+class TestLRUCache:
+    """Unit tests for LRUCache"""
+
+    def test_hit_and_miss_counters(self):
+        """Test that lookups are counted"""
+        cache = LRUCache(max_entries=2)
+        cache.put("a", b"1")
+
+        assert cache.get("a") == b"1"
+        assert cache.get("b") is None
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+
+    def test_evicts_least_recently_used(self):
+        """Test that the oldest untouched entry is evicted"""
+        cache = LRUCache(max_entries=2)
+        cache.put("a", b"1")
+        cache.put("b", b"2")
+        cache.get("a")
+        cache.put("c", b"3")
+
+        assert cache.get("b") is None
+        assert cache.get("a") == b"1"
+        assert cache.stats()["evictions"] == 1
+        assert cache.stats()["entries"] == 2
+
+    def test_zero_size_disables_cache(self):
+        """Test that a cache without room stores nothing"""
+        cache = LRUCache(max_entries=0)
+        cache.put("a", b"1")
+
+        assert cache.get("a") is None
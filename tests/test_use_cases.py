@@ -1,8 +1,13 @@
 import pytest
 from datetime import datetime, timedelta
 
-from app.use_cases.create_mechanic import CreateMechanicUseCase
-from app.use_cases.get_tree import GetMechanicTreeUseCase
+from app.use_cases.create_mechanic import CreateMechanicUseCase, CreateMechanicsUseCase
+from app.use_cases.create_link import CreateLinkUseCase, LinkCycleError
+from app.use_cases.get_tree import GetMechanicTreeUseCase, TreeTooLargeError
+from app.use_cases.get_graph import GetMechanicGraphUseCase, decode_cursor
+from app.use_cases.stream_graph import StreamMechanicGraphUseCase
+from app.use_cases.find_path import FindEvolutionPathUseCase
+from app.use_cases.import_links import ImportLinksUseCase
 from app.entities.mechanic import GameMechanic
 
 
@@ -54,6 +59,89 @@ class TestCreateMechanicUseCase:
             await use_case.execute(mechanic)
 
 
+class TestCreateMechanicsUseCase:
+    """Unit tests for CreateMechanicsUseCase"""
+
+    @pytest.mark.asyncio
+    async def test_create_mechanics_success(self, mechanic_repo):
+        """Test successful batch creation"""
+        use_case = CreateMechanicsUseCase(mechanic_repo)
+
+        created = await use_case.execute([GameMechanic(id=None, name=f"M{i}") for i in range(3)])
+
+        assert [m.name for m in created] == ["M0", "M1", "M2"]
+        assert all(m.id is not None for m in created)
+
+    @pytest.mark.asyncio
+    async def test_create_mechanics_over_limit_fails(self, mechanic_repo):
+        """Test that oversized batches are rejected before inserting"""
+        use_case = CreateMechanicsUseCase(mechanic_repo, max_items=2)
+
+        with pytest.raises(ValueError, match="more than 2"):
+            await use_case.execute([GameMechanic(id=None, name=f"M{i}") for i in range(3)])
+        assert await mechanic_repo.list_all() == []
+
+
+class TestCreateLinkUseCase:
+    """Unit tests for CreateLinkUseCase"""
+
+    @pytest.mark.asyncio
+    async def test_acyclic_mode_rejects_cycles(self, link_repo, created_link, created_mechanics):
+        """Test that a link back to an ancestor is rejected"""
+        from app.entities.link import EvolutionLink
+        first, second = (m.id for m in created_mechanics)
+        use_case = CreateLinkUseCase(link_repo, enforce_acyclic=True)
+
+        with pytest.raises(LinkCycleError):
+            await use_case.execute(EvolutionLink(id=None, from_id=second, to_id=first, type="evolution"))
+        assert len(await link_repo.list_all()) == 1
+
+    @pytest.mark.asyncio
+    async def test_cycles_allowed_by_default(self, link_repo, created_link, created_mechanics):
+        """Test that cycles are accepted unless acyclic mode is on"""
+        from app.entities.link import EvolutionLink
+        first, second = (m.id for m in created_mechanics)
+        use_case = CreateLinkUseCase(link_repo)
+
+        created = await use_case.execute(
+            EvolutionLink(id=None, from_id=second, to_id=first, type="evolution")
+        )
+
+        assert created.id is not None
+
+    @pytest.mark.asyncio
+    async def test_acyclic_mode_locks_in_the_database(self, link_repo, created_mechanics, monkeypatch):
+        """Test that the process lock is only the fallback of the database lock"""
+        from app.entities.link import EvolutionLink
+        from app.use_cases import create_link
+        first, second = (m.id for m in created_mechanics)
+        held = []
+        would_create_cycle = link_repo.would_create_cycle
+
+        async def spy(from_id, to_id):
+            held.append(create_link._acyclic_lock.locked())
+            return await would_create_cycle(from_id, to_id)
+
+        monkeypatch.setattr(link_repo, "would_create_cycle", spy)
+        use_case = CreateLinkUseCase(link_repo, enforce_acyclic=True)
+        await use_case.execute(EvolutionLink(id=None, from_id=first, to_id=second, type="evolution"))
+
+        async def lock_graph():
+            return True
+
+        monkeypatch.setattr(link_repo, "lock_graph", lock_graph)
+        await use_case.execute(EvolutionLink(id=None, from_id=first, to_id=second, type="variant"))
+
+        # SQLite has no row locks, a database that locks needs no process lock
+        assert held == [True, False]
+
+    def test_graph_lock_is_a_row_lock(self):
+        """Test that the PostgreSQL graph lock selects the version row FOR UPDATE"""
+        from sqlalchemy.dialects import postgresql
+        from app.infra.graph_version import _LOCK
+        assert str(_LOCK.compile(dialect=postgresql.dialect())).endswith("FOR UPDATE")
+
+
 class TestGetMechanicTreeUseCase:
     """Unit tests for GetMechanicTreeUseCase"""
 
@@ -131,6 +219,70 @@ class TestGetMechanicTreeUseCase:
         tree = await use_case.execute(created_m1.id)
         assert tree.mechanic.id == created_m1.id
 
+    @pytest.mark.asyncio
+    async def test_get_tree_expands_shared_child_per_parent(self, mechanic_repo, link_repo):
+        """Test that a mechanic reachable by two paths appears under both parents"""
+        from app.entities.link import EvolutionLink
+        ids = [
+            (await mechanic_repo.create(GameMechanic(id=None, name=name))).id
+            for name in ("Root", "Left", "Right", "Shared")
+        ]
+        for from_idx, to_idx in [(0, 1), (0, 2), (1, 3), (2, 3)]:
+            await link_repo.create(
+                EvolutionLink(id=None, from_id=ids[from_idx], to_id=ids[to_idx], type="inheritance")
+            )
+
+        use_case = GetMechanicTreeUseCase(mechanic_repo, link_repo)
+        tree = await use_case.execute(ids[0])
+
+        assert [c.mechanic.id for c in tree.children] == [ids[1], ids[2]]
+        assert all(c.children[0].mechanic.id == ids[3] for c in tree.children)
+
+    @pytest.mark.asyncio
+    async def test_get_tree_deep_chain(self, mechanic_repo, link_repo):
+        """Test that long chains are built without hitting the recursion limit"""
+        from app.entities.link import EvolutionLink
+        ids = [
+            (await mechanic_repo.create(GameMechanic(id=None, name=f"M{i}"))).id
+            for i in range(1200)
+        ]
+        for from_id, to_id in zip(ids, ids[1:]):
+            await link_repo.create(EvolutionLink(id=None, from_id=from_id, to_id=to_id, type="evolution"))
+
+        use_case = GetMechanicTreeUseCase(mechanic_repo, link_repo)
+        node = await use_case.execute(ids[0])
+
+        depth = 0
+        while node.children:
+            node = node.children[0]
+            depth += 1
+        assert depth == len(ids) - 1
+
+    @pytest.mark.asyncio
+    async def test_get_tree_node_cap(self, mechanic_repo, link_repo, created_link, created_mechanics):
+        """Test that nested tree refuses to grow past max_nodes"""
+        use_case = GetMechanicTreeUseCase(mechanic_repo, link_repo, node_cap=1)
+
+        with pytest.raises(TreeTooLargeError):
+            await use_case.execute(created_mechanics[0].id)
+
+    @pytest.mark.asyncio
+    async def test_get_tree_max_depth_marks_truncated(self, mechanic_repo, link_repo):
+        """Test that nodes cut by max_depth carry child count and cursor"""
+        from app.entities.link import EvolutionLink
+        ids = [(await mechanic_repo.create(GameMechanic(id=None, name=f"M{i}"))).id for i in range(3)]
+        for from_id, to_id in zip(ids, ids[1:]):
+            await link_repo.create(EvolutionLink(id=None, from_id=from_id, to_id=to_id, type="evolution"))
+
+        use_case = GetMechanicTreeUseCase(mechanic_repo, link_repo)
+        tree = await use_case.execute(ids[0], max_depth=1)
+
+        child = tree.children[0]
+        assert child.children == []
+        assert child.child_count == 1
+        assert decode_cursor(child.cursor) == (ids[1], 1)
+        assert tree.cursor is None
+
     @pytest.mark.asyncio
     async def test_get_tree_nonexistent_mechanic(self, mechanic_repo, link_repo):
         """Test getting tree for non-existent mechanic"""
@@ -138,3 +290,225 @@ class TestGetMechanicTreeUseCase:
         
         with pytest.raises(ValueError, match="Mechanic not found"):
             await use_case.execute(9999)
+
+
+class TestGetMechanicGraphUseCase:
+    """Unit tests for GetMechanicGraphUseCase"""
+
+    @pytest.mark.asyncio
+    async def test_get_graph_deduplicates_layered_dag(self, mechanic_repo, link_repo):
+        """Test that every mechanic of a layered DAG is returned once"""
+        from app.entities.link import EvolutionLink
+        layers = [
+            [(await mechanic_repo.create(GameMechanic(id=None, name=f"L{l}N{n}"))).id for n in range(2)]
+            for l in range(6)
+        ]
+        for upper, lower in zip(layers, layers[1:]):
+            for from_id in upper:
+                for to_id in lower:
+                    await link_repo.create(
+                        EvolutionLink(id=None, from_id=from_id, to_id=to_id, type="evolution")
+                    )
+
+        use_case = GetMechanicGraphUseCase(link_repo)
+        graph = await use_case.execute(layers[0][0])
+
+        assert len(graph.mechanics) == 11
+        assert len(graph.links) == 2 + 4 * 4
+
+    @pytest.mark.asyncio
+    async def test_get_graph_nonexistent_mechanic(self, link_repo):
+        """Test getting graph for non-existent mechanic"""
+        use_case = GetMechanicGraphUseCase(link_repo)
+
+        with pytest.raises(ValueError, match="Mechanic not found"):
+            await use_case.execute(9999)
+
+    @pytest.mark.asyncio
+    async def test_get_graph_max_nodes_window(self, mechanic_repo, link_repo):
+        """Test that max_nodes keeps the first mechanics in breadth-first order"""
+        from app.entities.link import EvolutionLink
+        ids = [(await mechanic_repo.create(GameMechanic(id=None, name=f"M{i}"))).id for i in range(4)]
+        for to_id in ids[1:]:
+            await link_repo.create(EvolutionLink(id=None, from_id=ids[0], to_id=to_id, type="evolution"))
+
+        use_case = GetMechanicGraphUseCase(link_repo)
+        graph = await use_case.execute(ids[0], max_nodes=3)
+
+        assert list(graph.mechanics) == ids[:3]
+        assert graph.truncated == {ids[0]}
+        assert graph.child_counts[ids[0]] == 3
+        assert len(graph.links) == 2
+
+
+class TestStreamMechanicGraphUseCase:
+    """Unit tests for StreamMechanicGraphUseCase"""
+
+    @pytest.mark.asyncio
+    async def test_stream_emits_each_node_once(self, mechanic_repo, link_repo):
+        """Test that a diamond streams four nodes and four edges"""
+        from app.entities.link import EvolutionLink
+        ids = [(await mechanic_repo.create(GameMechanic(id=None, name=f"M{i}"))).id for i in range(4)]
+        for from_idx, to_idx in [(0, 1), (0, 2), (1, 3), (2, 3)]:
+            await link_repo.create(
+                EvolutionLink(id=None, from_id=ids[from_idx], to_id=ids[to_idx], type="evolution")
+            )
+
+        use_case = StreamMechanicGraphUseCase(mechanic_repo, link_repo, batch_size=1)
+        events = [event async for event in await use_case.execute(ids[0])]
+
+        nodes = [(item.id, depth) for kind, item, depth in events if kind == "node"]
+        edges = [item.id for kind, item, _ in events if kind == "edge"]
+        assert nodes == [(ids[0], 0), (ids[1], 1), (ids[2], 1), (ids[3], 2)]
+        assert len(edges) == len(set(edges)) == 4
+
+    @pytest.mark.asyncio
+    async def test_stream_keeps_batching_memo_bounded(self, mechanic_repo, link_repo):
+        """Test that streaming through batching repositories keeps flat memory"""
+        from app.entities.link import EvolutionLink
+        from app.infra.repos_impl.batching import BatchingLinkRepository, BatchingMechanicRepository
+        ids = [(await mechanic_repo.create(GameMechanic(id=None, name=f"M{i}"))).id for i in range(20)]
+        for from_id, to_id in zip(ids, ids[1:]):
+            await link_repo.create(EvolutionLink(id=None, from_id=from_id, to_id=to_id, type="evolution"))
+        links = BatchingLinkRepository(link_repo, memo_size=3)
+        mechanics = BatchingMechanicRepository(mechanic_repo, links=links, memo_size=3)
+
+        use_case = StreamMechanicGraphUseCase(mechanics, links)
+        nodes = []
+        async for kind, item, _ in await use_case.execute(ids[0]):
+            assert len(links._from_loader._memo) <= 3
+            assert len(mechanics._loader._memo) <= 3
+            if kind == "node":
+                nodes.append(item.id)
+
+        assert nodes == ids
+
+    @pytest.mark.asyncio
+    async def test_stream_nonexistent_mechanic(self, mechanic_repo, link_repo):
+        """Test that a missing root fails before streaming starts"""
+        use_case = StreamMechanicGraphUseCase(mechanic_repo, link_repo)
+
+        with pytest.raises(ValueError, match="Mechanic not found"):
+            await use_case.execute(9999)
+
+
+class TestFindEvolutionPathUseCase:
+    """Unit tests for FindEvolutionPathUseCase"""
+
+    async def _create_graph(self, mechanic_repo, link_repo, size, edges):
+        from app.entities.link import EvolutionLink
+        ids = [(await mechanic_repo.create(GameMechanic(id=None, name=f"M{i}"))).id for i in range(size)]
+        for from_idx, to_idx in edges:
+            await link_repo.create(
+                EvolutionLink(id=None, from_id=ids[from_idx], to_id=ids[to_idx], type="evolution")
+            )
+        return ids
+
+    @pytest.mark.asyncio
+    async def test_find_shortest_path(self, mechanic_repo, link_repo):
+        """Test that the shortcut wins over the long chain"""
+        ids = await self._create_graph(
+            mechanic_repo, link_repo, 5, [(0, 1), (1, 2), (2, 3), (3, 4), (0, 3)]
+        )
+
+        use_case = FindEvolutionPathUseCase(mechanic_repo, link_repo)
+        paths, mechanics = await use_case.execute(ids[0], ids[4])
+
+        assert [p.mechanic_ids for p in paths] == [[ids[0], ids[3], ids[4]]]
+        assert [(l.from_id, l.to_id) for l in paths[0].links] == [(ids[0], ids[3]), (ids[3], ids[4])]
+        assert set(mechanics) == {ids[0], ids[3], ids[4]}
+
+    @pytest.mark.asyncio
+    async def test_find_k_shortest_paths(self, mechanic_repo, link_repo):
+        """Test that k paths come back loopless and ordered by length"""
+        ids = await self._create_graph(
+            mechanic_repo, link_repo, 5, [(0, 1), (1, 2), (2, 3), (3, 4), (0, 3), (3, 0), (0, 2)]
+        )
+
+        use_case = FindEvolutionPathUseCase(mechanic_repo, link_repo)
+        paths, _ = await use_case.execute(ids[0], ids[4], k=5)
+
+        assert [p.mechanic_ids for p in paths] == [
+            [ids[0], ids[3], ids[4]],
+            [ids[0], ids[2], ids[3], ids[4]],
+            [ids[0], ids[1], ids[2], ids[3], ids[4]],
+        ]
+
+    @pytest.mark.asyncio
+    async def test_find_path_respects_direction_and_depth(self, mechanic_repo, link_repo):
+        """Test unreachable targets and max_depth give no paths"""
+        ids = await self._create_graph(mechanic_repo, link_repo, 3, [(0, 1), (1, 2)])
+
+        use_case = FindEvolutionPathUseCase(mechanic_repo, link_repo)
+
+        assert (await use_case.execute(ids[2], ids[0]))[0] == []
+        assert (await use_case.execute(ids[0], ids[2], max_depth=1))[0] == []
+        assert len((await use_case.execute(ids[0], ids[2], max_depth=2))[0]) == 1
+
+    @pytest.mark.asyncio
+    async def test_find_path_nonexistent_mechanic(self, mechanic_repo, link_repo, created_mechanic):
+        """Test path to non-existent mechanic"""
+        use_case = FindEvolutionPathUseCase(mechanic_repo, link_repo)
+
+        with pytest.raises(ValueError, match="Mechanic not found"):
+            await use_case.execute(created_mechanic.id, 9999)
+
+
+async def _lines(text):
+    for line in text.splitlines():
+        yield line
+
+
+class TestImportLinksUseCase:
+    """Unit tests for ImportLinksUseCase"""
+
+    @pytest.mark.asyncio
+    async def test_import_csv_reports_rejected_lines(self, link_repo, created_mechanics):
+        """Test that bad lines are reported and good ones imported"""
+        first, second = (m.id for m in created_mechanics)
+        text = "\n".join([
+            "from_id,to_id,type",
+            f"{first},{second},evolution",
+            f"{first},9999,evolution",
+            f"{first},{first},evolution",
+            f"{second},{first}, ",
+            "x,1,evolution",
+            f"{first},{second}",
+            f"{second},{first},inheritance",
+            f"{first},{second},evolution",
+        ])
+
+        use_case = ImportLinksUseCase(link_repo, batch_size=2)
+        report = await use_case.execute(_lines(text))
+
+        assert report.imported == 2
+        assert [(r.line, r.reason) for r in report.rejected] == [
+            (3, "unknown to_id"),
+            (4, "self-link"),
+            (5, "empty type"),
+            (6, "from_id must be an integer"),
+            (7, "expected from_id,to_id,type"),
+            (9, "duplicate link"),
+        ]
+        links = await link_repo.list_all()
+        assert [(l.from_id, l.to_id, l.type) for l in links] == [
+            (first, second, "evolution"), (second, first, "inheritance")
+        ]
+        assert [l.id for l in await link_repo.list_by_from_id(second)] == [links[1].id]
+
+    @pytest.mark.asyncio
+    async def test_import_ndjson(self, link_repo, created_mechanics):
+        """Test NDJSON input and the rejection report cap"""
+        first, second = (m.id for m in created_mechanics)
+        text = "\n".join([
+            f'{{"from_id": {first}, "to_id": {second}, "type": "evolution"}}',
+            "[1, 2]",
+            f'{{"from_id": {first}, "to_id": 4294967296, "type": "evolution"}}',
+        ])
+
+        use_case = ImportLinksUseCase(link_repo, max_reported=1)
+        report = await use_case.execute(_lines(text), "ndjson")
+
+        assert report.imported == 1
+        assert report.rejected_count == 2
+        assert [(r.line, r.reason) for r in report.rejected] == [(2, "expected a JSON object")]